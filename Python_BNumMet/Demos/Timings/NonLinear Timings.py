@@ -150,7 +150,7 @@ def experiment(scipyTol, bnmTol, evalFunc=1):
             a = 0.08
             b = 1.1 + i
             x1 = brentq(scipyFun, a, b, maxiter=1000, xtol=scipyTol)
-            x2 = zBrentDekker(BNMFun, (a, b), stop_iters=1000, tol=bnmTol)
+            x2 = zBrentDekker(BNMFun, (a, b), stop_iters=1000, tol=bnmTol).root
             x3 = zBrentDekkerMAT(
                 matlabFun, (a, b), stopIters=1000
             )  # No tolerance for matlab
@@ -0,0 +1,283 @@
+import numpy as np
+
+
+def unary_rules(x):
+    """
+    Values, first and second derivatives of the elementary functions of numpy at x, used by Dual
+
+    params:
+        x: point where the functions are evaluated
+
+    returns:
+        dictionary ufunc -> (function, first derivative, second derivative) as functions without arguments
+    """
+    return {
+        np.negative: (lambda: -x, lambda: -1.0, lambda: 0.0),
+        np.positive: (lambda: x, lambda: 1.0, lambda: 0.0),
+        np.absolute: (lambda: abs(x), lambda: np.sign(x), lambda: 0.0),
+        np.square: (lambda: x * x, lambda: 2 * x, lambda: 2.0),
+        np.reciprocal: (lambda: 1 / x, lambda: -1 / x**2, lambda: 2 / x**3),
+        np.sqrt: (
+            lambda: np.sqrt(x),
+            lambda: 0.5 / np.sqrt(x),
+            lambda: -0.25 / x**1.5,
+        ),
+        np.cbrt: (
+            lambda: np.cbrt(x),
+            lambda: 1 / (3 * np.cbrt(x) ** 2),
+            lambda: -2 / (9 * np.cbrt(x) ** 5),
+        ),
+        np.exp: (lambda: np.exp(x), lambda: np.exp(x), lambda: np.exp(x)),
+        np.expm1: (lambda: np.expm1(x), lambda: np.exp(x), lambda: np.exp(x)),
+        np.log: (lambda: np.log(x), lambda: 1 / x, lambda: -1 / x**2),
+        np.log2: (
+            lambda: np.log2(x),
+            lambda: 1 / (x * np.log(2)),
+            lambda: -1 / (x**2 * np.log(2)),
+        ),
+        np.log10: (
+            lambda: np.log10(x),
+            lambda: 1 / (x * np.log(10)),
+            lambda: -1 / (x**2 * np.log(10)),
+        ),
+        np.log1p: (
+            lambda: np.log1p(x),
+            lambda: 1 / (1 + x),
+            lambda: -1 / (1 + x) ** 2,
+        ),
+        np.sin: (lambda: np.sin(x), lambda: np.cos(x), lambda: -np.sin(x)),
+        np.cos: (lambda: np.cos(x), lambda: -np.sin(x), lambda: -np.cos(x)),
+        np.tan: (
+            lambda: np.tan(x),
+            lambda: 1 + np.tan(x) ** 2,
+            lambda: 2 * np.tan(x) * (1 + np.tan(x) ** 2),
+        ),
+        np.arcsin: (
+            lambda: np.arcsin(x),
+            lambda: 1 / np.sqrt(1 - x * x),
+            lambda: x / (1 - x * x) ** 1.5,
+        ),
+        np.arccos: (
+            lambda: np.arccos(x),
+            lambda: -1 / np.sqrt(1 - x * x),
+            lambda: -x / (1 - x * x) ** 1.5,
+        ),
+        np.arctan: (
+            lambda: np.arctan(x),
+            lambda: 1 / (1 + x * x),
+            lambda: -2 * x / (1 + x * x) ** 2,
+        ),
+        np.sinh: (lambda: np.sinh(x), lambda: np.cosh(x), lambda: np.sinh(x)),
+        np.cosh: (lambda: np.cosh(x), lambda: np.sinh(x), lambda: np.cosh(x)),
+        np.tanh: (
+            lambda: np.tanh(x),
+            lambda: 1 - np.tanh(x) ** 2,
+            lambda: -2 * np.tanh(x) * (1 - np.tanh(x) ** 2),
+        ),
+    }
+
+
+class Dual:
+    """
+    Forward mode automatic differentiation up to the second derivative: a Dual holds the value, the first and the second
+    derivative of an expression with respect to one variable, and every operation applies the chain rule,
+        g(u) -> (g(u), g'(u) u', g''(u) u'^2 + g'(u) u'')
+    so evaluating a function written with the operators and the numpy functions (np.sin, np.exp, ...) at Dual(x, 1)
+    gives f(x), f'(x) and f''(x) exactly (up to rounding), in a single call. The functions of the math module convert
+    their argument to float and cannot be used.
+    """
+
+    __slots__ = ("value", "first", "second")
+
+    def __init__(self, value, first=0.0, second=0.0):
+        """
+        params:
+            value: value of the expression
+            first (optional): first derivative (default: 0, a constant)
+            second (optional): second derivative (default: 0)
+        """
+        self.value = value
+        self.first = first
+        self.second = second
+
+    @staticmethod
+    def lift(other):
+        """
+        Converts a constant to a Dual with zero derivatives, a Dual is returned as it is
+        """
+        return other if isinstance(other, Dual) else Dual(other)
+
+    def chain(self, g0, g1, g2):
+        """
+        Applies the chain rule for a function g with g(u) = g0, g'(u) = g1 and g''(u) = g2 at u = self
+        """
+        return Dual(
+            g0, g1 * self.first, g2 * self.first * self.first + g1 * self.second
+        )
+
+    def __repr__(self):
+        return f"Dual({self.value}, {self.first}, {self.second})"
+
+    # Arithmetic
+    # =================================================================================================================
+    def __add__(self, other):
+        other = Dual.lift(other)
+        return Dual(
+            self.value + other.value,
+            self.first + other.first,
+            self.second + other.second,
+        )
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = Dual.lift(other)
+        return Dual(
+            self.value - other.value,
+            self.first - other.first,
+            self.second - other.second,
+        )
+
+    def __rsub__(self, other):
+        return Dual.lift(other) - self
+
+    def __mul__(self, other):
+        other = Dual.lift(other)
+        return Dual(
+            self.value * other.value,
+            self.first * other.value + self.value * other.first,
+            self.second * other.value
+            + 2 * self.first * other.first
+            + self.value * other.second,
+        )
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = Dual.lift(other)
+        return self * other.chain(
+            1 / other.value, -1 / other.value**2, 2 / other.value**3
+        )
+
+    def __rtruediv__(self, other):
+        return Dual.lift(other) / self
+
+    def __pow__(self, other):
+        if isinstance(other, Dual):  # u^v = exp(v log u)
+            return np.exp(other * np.log(self))
+        if other == 0:
+            return Dual(1.0)
+        # Constant exponent, the second derivative vanishes for the linear power (avoids 0 * inf at 0)
+        return self.chain(
+            self.value**other,
+            other * self.value ** (other - 1),
+            other * (other - 1) * self.value ** (other - 2) if other != 1 else 0.0,
+        )
+
+    def __rpow__(self, other):
+        # c^u = exp(u log c)
+        return np.exp(self * np.log(other))
+
+    def __neg__(self):
+        return Dual(-self.value, -self.first, -self.second)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self if self.value >= 0 else -self
+
+    # Comparisons use the value, so that functions with branches can be differentiated
+    # =================================================================================================================
+    def __lt__(self, other):
+        return self.value < Dual.lift(other).value
+
+    def __le__(self, other):
+        return self.value <= Dual.lift(other).value
+
+    def __gt__(self, other):
+        return self.value > Dual.lift(other).value
+
+    def __ge__(self, other):
+        return self.value >= Dual.lift(other).value
+
+    def __eq__(self, other):
+        return self.value == Dual.lift(other).value
+
+    def __ne__(self, other):
+        return self.value != Dual.lift(other).value
+
+    __hash__ = None
+
+    # numpy functions
+    # =================================================================================================================
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Called by numpy for np.sin(dual), np.float64(2) * dual, ... with the elementary functions of unary_rules and the
+        arithmetic operators, any other function is not supported
+        """
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        binary = {
+            np.add: lambda u, v: u + v,
+            np.subtract: lambda u, v: u - v,
+            np.multiply: lambda u, v: u * v,
+            np.true_divide: lambda u, v: u / v,
+            np.power: lambda u, v: u**v,
+        }
+        if ufunc in binary and len(inputs) == 2:
+            u, v = inputs
+            # Numpy scalars and 0-d arrays are used as plain numbers
+            u = u if isinstance(u, Dual) else float(u)
+            v = v if isinstance(v, Dual) else float(v)
+            if isinstance(u, Dual):
+                return binary[ufunc](u, v)
+            return binary[ufunc](Dual(u), v)
+        rules = unary_rules(self.value)
+        if ufunc in rules and len(inputs) == 1:
+            g0, g1, g2 = rules[ufunc]
+            return self.chain(g0(), g1(), g2())
+        return NotImplemented
+
+
+def derivatives(f, x, *args):
+    """
+    Value, first and second derivative of f at x with forward mode automatic differentiation (Dual), in a single call
+
+    params:
+        f: function written with operators and numpy functions, f(x, *args)
+        x: point where the derivatives are computed
+        *args: arguments of the function f (constants)
+
+    returns:
+        f(x), f'(x), f''(x)
+    """
+    y = f(Dual(float(x), 1.0), *args)
+    if not isinstance(y, Dual):  # f does not depend on x
+        return y, 0.0, 0.0
+    return y.value, y.first, y.second
+
+
+def complex_step(f, x, *args, h=1e-20, second=False):
+    """
+    Derivatives of f at x with the complex step: for a real analytic f, f(x + ih) = f(x) + ih f'(x) - h^2 f''(x) / 2 + ..., so
+    Re f(x + ih) = f(x) and Im f(x + ih) / h = f'(x) to machine precision with a tiny h, as there is no subtraction. The
+    second derivative takes another call with a larger step, 2 (f(x) - Re f(x + ik)) / k^2 with k = eps^(1/4), which has
+    cancellation so it is only accurate to about 8 digits.
+
+    params:
+        f: function that accepts complex arguments (numpy functions, no abs or comparisons), f(x, *args)
+        x: point where the derivatives are computed
+        *args: arguments of the function f (real)
+        h (optional): complex step of the first derivative (default: 1e-20)
+        second (optional): a flag to compute the second derivative too (default: False)
+
+    returns:
+        f(x), f'(x), and f''(x) if second is True
+    """
+    y = complex(f(complex(x, h), *args))
+    if not second:
+        return y.real, y.imag / h
+    k = np.finfo(float).eps ** 0.25
+    z = complex(f(complex(x, k), *args))
+    return y.real, y.imag / h, 2 * (y.real - z.real) / k**2
@@ -0,0 +1,341 @@
+import numpy as np
+from BNumMet.Interpolation import evaluate_chunks
+from BNumMet.LinearSystems import banded_cholesky, banded_cholesky_solve, banded_inverse
+
+
+def clamped_knots(interior, a, b, k=3):
+    """
+    Knot vector of the B-splines of degree k on [a, b] with the given interior knots, the ends are repeated k+1 times
+
+    params:
+        interior: sorted interior knots, strictly between a and b
+        a, b: ends of the interval
+        k (optional): degree of the B-splines (default: 3)
+
+    returns:
+        t: knot vector [a]*(k+1) + interior + [b]*(k+1)
+
+    raises:
+        ValueError: if a >= b or the interior knots are not sorted inside (a, b)
+    """
+    interior = np.asarray(interior, dtype=float)
+    if a >= b:
+        raise ValueError("The interval must satisfy a < b")
+    if np.any(np.diff(interior) < 0) or np.any(interior <= a) or np.any(interior >= b):
+        raise ValueError("The interior knots must be sorted and inside (a, b)")
+    return np.concatenate([np.full(k + 1, a), interior, np.full(k + 1, b)])
+
+
+def bspline_basis(t, k, u, nu=0):
+    """
+    Values of the k+1 B-splines of degree k that are not zero at every point u (Cox - de Boor recurrence, vectorized over the points)
+
+    params:
+        t: knot vector, with len(t) - k - 1 B-splines
+        k: degree of the B-splines
+        u: points where the B-splines are evaluated, the points outside [t[k], t[-k-1]] use the polynomial of the closest interval
+        nu (optional): order of the derivative (default: 0)
+
+    returns:
+        span: array with the interval t[span] <= u < t[span+1] of every point
+        N: array of shape (len(u), k+1), N[:, j] is the nu-th derivative of the B-spline number span-k+j at the points
+    """
+    t = np.asarray(t, dtype=float)
+    u = np.atleast_1d(np.asarray(u, dtype=float))
+    n = len(t) - k - 1  # Number of B-splines
+    span = np.clip(np.searchsorted(t, u, side="right") - 1, k, n - 1)
+
+    # B-splines of degree k - nu: N_{i,0} = 1 in its interval and the recurrence raises the degree
+    N = np.ones((len(u), 1))
+    for d in range(1, k - nu + 1):
+        # u - t[span+1-j] and t[span+j] - u for j = 1..d
+        left = u[:, None] - t[span[:, None] + 1 - np.arange(1, d + 1)]
+        right = t[span[:, None] + np.arange(1, d + 1)] - u[:, None]
+        new = np.zeros((len(u), d + 1))
+        saved = np.zeros(len(u))
+        for r in range(d):
+            temp = N[:, r] / (right[:, r] + left[:, d - r - 1])
+            new[:, r] = saved + right[:, r] * temp
+            saved = left[:, d - r - 1] * temp
+        new[:, d] = saved
+        N = new
+
+    # Derivatives: B'_{i,q} = q (B_{i,q-1} / (t[i+q] - t[i]) - B_{i+1,q-1} / (t[i+q+1] - t[i+1])), applied nu times
+    for q in range(k - nu + 1, k + 1):
+        # B-splines of degree q that are not zero, and the ones of degree q-1 padded with zeros:
+        # B_{i,q-1} is padded[:, :-1] (first term) and B_{i+1,q-1} is padded[:, 1:] (second term)
+        i = span[:, None] - q + np.arange(q + 1)
+        padded = np.pad(N, ((0, 0), (1, 1)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            first = np.where(t[i + q] > t[i], padded[:, :-1] / (t[i + q] - t[i]), 0)
+            second = np.where(
+                t[i + q + 1] > t[i + 1], padded[:, 1:] / (t[i + q + 1] - t[i + 1]), 0
+            )
+        N = q * (first - second)
+
+    return span, N
+
+
+def banded_gram(span, N, weights, n):
+    """
+    Lower band of the matrix sum(weights * B_a * B_b) built from the B-spline values at some points (see bspline_basis)
+
+    params:
+        span, N: intervals and values of the B-splines at the points
+        weights: weight of every point
+        n: number of B-splines
+
+    returns:
+        band: array of shape (k+1, n) with band[j, i] = sum(weights * B_{i+j} * B_i)
+    """
+    k = N.shape[1] - 1
+    band = np.zeros((k + 1, n))
+    for j in range(k + 1):  # Distance to the diagonal
+        for a in range(k + 1 - j):  # B-splines span-k+a and span-k+a+j
+            np.add.at(band[j], span - k + a, weights * N[:, a] * N[:, a + j])
+    return band
+
+
+def banded_rhs(span, N, weights, y, n):
+    """
+    Right-hand side sum(weights * B_a * y) of the normal equations
+
+    params:
+        span, N: intervals and values of the B-splines at the points
+        weights: weight of every point
+        y: values at the points
+        n: number of B-splines
+
+    returns:
+        rhs: array with n elements
+    """
+    k = N.shape[1] - 1
+    rhs = np.zeros(n)
+    for a in range(k + 1):
+        np.add.at(rhs, span - k + a, weights * N[:, a] * y)
+    return rhs
+
+
+def penalty_band(t, k=3):
+    """
+    Lower band of the roughness penalty Omega[a, b] = integral(B''_a * B''_b), integrated exactly interval by interval with Gauss-Legendre
+
+    params:
+        t: knot vector
+        k (optional): degree of the B-splines, at least 2 (default: 3)
+
+    returns:
+        band: array of shape (k+1, n) with the band of Omega
+    """
+    breaks = np.unique(t[k : len(t) - k])
+    # The integrand has degree 2(k-2), k-1 Gauss points per interval are exact
+    nodes, gauss_weights = np.polynomial.legendre.leggauss(max(k - 1, 1))
+    half = np.diff(breaks)[:, None] / 2
+    u = ((breaks[:-1, None] + breaks[1:, None]) / 2 + half * nodes).ravel()
+    weights = (half * gauss_weights).ravel()
+
+    span, N = bspline_basis(t, k, u, nu=2)
+    return banded_gram(span, N, weights, len(t) - k - 1)
+
+
+class BSpline:
+    """
+    Spline sum(c_i * B_i(u)) in B-spline form: only the knots, the coefficients and the degree are stored
+    """
+
+    def __init__(self, t, c, k=3):
+        """
+        params:
+            t: knot vector
+            c: coefficients, len(t) - k - 1 values
+            k (optional): degree (default: 3)
+
+        raises:
+            ValueError: if the number of coefficients does not match the knots or the knots are not sorted
+        """
+        self.t = np.asarray(t, dtype=float)
+        self.c = np.asarray(c, dtype=float)
+        self.k = k
+        if len(self.c) != len(self.t) - k - 1:
+            raise ValueError("There must be len(t) - k - 1 coefficients")
+        if np.any(np.diff(self.t) < 0):
+            raise ValueError("The knots must be sorted")
+
+    def __call__(self, u, out=None, nu=0):
+        """
+        Evaluates the spline (or its nu-th derivative) at the points u
+
+        params:
+            u: list of points where the spline is evaluated
+            out (optional): array where the result is stored (default: a new array)
+            nu (optional): order of the derivative (default: 0)
+
+        returns:
+            v: list of values of the spline at the points u
+        """
+        span, N = bspline_basis(self.t, self.k, u, nu)
+        v = np.sum(N * self.c[span[:, None] - self.k + np.arange(self.k + 1)], axis=1)
+        if out is None:
+            return v
+        out[:] = v
+        return out
+
+    def chunks(self, u, chunk_size=65536, out=None):
+        """
+        Evaluates the spline chunk by chunk (see Interpolation.interpolate_chunks)
+
+        params:
+            u: points where the spline is evaluated, either an array (also np.memmap) or any iterable of points
+            chunk_size (optional): number of points evaluated at once (default: 65536)
+            out (optional): array where the results are stored, it must be at least as long as u
+
+        returns:
+            generator of the values of every chunk (views of out when given)
+        """
+        return evaluate_chunks(lambda chunk, o: self(chunk, o), u, chunk_size, out)
+
+
+class SmoothingSpline(BSpline):
+    """
+    Cubic smoothing spline, the BSpline that minimizes sum(w * (y - s(x))^2) + lam * integral(s''^2)
+
+    Attributes besides the ones of BSpline:
+        lam: smoothing parameter
+        dof: effective degrees of freedom, trace of the smoothing matrix (2 for a straight line, the number of points for interpolation)
+        gcv: generalized cross-validation score n * RSS / (n - dof)^2
+    """
+
+    def __init__(self, t, c, lam, dof, gcv):
+        """
+        params:
+            t, c: knot vector and coefficients of the cubic spline
+            lam, dof, gcv: smoothing parameter, degrees of freedom and GCV score of the fit
+        """
+        super().__init__(t, c, 3)
+        self.lam, self.dof, self.gcv = lam, dof, gcv
+
+
+def check_data(x, y, w):
+    """
+    Converts the data to arrays and checks their sizes
+
+    returns:
+        x, y, w: arrays of floats (w is all ones when it is None)
+
+    raises:
+        ValueError: if the sizes differ or a weight is negative
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    w = np.ones(len(x)) if w is None else np.asarray(w, dtype=float)
+    if len(x) != len(y) or len(x) != len(w):
+        raise ValueError("The length of the X and Y coordinates must be the same")
+    if np.any(w < 0):
+        raise ValueError("The weights must be non-negative")
+    return x, y, w
+
+
+def least_squares_bspline(x, y, knots, k=3, w=None):
+    """
+    Least-squares B-spline fit with the given interior knots, minimizes sum(w * (y - s(x))^2).
+    The normal equations are banded (bandwidth k), they are assembled and solved in O(n).
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        knots: sorted interior knots, strictly between min(x) and max(x)
+        k (optional): degree of the spline (default: 3)
+        w (optional): weights of the points (default: all 1)
+
+    returns:
+        spline: BSpline with the fit
+
+    raises:
+        ValueError: if the sizes differ, the knots are not valid or there are not enough points between the knots
+    """
+    x, y, w = check_data(x, y, w)
+    t = clamped_knots(knots, np.min(x), np.max(x), k)
+    n = len(t) - k - 1
+
+    span, N = bspline_basis(t, k, x)
+    try:
+        factor = banded_cholesky(banded_gram(span, N, w, n))
+    except ValueError:
+        raise ValueError(
+            "The normal equations are singular, every B-spline needs data points where it is not zero"
+        )
+    return BSpline(t, banded_cholesky_solve(factor, banded_rhs(span, N, w, y, n)), k)
+
+
+def smoothing_spline(x, y, lam=None, w=None):
+    """
+    Cubic smoothing spline of noisy data, with knots at the data points: minimizes sum(w * (y - s(x))^2) + lam * integral(s''^2).
+    When lam is not given, it is chosen by minimizing the generalized cross-validation score; every score costs O(n)
+    (the trace of the smoothing matrix only needs the band of the inverse of the banded normal equations), and the
+    systems of a whole grid of lam are factored as one stack, so every grid costs a single pass over the band.
+
+    params:
+        x: list of x coordinates (repeated values are allowed)
+        y: list of y coordinates
+        lam (optional): smoothing parameter, positive (default: chosen by generalized cross-validation)
+        w (optional): weights of the points (default: all 1)
+
+    returns:
+        spline: SmoothingSpline with the fit and its lam, dof and gcv
+
+    raises:
+        ValueError: if the sizes differ, lam is not positive, there are less than 2 different x or the normal equations are singular
+    """
+    x, y, w = check_data(x, y, w)
+    breaks = np.unique(x)
+    if len(breaks) < 2:
+        raise ValueError("At least 2 different x coordinates are needed")
+    if lam is not None and lam <= 0:
+        raise ValueError("The smoothing parameter must be positive")
+
+    t = clamped_knots(breaks[1:-1], breaks[0], breaks[-1])
+    n = len(t) - 4
+    span, N = bspline_basis(t, 3, x)
+    gram = banded_gram(span, N, w, n)  # B^T W B
+    rhs = banded_rhs(span, N, w, y, n)  # B^T W y
+    penalty = penalty_band(t)
+
+    def fit(lam, check=True):
+        """
+        Solves (B^T W B + lam Omega) c = B^T W y for one lam or an array of them at once (the systems are factored as a stack),
+        returns the coefficients, the degrees of freedom and the GCV scores. Without check, the lam that make the system
+        numerically singular get an infinite score instead of raising ValueError
+        """
+        lam = np.asarray(lam, dtype=float)
+        factor = banded_cholesky(gram + lam[..., None, None] * penalty, check)
+        c = banded_cholesky_solve(factor, np.broadcast_to(rhs, lam.shape + (n,)))
+        # dof = tr(B (B^T W B + lam Omega)^-1 B^T W) = tr((B^T W B + lam Omega)^-1 B^T W B), both banded
+        inverse = banded_inverse(factor)
+        dof = np.sum(inverse[..., 0, :] * gram[0], axis=-1)
+        dof += 2 * np.sum(inverse[..., 1:, :] * gram[1:], axis=(-2, -1))
+        residuals = y - np.sum(N * c[..., span[:, None] - 3 + np.arange(4)], axis=-1)
+        m = len(x)
+        gcv = m * np.sum(w * residuals**2, axis=-1) / np.maximum(m - dof, 1e-12) ** 2
+        return c, dof, np.where(np.isnan(gcv), np.inf, gcv)
+
+    if lam is None:
+        # lam relative to sum(w) (b - a)^3, so the search does not depend on the units of x and y
+        # (the grid goes from almost interpolating the data to almost a straight line)
+        scale = np.sum(w) * (breaks[-1] - breaks[0]) ** 3
+        grid = np.linspace(-14, 2, 33)  # log10(lam / scale), two points per decade
+
+        # Every grid is scored in a single pass over the band, then a finer one between the neighbours of its best point
+        for _ in range(2):
+            lams = scale * 10**grid
+            c, dof, gcv = fit(lams, check=False)
+            best = int(np.argmin(gcv))
+            lo, hi = grid[max(best - 1, 0)], grid[min(best + 1, len(grid) - 1)]
+            grid = np.linspace(lo, hi, 33)
+        if not np.isfinite(gcv[best]):
+            raise ValueError(
+                "The normal equations are singular for every smoothing parameter"
+            )
+        lam, c, dof, gcv = lams[best], c[best], dof[best], gcv[best]
+    else:
+        c, dof, gcv = fit(lam)
+
+    return SmoothingSpline(t, c, lam, dof, gcv)
@@ -1,5 +1,13 @@
+import itertools
+import os
+
 import numpy as np
-from BNumMet.LinearSystems import lu_solve
+from BNumMet.LinearSystems import (
+    cyclic_tridiagonal_lu,
+    cyclic_tridiagonal_lu_solve,
+    tridiagonal_lu,
+    tridiagonal_lu_solve,
+)
 
 
 def polinomial(x, y, u):
@@ -32,7 +40,7 @@ def polinomial(x, y, u):
     return v  # return the final interpolated values
 
 
-def piecewise_linear(x, y, u, sorted=False):
+def piecewise_linear(x, y, u, sorted=False, extrapolate="polynomial", dtype=None):
     """
     Computes the piecewise lineal interpolation of a set of points (x,y) at the points u, (x,y) ACCORDING TO THE ALGORITHM IN THE BOOK
 
@@ -41,38 +49,89 @@ def piecewise_linear(x, y, u, sorted=False):
         y: list of y coordinates  # list of y coordinates of the input data points
         u: list of points where the interpolation is computed  # list of points where the interpolation is to be computed
         sorted (optional): if the points are sorted or not (default: False)  # boolean flag indicating if the input data points are sorted or not
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
 
     returns:
         v: list of values of the interpolation at the points u  # list of interpolated values at the specified points u
     """
-    if not sorted:  # if the input data points are not sorted
-        # Sort the points
-        x = np.array(x)  # convert x to numpy array
-        y = np.array(y)  # convert y to numpy array
-        ind = np.argsort(x)  # Get the indices of the sorted array
-        x = x[ind]  # Sort the x coordinates
-        y = y[ind]  # Sort the y coordinates
+    x, y, d = piecewise_linear_coefficients(
+        x, y, sorted, dtype
+    )  # Sort and get the slopes
 
-    delta = np.diff(y) / np.diff(
-        x
-    )  # Compute the slopes of the lines -- here we are using the fact that x is sorted
-    n = len(x)  # number of input data points
+    return evaluate_piecewise(
+        x, y, u, d, extrapolate=extrapolate
+    )  # return the final interpolated values
 
-    k = np.zeros(np.size(u), dtype=int)  # initialize array to store indices
-    for j in np.arange(1, n - 1):
-        k[
-            x[j] <= u
-        ] = j  # find the indices of the data points just smaller than the corresponding u values
 
-    s = u - x[k]  # calculate the difference between u and corresponding x values
-    v = (
-        y[k] + s * delta[k]
-    )  # calculate the interpolated y values based on the slope of the line
+def pchip_end(h1, h2, delta1, delta2):
+    """
+    Computes the slopes at the end points of the interval, it works element-wise on arrays of end points
 
-    return v  # return the final interpolated values
+    params:
+        h1, h2: lengths of the two subintervals closest to the end point
+        delta1, delta2: slopes of the secant lines over those two subintervals
+
+    returns:
+        d: slope of the P.C.H.I.P. at the end point
+    """
+    # Noncenter, shape-preserving, three-point formula.
+    d = ((2 * h1 + h2) * delta1 - h1 * delta2) / (h1 + h2)
+    # If slopes of the secant lines are of different sign or If the slopes are not of the same magnitude, use 0.
+    return np.where(
+        (np.sign(delta1) != np.sign(delta2))
+        | (np.abs(d) > np.abs(3 * delta1))
+        | (np.abs(d) > np.abs(3 * delta2)),
+        0.0,
+        d,
+    )
+
+
+def pchip_slopes(h, delta):
+    """
+    Slopes for shape-preserving Hermite cubic, computes the slopes
+        - Interior Points
+            * d(k) = 0 <- delta(k-1) && delta(k) different signs or both are 0
+            * d(k) = Weighted Harmonic Mean <- Same sign delta(k-1) && delta (k)
+        - EndPoints
+            Call pchip end :)
+    Several sets of points can be processed at once: the points go along the first axis and every other axis is an independent set.
+
+    params:
+        h: list of distances between points (broadcastable to delta)
+        delta: list of slopes between points
 
+    returns:
+        d: list of slopes for the Hermite cubic
+    """
+    h = np.broadcast_to(h, np.shape(delta))  # Same distances for every set of points
+
+    same_sign = (
+        np.sign(delta[0:-1]) * np.sign(delta[1:]) > 0
+    )  # Interior points where the slopes at both sides are of the same sign
+
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interior = np.where(
+            same_sign, (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:]), 0.0
+        )  # Weighted harmonic mean where the slopes are of the same sign, 0 otherwise
 
-def pchip(x, y, u, sorted=False):
+    # end points
+    first = pchip_end(
+        h[0], h[1], delta[0], delta[1]
+    )  # Compute the slope of the first endpoint using the 'pchip_end' function
+    last = pchip_end(
+        h[-1], h[-2], delta[-1], delta[-2]
+    )  # Compute the slope of the last endpoint using the 'pchip_end' function
+
+    # The end slopes are numpy scalars, which may be promoted to float64: the slopes keep the type of the interior ones
+    return np.concatenate(
+        [first[None], interior, last[None]], dtype=interior.dtype
+    )  # Return the slopes
+
+
+def pchip(x, y, u, sorted=False, extrapolate="polynomial", dtype=None):
     """
     Piecewise Cubic Hermite Interpolation Polynomial (P.C.H.I.P.) [Based on an old Fortran program by Fritsch and Carlson]
 
@@ -81,113 +140,340 @@ def pchip(x, y, u, sorted=False):
             y: list of y coordinates
             u: list of points where the interpolation is computed
             sorted (optional): if the points are sorted or not (default: False)
+            extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+            dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
 
         returns:
             v: list of values of the interpolation at the points u
     """
+    x, y, d, c, b = pchip_coefficients(
+        x, y, sorted, dtype
+    )  # Sort the points and compute the slopes and coefficients of the cubics
 
-    def pchip_end(h1, h2, delta1, delta2):
-        """
-        Computes the slopes at the end points of the interval
+    return evaluate_piecewise(
+        x, y, u, d, c, b, extrapolate=extrapolate
+    )  # Return the computed values
 
-        params:
-            x: list of x coordinates # x-coordinates of the data points
-            y: list of y coordinates # y-coordinates of the data points
-            u: list of points where the interpolation is computed # Points where the interpolation is to be computed
-            sorted (optional): if the points are sorted or not (default: False) # Parameter to specify if the points are already sorted
 
-        returns:
-            v: list of values of the interpolation at the points u # List of values of the P.C.H.I.P. at the points in 'u'
-        """
-        # Noncenter, shape-preserving, three-point formula.
-        d = ((2 * h1 + h2) * delta1 - h1 * delta2) / (h1 + h2)
-        # If slopes of the secant lines are of different sign or If the slopes are not of the same magnitude, use 0.
-        if (
-            np.sign(delta1) != np.sign(delta2)
-            or np.abs(d) > np.abs(3 * delta1)
-            or np.abs(d) > np.abs(3 * delta2)
-        ):
-            d = 0
+def akima_slopes(h, delta, modified=False):
+    """
+    Slopes of the Akima interpolant, a weighted mean of the slopes of the two subintervals at each side of every point
+        d(k) = (w1 * delta(k-1) + w2 * delta(k)) / (w1 + w2), w1 = |delta(k+1) - delta(k)|, w2 = |delta(k-1) - delta(k-2)|
+    At the ends, two more slopes are extrapolated linearly at each side. The modified Akima (makima) adds |delta(k+1) + delta(k)| / 2
+    to w1 and |delta(k-1) + delta(k-2)| / 2 to w2, which avoids overshoots where the data is flat.
+    Several sets of points can be processed at once: the points go along the first axis and every other axis is an independent set.
 
-        return d
+    params:
+        h: list of distances between points (not used, the weights only depend on the slopes)
+        delta: list of slopes between points, at least 2
+        modified (optional): if the modified Akima weights are used (default: False)
 
-    def pchip_slopes(h, delta):
-        """
-        Slopes for shape-preserving Hermite cubic, computes the slopes
-            - Interior Points
-                * d(k) = 0 <- delta(k-1) && delta(k) different signs or both are 0
-                * d(k) = Weighted Harmonic Mean <- Same sign delta(k-1) && delta (k)
-            - EndPoints
-                Call pchip end :)
+    returns:
+        d: list of slopes for the Hermite cubic
+    """
+    # delta(-2), delta(-1) and delta(n-1), delta(n) extrapolated linearly
+    m = np.concatenate(
+        [
+            (3 * delta[0] - 2 * delta[1])[None],
+            (2 * delta[0] - delta[1])[None],
+            delta,
+            (2 * delta[-1] - delta[-2])[None],
+            (3 * delta[-1] - 2 * delta[-2])[None],
+        ],
+        dtype=as_floating(delta).dtype,
+    )  # m[k+2] = delta(k)
 
-        params:
-            h: list of distances between points
-            delta: list of slopes between points
+    w1 = np.abs(m[3:] - m[2:-1])  # |delta(k+1) - delta(k)|
+    w2 = np.abs(m[1:-2] - m[:-3])  # |delta(k-1) - delta(k-2)|
+    if modified:
+        w1 += np.abs(m[3:] + m[2:-1]) / 2
+        w2 += np.abs(m[1:-2] + m[:-3]) / 2
 
-        returns:
-            d: list of slopes for the Hermite cubic
-        """
-        d = np.zeros(len(h))  # Initialize an array of zeros to store the slopes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            w1 + w2 > 0,
+            (w1 * m[1:-2] + w2 * m[2:-1]) / (w1 + w2),
+            (m[1:-2] + m[2:-1]) / 2,
+        )  # Mean of both slopes when the weights are 0 (locally straight data)
 
-        k = np.where(np.sign(delta[0:-1]) * np.sign(delta[1:]) > 0)[
-            0
-        ]  # Find the indices of the points where the slopes are of the same sign. 'k' will be an array of indices.
-        k = k + 1  # Add 1 to the indices to get the indices of the slopes
 
-        w1 = 2 * h[k] + h[k - 1]
-        w2 = h[k] + 2 * h[k - 1]
-        d[k] = (w1 + w2) / (
-            w1 / delta[k - 1] + w2 / delta[k]
-        )  # Compute the slopes of the lines for the interior points, where the slopes are of the same sign
+def makima_slopes(h, delta):
+    """
+    Slopes of the modified Akima interpolant (see akima_slopes)
+    """
+    return akima_slopes(h, delta, modified=True)
 
-        # end points
-        d[0] = pchip_end(
-            h[0], h[1], delta[0], delta[1]
-        )  # Compute the slope of the first endpoint using the 'pchip_end' function
 
-        d = np.append(
-            d, pchip_end(h[-2], h[-3], delta[-2], delta[-3])
-        )  # Compute the slope of the last endpoint using the 'pchip_end' function and append it to 'd'
+def steffen_end(h1, h2, delta1, delta2):
+    """
+    Computes the slopes at the end points for the Steffen interpolant, it works element-wise on arrays of end points
 
-        return d  # Return the list of slopes
+    params:
+        h1, h2: lengths of the two subintervals closest to the end point
+        delta1, delta2: slopes of the secant lines over those two subintervals
 
-    # Sort the points
-    x = np.array(x)  # Convert the x coordinate input to a numpy array
-    y = np.array(y)  # Convert the y coordinate input to a numpy array
-    if not sorted:  # If the points are not already sorted
-        ind = np.argsort(x)  # Get the indices of the sorted array
-        x = x[ind]  # Sort the x coordinates
-        y = y[ind]  # Sort the y coordinates
+    returns:
+        d: slope of the Steffen interpolant at the end point
+    """
+    # Slope of the parabola through the 3 points closest to the end
+    p = delta1 * (1 + h1 / (h1 + h2)) - delta2 * h1 / (h1 + h2)
+    # Limited so that the first subinterval is monotone
+    return np.where(
+        p * delta1 <= 0, 0.0, np.where(np.abs(p) > 2 * np.abs(delta1), 2 * delta1, p)
+    )
 
-    # First derivative
-    h = np.diff(x)  # Compute the distances between the points in x
-    delta = np.diff(y) / h  # Compute the slopes between the points
 
-    d = pchip_slopes(
-        h, delta
-    )  # Compute the slopes for the Hermite cubic using the pchip_slopes function
+def steffen_slopes(h, delta):
+    """
+    Slopes of the Steffen interpolant, monotone in every subinterval (no overshoots) and with continuous first derivative
+        - Interior Points
+            * p(k) = slope of the parabola through the points k-1, k, k+1
+            * d(k) = (sign(delta(k-1)) + sign(delta(k))) * min(|delta(k-1)|, |delta(k)|, |p(k)| / 2)
+        - EndPoints
+            Call steffen end
+    Several sets of points can be processed at once: the points go along the first axis and every other axis is an independent set.
+
+    params:
+        h: list of distances between points (broadcastable to delta)
+        delta: list of slopes between points
 
-    n = len(x)
-    c = (3 * delta - 2 * d[:-1] - d[1:]) / (
-        h
-    )  # Compute the coefficients of the cubic polynomials
-    b = (d[:-1] - 2 * delta + d[1:]) / (
-        h**2
-    )  # Compute the coefficients of the cubic polynomials
+    returns:
+        d: list of slopes for the Hermite cubic
+    """
+    h = np.broadcast_to(h, np.shape(delta))  # Same distances for every set of points
 
-    k = np.zeros(np.size(u), dtype=int)  # Initialize an array of indices
-    for j in np.arange(1, n - 1):  # Loop through the indices
-        k[x[j] <= u] = j  # Update the indices where x[j] is less than or equal to u
+    p = (delta[:-1] * h[1:] + delta[1:] * h[:-1]) / (h[:-1] + h[1:])
+    interior = (np.sign(delta[:-1]) + np.sign(delta[1:])) * np.minimum(
+        np.minimum(np.abs(delta[:-1]), np.abs(delta[1:])), np.abs(p) / 2
+    )
 
-    s = u - x[k]  # Compute the value of s for each index
-    v = y[k] + s * (
-        d[k] + s * (c[k] + s * b[k])
-    )  # Compute the values of the Hermite cubic
+    first = steffen_end(h[0], h[1], delta[0], delta[1])
+    last = steffen_end(h[-1], h[-2], delta[-1], delta[-2])
+
+    # The ends are cast to the dtype of the interior slopes, so float32 data gives float32 slopes
+    parts = [first[None], interior, last[None]]
+    return np.concatenate([part.astype(interior.dtype, copy=False) for part in parts])
+
+
+def akima(x, y, u, sorted=False, extrapolate="polynomial", dtype=None):
+    """
+    Akima interpolation, a piecewise cubic Hermite interpolation with slopes that only depend on the 5 points around every point (see akima_slopes)
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        u: list of points where the interpolation is computed
+        sorted (optional): if the points are sorted or not (default: False)
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        v: list of values of the interpolation at the points u
+    """
+    x, y, d, c, b = akima_coefficients(x, y, sorted, dtype)
+
+    return evaluate_piecewise(x, y, u, d, c, b, extrapolate=extrapolate)
 
-    return v  # Return the computed values
 
+def makima(x, y, u, sorted=False, extrapolate="polynomial", dtype=None):
+    """
+    Modified Akima interpolation, Akima without the overshoots where the data is flat (see akima_slopes)
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        u: list of points where the interpolation is computed
+        sorted (optional): if the points are sorted or not (default: False)
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        v: list of values of the interpolation at the points u
+    """
+    x, y, d, c, b = makima_coefficients(x, y, sorted, dtype)
+
+    return evaluate_piecewise(x, y, u, d, c, b, extrapolate=extrapolate)
+
+
+def steffen(x, y, u, sorted=False, extrapolate="polynomial", dtype=None):
+    """
+    Steffen interpolation, a monotone piecewise cubic Hermite interpolation (see steffen_slopes)
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        u: list of points where the interpolation is computed
+        sorted (optional): if the points are sorted or not (default: False)
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        v: list of values of the interpolation at the points u
+    """
+    x, y, d, c, b = steffen_coefficients(x, y, sorted, dtype)
+
+    return evaluate_piecewise(x, y, u, d, c, b, extrapolate=extrapolate)
+
+
+def hermite(x, y, dydx, u, sorted=False, extrapolate="polynomial", dtype=None):
+    """
+    Cubic Hermite interpolation with the given derivatives at the points, the cubic on every subinterval matches the values and
+    the derivatives at both ends. There is no slope estimation, so it costs O(n) plus the evaluation.
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        dydx: list of derivatives at the points
+        u: list of points where the interpolation is computed
+        sorted (optional): if the points are sorted or not (default: False)
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        v: list of values of the interpolation at the points u
+
+    raises:
+        ValueError: if x, y and dydx have different lengths
+    """
+    x, y, d, c, b = hermite_data_coefficients(x, y, dydx, sorted, dtype)
+
+    return evaluate_piecewise(x, y, u, d, c, b, extrapolate=extrapolate)
+
+
+end_conditions = ("not-a-knot", "natural", "clamped", "periodic")
+
+
+def spline_factor(h, end_condition="not-a-knot"):
+    """
+    Builds and factorizes the tridiagonal system of the slopes of the spline. It only depends on the x coordinates,
+    so it can be computed once and used with splineslopes for any y.
+        - Interior Points: h(k) d(k-1) + 2 (h(k-1) + h(k)) d(k) + h(k-1) d(k+1) = 3 (h(k) delta(k-1) + h(k-1) delta(k))
+        - EndPoints
+            * "not-a-knot": the third derivative is continuous at the second and the second to last points
+            * "natural": the second derivative is 0 at the ends
+            * "clamped": the slopes at the ends are given
+            * "periodic": the slope and the second derivative are the same at both ends (the last point is the first one), a cyclic system
+
+    params:
+        h: list of distances between points
+        end_condition (optional): "not-a-knot", "natural", "clamped" or "periodic" (default: "not-a-knot")
+
+    returns:
+        factor: factorization of the system (see LinearSystems.tridiagonal_lu and cyclic_tridiagonal_lu)
+
+    raises:
+        ValueError: if the end condition is unknown or there are not enough points for it
+    """
+    h = as_floating(h)
+    if end_condition not in end_conditions:
+        raise ValueError(f"The end condition must be one of {end_conditions}")
+    minimum = {"not-a-knot": 3, "natural": 1, "clamped": 1, "periodic": 2}
+    if len(h) < minimum[end_condition]:
+        raise ValueError(
+            f"The {end_condition} spline needs {minimum[end_condition] + 1} points"
+        )
+
+    if end_condition == "periodic":
+        # Unknowns d(0), ..., d(n-2), the point before the first one is the second to last one
+        hl = np.concatenate([h[-1:], h[:-1]])  # h(k-1) of every point, cyclically
+        a, b, c = h[1:].copy(), 2 * (hl + h), hl[:-1].copy()
+        # Corners: d(n-2) in the first row and d(0) in the last one
+        alpha, beta = h[0], hl[-1]
+        if len(h) == 2:  # Only 2 unknowns: the corners are on the diagonals
+            a[0] += beta
+            c[0] += alpha
+            return tridiagonal_lu(a, b, c)
+        return cyclic_tridiagonal_lu(a, b, c, alpha, beta)
+
+    # Initialize arrays for the coefficients of the tridiagonal matrix
+    a = np.zeros(len(h), dtype=h.dtype)
+    b = np.zeros(len(h) + 1, dtype=h.dtype)
+    c = np.zeros(len(h), dtype=h.dtype)
+
+    # Interior rows
+    a[:-1] = h[1:]
+    b[1:-1] = 2 * (h[1:] + h[:-1])
+    c[1:] = h[:-1]
+
+    if end_condition == "not-a-knot":
+        a[-1] = h[-2] + h[-1]  # Set value for the last entry of `a`
+        b[0], b[-1] = h[1], h[-2]
+        c[0] = h[0] + h[1]  # Set the first value of `c`
+    elif (
+        end_condition == "natural"
+    ):  # 2 d(0) + d(1) = 3 delta(0), d(n-2) + 2 d(n-1) = 3 delta(n-2)
+        a[-1], b[0], b[-1], c[0] = 1, 2, 2, 1
+    else:  # clamped: d(0) and d(n-1) are given
+        a[-1], b[0], b[-1], c[0] = 0, 1, 1, 0
+
+    return tridiagonal_lu(a, b, c)
+
+
+def splineslopes(h, delta, end_condition="not-a-knot", end_slopes=None, factor=None):
+    """
+    Computes the slopes of the splines, with not-a-knot end conditions by default (see spline_factor for the other ones).
+    Several sets of points with the same x coordinates can be processed at once: the points go along the first axis of delta and every other axis is an independent set.
 
-def splines(x, y, u, sorted=False):
+    params:
+        h: list of distances between points
+        delta: list of slopes between points
+        end_condition (optional): "not-a-knot", "natural", "clamped" or "periodic" (default: "not-a-knot")
+        end_slopes (optional): slopes at the first and last points for "clamped" (default: (0, 0))
+        factor (optional): factorization of the system returned by spline_factor(h, end_condition), so it is not computed again (default: None)
+
+    returns:
+        d: list of slopes for the splines
+    """
+    h, delta = as_floating(h), as_floating(delta)
+    if factor is None:
+        factor = spline_factor(h, end_condition)
+
+    # Right-hand side, interior rows
+    hr = h.reshape(h.shape + (1,) * (delta.ndim - 1))  # h for every set of points
+    interior = 3 * (hr[1:] * delta[:-1] + hr[:-1] * delta[1:])
+
+    if end_condition == "periodic":
+        first = 3 * (
+            hr[0] * delta[-1] + hr[-1] * delta[0]
+        )  # The point before the first one is the second to last one
+        r = np.concatenate(
+            [part.astype(delta.dtype, copy=False) for part in (first[None], interior)]
+        )
+        if len(factor) == 4:  # Sherman-Morrison factorization
+            d = cyclic_tridiagonal_lu_solve(factor, r)
+        else:
+            d = tridiagonal_lu_solve(factor, r)
+        return np.concatenate([d, d[:1]])  # The last slope is the first one
+
+    if end_condition == "not-a-knot":
+        s = h[0] + h[1]
+        first = ((h[0] + 2 * s) * h[1] * delta[0] + h[0] ** 2 * delta[1]) / s
+        s = h[-2] + h[-1]
+        last = (h[-1] ** 2 * delta[-2] + (2 * s + h[-1]) * h[-2] * delta[-1]) / s
+    elif end_condition == "natural":
+        first, last = 3 * delta[0], 3 * delta[-1]
+    else:  # clamped
+        first, last = (0.0, 0.0) if end_slopes is None else end_slopes
+        first = np.broadcast_to(first, delta.shape[1:])
+        last = np.broadcast_to(last, delta.shape[1:])
+
+    parts = [np.asarray(first)[None], interior, np.asarray(last)[None]]
+    r = np.concatenate([part.astype(delta.dtype, copy=False) for part in parts])
+
+    # Solve the system of equations defined by the tridiagonal matrix and the right-hand side in O(n)
+    return tridiagonal_lu_solve(factor, r)
+
+
+def splines(
+    x,
+    y,
+    u,
+    sorted=False,
+    end_condition="not-a-knot",
+    end_slopes=None,
+    extrapolate="polynomial",
+    dtype=None,
+):
     """
     Finds the piecewise cubic interpolatory spline S(x), with S(x(j)) = y(j), and returns v(k) = S(u(k)).
 
@@ -196,99 +482,2008 @@ def splines(x, y, u, sorted=False):
         y: list of y coordinates - list of y values to be used as input to the spline
         u: list of points where the interpolation is computed - the list of x-coordinates where the spline should be evaluated
         sorted (optional): if the points are sorted or not (default: False) - flag to indicate whether the input points are sorted or not
+        end_condition (optional): "not-a-knot", "natural", "clamped" or "periodic", see spline_factor (default: "not-a-knot")
+        end_slopes (optional): slopes at the first and last points for "clamped" (default: (0, 0))
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
 
     returns:
         v: list of values of the interpolation at the points u - the y-values of the spline evaluated at the x-coordinates in u
-    """
-
-    def splineslopes(h, delta):
-        """
-        Computes the slopes of the splines Uses not-a-knot end conditions.
 
-        params:
-            h: list of distances between points
-            delta: list of slopes between points
+    raises:
+        ValueError: if the end condition is unknown, there are not enough points or y[0] != y[-1] for "periodic"
+    """
+    x, y, d, c, b = spline_coefficients(
+        x, y, sorted, end_condition, end_slopes, dtype
+    )  # Sort the points and compute the slopes and coefficients of the cubic spline
 
-        returns:
-            d: list of slopes for the splines
-        """
-        # Initialize arrays for the coefficients of the tridiagonal matrix
-        a = np.zeros(len(h)).astype(float)
-        b = np.zeros(len(h)).astype(float)
-        c = np.zeros(len(h)).astype(float)
-        r = np.zeros(len(h)).astype(float)
+    return evaluate_piecewise(
+        x, y, u, d, c, b, extrapolate=extrapolate
+    )  # Return the calculated value of the cubic spline at each point in u
 
-        # Set values for the first and second sub-diagonal of the matrix
-        a[:-1] = h[1:]  # Set values for all but the last entry of `a`
-        a[-1] = h[-2] + h[-1]  # Set value for the last entry of `a`
-        b[0] = h[1]  # Set the first value of `b`
-        b[1:] = 2 * (h[1:] + h[:-1])  # Set values for all but the first entry of `b`
-        b = np.append(b, h[-2])  # Append the value of `h[-2]` to the end of `b`
-        c[0] = h[0] + h[1]  # Set the first value of `c`
-        c[1:] = h[:-1]  # Set values for all but the first entry of `c`
-
-        # Right-hand side
-
-        # Calculate the first value of the right-hand side
-        r[0] = ((h[0] + 2 * c[0]) * h[1] * delta[0] + h[0] ** 2 * delta[1]) / c[0]
-        # Calculate values for all but the first entry of the right-hand side
-        r[1:] = 3 * (h[1:] * delta[:-1] + h[:-1] * delta[1:])
-        # Append a calculated value to the end of the right-hand side
-        r = np.append(
-            r,
-            (h[-1] ** 2 * delta[-2] + (2 * a[-1] + h[-1]) * h[-2] * delta[-1]) / a[-1],
-        )
 
-        # Solve the system of equations defined by the tridiagonal matrix and the right-hand side
-        res = lu_solve(np.diag(a, -1) + np.diag(b) + np.diag(c, 1), r)
+def sort_points(x, y, sorted=False, dtype=None):
+    """
+    Converts the interpolation points to numpy arrays of a floating point type and sorts them by their x coordinate
 
-        # Return the solution with type `float`
-        return res.astype(float)
+    params:
+        x: list of x coordinates
+        y: list of y coordinates (integer samples, e.g. int16, are converted to dtype)
+        sorted (optional): if the points are sorted or not (default: False)
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
 
-    x = np.array(
-        x
-    )  # Convert the input x data into a numpy array, if it is not already one
-    y = np.array(
-        y
-    )  # Convert the input y data into a numpy array, if it is not already one
+    returns:
+        x: sorted numpy array of x coordinates
+        y: numpy array of y coordinates in the same order as x
 
-    if not sorted:  # If the input points are not sorted in ascending order of x values
-        # Sort the points
-        ind = np.argsort(x)  # Get the indices of the sorted array after sorting x
+    raises:
+        ValueError: if dtype is not a floating point type
+    """
+    dtype = np.dtype(float if dtype is None else dtype)
+    if dtype.kind != "f":
+        raise ValueError("The dtype must be a floating point type")
+    x = np.array(x, dtype=dtype)  # Convert the x coordinate input to a numpy array
+    y = np.array(y, dtype=dtype)  # Convert the y coordinate input to a numpy array
+    # If the points are not already sorted (checking it is O(n), sorting is O(n log n))
+    if not sorted and np.any(x[1:] < x[:-1]):
+        ind = np.argsort(x)  # Get the indices of the sorted array
         x = x[ind]  # Sort the x coordinates
         y = y[ind]  # Sort the y coordinates
 
+    return x, y
+
+
+def as_floating(a):
+    """
+    Converts a to a numpy array, keeping its floating point type (integers are converted to float64)
+    """
+    a = np.asarray(a)
+    return a if a.dtype.kind == "f" else a.astype(float)
+
+
+def piecewise_linear_coefficients(x, y, sorted=False, dtype=None):
+    """
+    Computes the slopes of the piecewise linear interpolant, so it can be evaluated with evaluate_piecewise
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        sorted (optional): if the points are sorted or not (default: False)
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        x, y: sorted interpolation points
+        d: slope of the line on every subinterval
+    """
+    x, y = sort_points(x, y, sorted, dtype)
+    d = np.diff(y) / np.diff(x)  # Compute the slopes of the lines
+
+    return x, y, d
+
+
+def cubic_hermite_coefficients(x, y, slopes, sorted=False, dtype=None):
+    """
+    Computes the slopes and the coefficients of a piecewise cubic Hermite interpolant, so it can be evaluated with evaluate_piecewise.
+    All the cubic methods share this pipeline, only the slope rule changes.
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        slopes: slope rule, slopes(h, delta) returns the slopes at the points (pchip_slopes, splineslopes, akima_slopes, ...)
+        sorted (optional): if the points are sorted or not (default: False)
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        x, y: sorted interpolation points
+        d, c, b: coefficients of the cubic y[k] + s*d[k] + s^2*c[k] + s^3*b[k] on every subinterval
+    """
+    x, y = sort_points(x, y, sorted, dtype)
+
     # First derivative
-    h = np.diff(x)  # Calculate the differences between consecutive x values
-    delta = (
-        np.diff(y) / h
-    )  # Calculate the differences between consecutive y values and divide by the differences in x to obtain the first derivative at each point
-
-    d = splineslopes(
-        h, delta
-    )  # Calculate the slopes of the cubic spline using the helper function `splineslopes` and the calculated differences in x and y
-
-    n = len(x)  # Get the number of points
-    c = (3 * delta - 2 * d[:-1] - d[1:]) / (
-        h
-    )  # Calculate the coefficient c for the cubic spline
-    b = (d[:-1] - 2 * delta + d[1:]) / (
-        h**2
-    )  # Calculate the coefficient b for the cubic spline
-
-    k = np.zeros(
-        np.size(u), dtype=int
-    )  # Create an array of zeros with the same number of elements as the input u, with data type integer
-    for j in np.arange(1, n - 1):  # Loop through all values from 1 to n-1
-        k[
-            x[j] <= u
-        ] = j  # If the j-th value in x is less than or equal to u, set the corresponding value in k to j
-
-    s = (
-        u - x[k]
-    )  # Calculate the difference between u and the value in x at the corresponding index in k
-    v = y[k] + s * (
-        d[k] + s * (c[k] + s * b[k])
-    )  # Calculate the value of the cubic spline at each point in u using the calculated coefficients and the differences in x and y
-
-    return v  # Return the calculated value of the cubic spline at each point in u
+    h = np.diff(x)  # Compute the distances between the points in x
+    delta = np.diff(y) / h  # Compute the slopes between the points
+
+    d = slopes(h, delta)  # Compute the slopes for the Hermite cubic with the slope rule
+
+    return (x, y) + hermite_coefficients(h, delta, d)
+
+
+def pchip_coefficients(x, y, sorted=False, dtype=None):
+    """
+    Computes the slopes and the coefficients of the P.C.H.I.P. cubics (see cubic_hermite_coefficients)
+    """
+    return cubic_hermite_coefficients(x, y, pchip_slopes, sorted, dtype)
+
+
+def spline_coefficients(
+    x, y, sorted=False, end_condition="not-a-knot", end_slopes=None, dtype=None
+):
+    """
+    Computes the slopes and the coefficients of the cubic spline with the given end condition (see cubic_hermite_coefficients and spline_factor)
+    """
+    x, y = sort_points(x, y, sorted, dtype)
+    check_periodic(y, end_condition)
+
+    def slopes(h, delta):
+        return splineslopes(h, delta, end_condition, end_slopes)
+
+    return cubic_hermite_coefficients(x, y, slopes, sorted=True, dtype=x.dtype)
+
+
+def check_periodic(y, end_condition):
+    """
+    Periodic splines need the same value at both ends
+
+    raises:
+        ValueError: if the end condition is "periodic" and y[0] != y[-1]
+    """
+    if end_condition == "periodic" and not np.all(np.isclose(y[0], y[-1])):
+        raise ValueError("The periodic spline needs y[0] == y[-1]")
+
+
+def akima_coefficients(x, y, sorted=False, dtype=None):
+    """
+    Computes the slopes and the coefficients of the Akima cubics (see cubic_hermite_coefficients)
+    """
+    return cubic_hermite_coefficients(x, y, akima_slopes, sorted, dtype)
+
+
+def makima_coefficients(x, y, sorted=False, dtype=None):
+    """
+    Computes the slopes and the coefficients of the modified Akima cubics (see cubic_hermite_coefficients)
+    """
+    return cubic_hermite_coefficients(x, y, makima_slopes, sorted, dtype)
+
+
+def steffen_coefficients(x, y, sorted=False, dtype=None):
+    """
+    Computes the slopes and the coefficients of the Steffen cubics (see cubic_hermite_coefficients)
+    """
+    return cubic_hermite_coefficients(x, y, steffen_slopes, sorted, dtype)
+
+
+def hermite_data_coefficients(x, y, dydx, sorted=False, dtype=None):
+    """
+    Computes the coefficients of the cubic Hermite interpolant with the given derivatives (see cubic_hermite_coefficients)
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        dydx: list of derivatives at the points
+        sorted (optional): if the points are sorted or not (default: False)
+        dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+    returns:
+        x, y: sorted interpolation points
+        d, c, b: coefficients of the cubic y[k] + s*d[k] + s^2*c[k] + s^3*b[k] on every subinterval
+
+    raises:
+        ValueError: if x, y and dydx have different lengths
+    """
+    if not len(x) == len(y) == len(dydx):
+        raise ValueError(
+            "The length of the X and Y coordinates and the derivatives must be the same"
+        )
+    # The derivatives are sorted with the points as a second column of y
+    x, yd = sort_points(x, np.stack([y, dydx], axis=-1), sorted, dtype)
+
+    # The slope rule only returns the given derivatives
+    return cubic_hermite_coefficients(
+        x, yd[:, 0], lambda h, delta: yd[:, 1], sorted=True, dtype=x.dtype
+    )
+
+
+def hermite_coefficients(h, delta, d):
+    """
+    Computes the coefficients of the piecewise Hermite cubic with slopes d at the points
+
+    params:
+        h: list of distances between points
+        delta: list of slopes between points
+        d: list of slopes at the points
+
+    returns:
+        d: slopes at the left end of every subinterval
+        c: coefficients of s^2 on every subinterval
+        b: coefficients of s^3 on every subinterval
+    """
+    c = (3 * delta - 2 * d[:-1] - d[1:]) / h  # Coefficients of s^2
+    b = (d[:-1] - 2 * delta + d[1:]) / h**2  # Coefficients of s^3
+
+    return d[:-1], c, b
+
+
+def uniform_spacing(x):
+    """
+    Spacing of the x coordinates when they are uniformly spaced (up to rounding errors), so the subintervals can be found in O(1)
+
+    params:
+        x: sorted list of x coordinates
+
+    returns:
+        h: the spacing (x[-1] - x[0]) / (n - 1), or None if the points are not uniformly spaced
+    """
+    x = np.asarray(x)
+    if len(x) < 2:
+        return None
+    h = (float(x[-1]) - float(x[0])) / (len(x) - 1)
+    # Rounding errors of points like np.linspace are a few units in the last place of the largest coordinate
+    tol = (
+        8
+        * np.finfo(as_floating(x).dtype).eps
+        * max(abs(float(x[0])), abs(float(x[-1])))
+    )
+    return h if np.all(np.abs(np.diff(x) - h) <= tol) else None
+
+
+def uniform_position(u, breaks, h):
+    """
+    Same result as np.searchsorted(breaks, u, side="right") for breaks uniformly spaced by h, computed in O(1) per point:
+    the guess floor((u - breaks[0]) / h) + 1 is computed in the floating point type of u, and then moved until
+    breaks[k-1] <= u < breaks[k], which corrects the rounding errors of the guess (usually one position at most).
+
+    params:
+        u: list of points
+        breaks: sorted uniformly spaced points, up to rounding errors (the last one may be moved a few ulps)
+        h: spacing of the breaks
+
+    returns:
+        k: number of breaks <= u, from 0 at the left of the breaks to len(breaks) at their right
+    """
+    n = len(breaks)
+    t = np.floor((u - breaks[0]) / h)
+    # NaN points go to the right end like in searchsorted (maximum keeps NaN, fmin replaces it), they are never moved below
+    t = np.fmin(np.maximum(t, -1), n - 1)
+    k = np.asarray(t).astype(np.intp) + 1
+
+    while True:
+        # Too far to the right: breaks[k-1] > u, too far to the left: breaks[k] <= u
+        right = (k > 0) & (breaks[np.maximum(k - 1, 0)] > u)
+        left = (k < n) & (breaks[np.minimum(k, n - 1)] <= u)
+        if not (np.any(right) or np.any(left)):
+            return k
+        k -= right
+        k += left
+
+
+def interval_index(x, u, h=None):
+    """
+    Finds the subinterval [x[k], x[k+1]] that contains every point of u, points outside [x[0], x[-1]] get the first or last subinterval
+
+    params:
+        x: sorted list of x coordinates
+        u: list of points
+        h (optional): spacing of x when it is uniform (see uniform_spacing), the search is then O(1) per point (default: None)
+
+    returns:
+        k: index of the subinterval of every point, the largest k in [0, n-2] with x[k] <= u
+    """
+    if h is not None:
+        u = np.asarray(u)
+        u = u.astype(np.result_type(as_floating(u), x), copy=False)
+        return np.clip(uniform_position(u, x, h) - 1, 0, len(x) - 2)
+    return np.searchsorted(x[1:-1], u, side="right")
+
+
+# What is done with the points outside [x[0], x[-1]]
+extrapolations = ("polynomial", "linear", "constant", "nan", "periodic", "raise")
+
+
+def evaluate_piecewise(
+    x, y, u, d, c=None, b=None, out=None, extrapolate="polynomial", uniform=None
+):
+    """
+    Evaluates the piecewise polynomial y[k] + s*(d[k] + s*(c[k] + s*b[k])), with s = u - x[k] and k the subinterval that contains u.
+    Without c and b the polynomial is the piecewise linear y[k] + s*d[k].
+    Only one temporary array of the size of u is allocated apart from the indices and the output, the rest of the Horner expression is done in place.
+    The table (and the uniform grid, when uniform is None) is prepared on every call: to evaluate the same polynomial many
+    times, build it once with piecewise_table and call evaluate_table, or use the interpolant classes, which keep it.
+
+    params:
+        x: sorted list of x coordinates
+        y: list of y coordinates
+        u: list of points where the interpolation is computed
+        d, c, b: coefficients of the polynomial on every subinterval
+        out (optional): array where the result is stored (default: a new array)
+        extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+        uniform (optional): if x is uniformly spaced, see piecewise_table (default: None, detected)
+
+    returns:
+        v: list of values of the interpolation at the points u
+
+    raises:
+        ValueError: if the policy is unknown, or it is "raise" and there are points outside [x[0], x[-1]]
+    """
+    return evaluate_table(piecewise_table(x, y, d, c, b, extrapolate, uniform), u, out)
+
+
+def piecewise_table(x, y, d, c=None, b=None, extrapolate="polynomial", uniform=None):
+    """
+    Table of the piecewise polynomial for evaluate_table, with the subintervals 0..n-2 at the positions 1..n-1 and two more
+    positions, 0 and n, for the points at the left and at the right of [x[0], x[-1]]. The extrapolation policy is only
+    a matter of what polynomial is stored at those two positions, so it is applied in the same pass as the interval search:
+        - "polynomial": the first and the last polynomials are used outside
+        - "linear": the tangent lines at the ends
+        - "constant": y[0] and y[-1]
+        - "nan": NaN
+        - "periodic": u is taken modulo x[-1] - x[0] (for periodic data, e.g. periodic splines)
+        - "raise": ValueError if any point is outside
+
+    params:
+        x: sorted list of x coordinates
+        y: list of y coordinates
+        d, c, b: coefficients of the polynomial on every subinterval
+        extrapolate (optional): extrapolation policy (default: "polynomial")
+        uniform (optional): if x is uniformly spaced, the subintervals are then found in O(1) instead of with a binary search;
+                            None detects it (default: None)
+
+    returns:
+        table: tuple (breaks, x, y, d, c, b, extrapolate, (x[0], x[-1]), h) with n + 1 polynomials and h the spacing of x when it is uniform
+
+    raises:
+        ValueError: if the extrapolation policy is unknown
+    """
+    if extrapolate not in extrapolations:
+        raise ValueError(f"The extrapolation must be one of {extrapolations}")
+    x, y, d = np.asarray(x), np.asarray(y), np.asarray(d)
+    n = len(x)
+    # The table has the floating point type of the coefficients (float32 stays float32)
+    dtype = as_floating(d).dtype if c is None else np.result_type(as_floating(d), c, b)
+
+    # u < x[0] gets position 0, x[k] <= u < x[k+1] position k + 1, and u > x[-1] position n (x[-1] is inside)
+    breaks = x.astype(dtype)
+    breaks[-1] = np.nextafter(breaks[-1], dtype.type(np.inf))
+
+    # Subinterval of every position
+    index = np.concatenate([[0], np.arange(n - 1), [n - 2]])
+    table = [x[index].astype(dtype), y[index].astype(dtype), d[index].astype(dtype)]
+    table += [None if c is None else c[index], None if b is None else b[index]]
+    if c is not None:
+        table[3] = table[3].astype(dtype)
+        table[4] = table[4].astype(dtype)
+
+    if extrapolate in ("linear", "constant", "nan"):
+        xe, ye, de, ce, be = table
+        xe[0], xe[-1] = x[0], x[-1]
+        ye[0], ye[-1] = y[0], y[-1]
+        # Slopes at the ends, the one at the right end is the derivative of the last polynomial
+        h = x[-1] - x[-2]
+        de[-1] = d[n - 2] + (0 if c is None else h * (2 * c[n - 2] + 3 * h * b[n - 2]))
+        if extrapolate != "linear":
+            de[0] = de[-1] = 0
+        if extrapolate == "nan":
+            ye[0] = ye[-1] = np.nan
+        if c is not None:
+            ce[0] = ce[-1] = be[0] = be[-1] = 0
+
+    if uniform is None:
+        h = uniform_spacing(x)
+    else:
+        h = (float(x[-1]) - float(x[0])) / (n - 1) if uniform else None
+
+    return (breaks, *table, extrapolate, (float(x[0]), float(x[-1])), h)
+
+
+def evaluate_table(table, u, out=None):
+    """
+    Evaluates a piecewise polynomial prepared by piecewise_table, the kernel behind evaluate_piecewise
+
+    params:
+        table: the table returned by piecewise_table
+        u: list of points where the interpolation is computed
+        out (optional): array where the result is stored (default: a new array)
+
+    returns:
+        v: list of values of the interpolation at the points u, with one column per column of y when y has several
+
+    raises:
+        ValueError: if the policy is "raise" and there are points outside [x[0], x[-1]]
+    """
+    breaks, x, y, d, c, b, extrapolate, (first, last), h = table
+    # The points are converted once to the type of the table, so integer or float32 points are never taken to float64
+    u = np.asarray(u).astype(x.dtype, copy=False)
+    if extrapolate == "periodic":
+        u = first + np.mod(u - first, last - first)
+
+    if h is not None:  # Uniform grid: the same positions in O(1)
+        k = uniform_position(u, breaks, h)
+    else:
+        k = np.searchsorted(breaks, u, side="right")  # Position of every point
+    if extrapolate == "raise" and np.any((k == 0) | (k == len(breaks))):
+        raise ValueError(f"There are points outside [{first}, {last}]")
+    s = u - x[k]  # Compute the value of s for each index
+    # Several outputs (y with one column per output, e.g. the coordinates of a curve) are evaluated in the same pass
+    s = s.reshape(s.shape + (1,) * (y.ndim - 1))
+
+    if out is None:
+        out = np.empty(np.shape(u) + y.shape[1:], dtype=x.dtype)
+
+    # Horner's rule in place
+    if b is not None:
+        np.take(b, k, axis=0, out=out)
+        out *= s
+        out += c[k]
+        out *= s
+        out += d[k]
+    else:
+        np.take(d, k, axis=0, out=out)
+    out *= s
+    out += y[k]
+
+    return out
+
+
+# Methods whose coefficients can be computed once and then evaluated by evaluate_piecewise
+piecewise_methods = {
+    piecewise_linear: piecewise_linear_coefficients,
+    pchip: pchip_coefficients,
+    splines: spline_coefficients,
+    akima: akima_coefficients,
+    makima: makima_coefficients,
+    steffen: steffen_coefficients,
+}
+
+
+def interpolate_chunks(
+    method,
+    x,
+    y,
+    u,
+    chunk_size=65536,
+    out=None,
+    sorted=False,
+    extrapolate="polynomial",
+    dtype=None,
+):
+    """
+    Evaluates an interpolation method chunk by chunk, so the memory used does not depend on the number of points in u.
+    For the piecewise methods (piecewise_linear, pchip, splines, akima, makima, steffen) the interpolant is computed only once; any other method(x, y, u) is called on every chunk.
+
+    params:
+        method: interpolation method (piecewise_linear, pchip, splines, polinomial, ...)
+        x: list of x coordinates
+        y: list of y coordinates
+        u: points where the interpolation is computed, either an array (also np.memmap) or any iterable of points
+        chunk_size (optional): number of points evaluated at once (default: 65536)
+        out (optional): array (also np.memmap) where the results are stored, it must be at least as long as u
+        sorted (optional): if the points are sorted or not (default: False)
+        extrapolate (optional): extrapolation policy of the piecewise methods, see piecewise_table (default: "polynomial")
+        dtype (optional): floating point type of the piecewise methods, see sort_points (default: np.float64)
+
+    yields:
+        v: values of the interpolation at the points of every chunk (a view of out when given)
+
+    raises:
+        ValueError: if chunk_size is not positive, out is shorter than u or an extrapolation policy or a dtype is given for a method that is not piecewise
+    """
+    if method in piecewise_methods:  # Compute the interpolant only once
+        x, y, *coeffs = piecewise_methods[method](x, y, sorted, dtype=dtype)
+        table = piecewise_table(x, y, *coeffs, extrapolate=extrapolate)
+
+        def evaluate(chunk, out_chunk):
+            return evaluate_table(table, chunk, out=out_chunk)
+
+    elif extrapolate != "polynomial" or dtype is not None:
+        raise ValueError(
+            "Only the piecewise methods have extrapolation policies and dtypes"
+        )
+
+    else:  # Methods with no coefficients are evaluated from scratch on every chunk
+
+        def evaluate(chunk, out_chunk):
+            if out_chunk is None:
+                return method(x, y, chunk)
+            out_chunk[:] = method(x, y, chunk)
+            return out_chunk
+
+    return evaluate_chunks(evaluate, u, chunk_size, out)
+
+
+def evaluate_chunks(evaluate, u, chunk_size=65536, out=None):
+    """
+    Evaluates consecutive chunks of u with evaluate(chunk, out_chunk), the engine behind interpolate_chunks and PiecewiseInterpolant.chunks
+
+    params:
+        evaluate: function that evaluates a chunk of points, writing in out_chunk when it is not None
+        u: points where the interpolation is computed, either an array (also np.memmap) or any iterable of points
+        chunk_size (optional): number of points evaluated at once (default: 65536)
+        out (optional): array where the results are stored, it must be at least as long as u
+
+    returns:
+        generator of the values of every chunk (views of out when given)
+
+    raises:
+        ValueError: if chunk_size is not positive or out is shorter than u
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive integer")
+
+    if isinstance(u, np.ndarray):  # Arrays and memory maps are sliced lazily
+        if out is not None and len(out) < len(u):
+            raise ValueError("The output buffer is shorter than u")
+        chunks = (u[i : i + chunk_size] for i in range(0, len(u), chunk_size))
+    else:  # Any other iterable is consumed chunk_size points at a time
+        iterator = iter(u)
+        chunks = (
+            np.fromiter(itertools.islice(iterator, chunk_size), dtype=float)
+            for _ in itertools.count()
+        )
+
+    def generator():
+        start = 0
+        for chunk in chunks:
+            if len(chunk) == 0:  # The iterable is exhausted
+                return
+            stop = start + len(chunk)
+            if out is not None and len(out) < stop:
+                raise ValueError("The output buffer is shorter than u")
+            yield evaluate(chunk, None if out is None else out[start:stop])
+            start = stop
+
+    return generator()
+
+
+class PiecewiseInterpolant:
+    """
+    Piecewise polynomial interpolant y[k] + s*(d[k] + s*(c[k] + s*b[k])) that is computed once and then evaluated as many times as needed.
+    Points can be inserted, removed or moved, and only the coefficients affected by the change are computed again.
+
+    Subclasses define:
+        - fit(): computes all the coefficients from self.x and self.y
+        - update(lo, hi): computes again the coefficients that depend on the points lo..hi
+        - node_coefficients / interval_coefficients: names of the coefficient arrays with one value per point / per subinterval
+        - min_points: minimum number of points of the interpolant
+    """
+
+    node_coefficients = ()
+    interval_coefficients = ()
+    min_points = 2
+
+    def __init__(self, x, y, sorted=False, extrapolate="polynomial", dtype=None):
+        """
+        Sorts the points and computes the coefficients of the interpolant
+
+        params:
+            x: list of x coordinates
+            y: list of y coordinates
+            sorted (optional): if the points are sorted or not (default: False)
+            extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+            dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+        raises:
+            ValueError: if x and y have different lengths, x has repeated values, there are not enough points,
+                        the extrapolation policy is unknown or dtype is not a floating point type
+        """
+        if extrapolate not in extrapolations:
+            raise ValueError(f"The extrapolation must be one of {extrapolations}")
+        if len(x) != len(y):
+            raise ValueError("The length of the X and Y coordinates must be the same")
+        x, y = sort_points(x, y, sorted, dtype)
+        if len(x) < self.min_points:
+            raise ValueError(f"At least {self.min_points} points are needed")
+        if np.any(np.diff(x) == 0):
+            raise ValueError("The x coordinates must be different")
+
+        self.x = x  # Sorted x coordinates
+        self.y = y  # y coordinates in the same order
+        self.d, self.c, self.b = None, None, None  # Coefficients of the polynomials
+        self.extrapolate = extrapolate
+        # Spacing of x when it is uniform (see uniform_spacing), detected once here and kept by update_spacing
+        self.spacing = uniform_spacing(x)
+        # Table for evaluate_table, built on the first evaluation and dropped whenever the points change
+        self.table = None
+        self.fit()
+
+    def __call__(self, u, out=None):
+        """
+        Evaluates the interpolant at the points u
+
+        params:
+            u: list of points where the interpolation is computed
+            out (optional): array where the result is stored (default: a new array)
+
+        returns:
+            v: list of values of the interpolation at the points u
+
+        raises:
+            ValueError: if the extrapolation policy is "raise" and there are points outside [x[0], x[-1]]
+        """
+        if self.table is None or self.table[6] != self.extrapolate:
+            self.table = piecewise_table(
+                self.x,
+                self.y,
+                self.d,
+                self.c,
+                self.b,
+                self.extrapolate,
+                uniform=self.spacing is not None,
+            )
+        return evaluate_table(self.table, u, out=out)
+
+    def chunks(self, u, chunk_size=65536, out=None):
+        """
+        Evaluates the interpolant chunk by chunk (see interpolate_chunks)
+
+        params:
+            u: points where the interpolation is computed, either an array (also np.memmap) or any iterable of points
+            chunk_size (optional): number of points evaluated at once (default: 65536)
+            out (optional): array where the results are stored, it must be at least as long as u
+
+        returns:
+            generator of the values of every chunk (views of out when given)
+        """
+        return evaluate_chunks(lambda chunk, o: self(chunk, o), u, chunk_size, out)
+
+    def insert(self, x_i, y_i):
+        """
+        Inserts the point (x_i, y_i), updating only the affected coefficients
+
+        params:
+            x_i, y_i: coordinates of the new point
+
+        returns:
+            i: index of the new point in the sorted points
+
+        raises:
+            ValueError: if there is already a point with the same x coordinate
+        """
+        i = int(np.searchsorted(self.x, x_i))
+        if i < len(self.x) and self.x[i] == x_i:
+            raise ValueError("The x coordinates must be different")
+
+        self.table = None
+        self.insert_point(i, x_i, y_i)
+        self.update_spacing(i)
+        self.update(i, i)
+        return i
+
+    def remove(self, i):
+        """
+        Removes the i-th point (in sorted order), updating only the affected coefficients
+
+        params:
+            i: index of the point
+
+        raises:
+            ValueError: if the interpolant would have less than min_points points
+        """
+        if len(self.x) <= self.min_points:
+            raise ValueError(f"At least {self.min_points} points are needed")
+        i = range(len(self.x))[i]  # Support negative indices, raises IndexError
+
+        self.table = None
+        self.remove_point(i)
+        self.update_spacing(i)
+        self.update(max(i - 1, 0), min(i, len(self.x) - 1))
+
+    def move(self, i, x_new, y_new):
+        """
+        Moves the i-th point (in sorted order) to (x_new, y_new), updating only the affected coefficients
+
+        params:
+            i: index of the point
+            x_new, y_new: new coordinates of the point
+
+        returns:
+            i: new index of the point in the sorted points
+
+        raises:
+            ValueError: if there is already another point with the same x coordinate
+        """
+        i = range(len(self.x))[i]  # Support negative indices, raises IndexError
+        j = int(np.searchsorted(self.x, x_new))
+        if j < len(self.x) and self.x[j] == x_new and j != i:
+            raise ValueError("The x coordinates must be different")
+
+        self.table = None
+        if (i == 0 or self.x[i - 1] < x_new) and (
+            i == len(self.x) - 1 or x_new < self.x[i + 1]
+        ):  # The order of the points does not change
+            self.x[i], self.y[i] = x_new, y_new
+            self.update_spacing(i)
+            self.update(i, i)
+            return i
+
+        # The point jumps over its neighbours: remove it and insert it in its new place
+        self.remove_point(i)
+        self.update_spacing(i)
+        j = int(np.searchsorted(self.x, x_new))
+        self.insert_point(j, x_new, y_new)
+        self.update_spacing(j)
+        # Update around the new point and around the gap left by the old one
+        gap = (i - 1, i) if j > i else (i, i + 1)
+        self.update(j, j)
+        self.update(max(gap[0], 0), min(gap[1], len(self.x) - 1))
+        return j
+
+    def update_spacing(self, i):
+        """
+        Keeps self.spacing after the points around i changed, in O(1): the other subintervals did not change, so the grid
+        is still uniform if its spacing is the same and the subintervals around i have that spacing
+        """
+        if self.spacing is None:
+            return
+        spacing = (float(self.x[-1]) - float(self.x[0])) / (len(self.x) - 1)
+        # Same tolerance as uniform_spacing
+        tol = 8 * np.finfo(self.x.dtype).eps * max(abs(self.x[0]), abs(self.x[-1]))
+        gaps = np.diff(self.x[max(i - 2, 0) : i + 3])
+        uniform = abs(spacing - self.spacing) <= tol and np.all(
+            np.abs(gaps - spacing) <= tol
+        )
+        self.spacing = spacing if uniform else None
+
+    def insert_point(self, i, x_i, y_i):
+        """
+        Inserts the point in the arrays, leaving room in the coefficients (the new values must be computed by update)
+        """
+        self.x = np.insert(self.x, i, x_i)
+        self.y = np.insert(self.y, i, y_i)
+        for name in self.node_coefficients:
+            setattr(self, name, np.insert(getattr(self, name), i, 0))
+        for name in self.interval_coefficients:
+            values = getattr(self, name)
+            setattr(self, name, np.insert(values, min(i, len(values)), 0))
+
+    def remove_point(self, i):
+        """
+        Removes the point from the arrays, and one subinterval from the coefficients (the new values must be computed by update)
+        """
+        self.x = np.delete(self.x, i)
+        self.y = np.delete(self.y, i)
+        for name in self.node_coefficients:
+            setattr(self, name, np.delete(getattr(self, name), i))
+        for name in self.interval_coefficients:
+            values = getattr(self, name)
+            setattr(self, name, np.delete(values, min(i, len(values) - 1)))
+
+    def fit(self):
+        raise NotImplementedError
+
+    def update(self, lo, hi):
+        """
+        Computes again the coefficients that depend on the points lo..hi, by default all of them
+        """
+        self.fit()
+
+
+class PiecewiseLinear(PiecewiseInterpolant):
+    """
+    Piecewise linear interpolant (see piecewise_linear)
+    """
+
+    interval_coefficients = ("d",)
+
+    def fit(self):
+        self.d = np.diff(self.y) / np.diff(self.x)  # Slopes of the lines
+
+    def update(self, lo, hi):
+        # Only the lines that end in one of the points lo..hi change
+        k0, k1 = max(lo - 1, 0), min(hi + 1, len(self.x) - 1)
+        self.d[k0:k1] = np.diff(self.y[k0 : k1 + 1]) / np.diff(self.x[k0 : k1 + 1])
+
+
+class HermiteInterpolant(PiecewiseInterpolant):
+    """
+    Piecewise cubic Hermite interpolant whose slope at every point only depends on its neighbours.
+    The slope at the point j depends on the points j-radius..j+radius, except near the ends where the end conditions are used.
+    Subclasses define slopes(h, delta), that returns the slopes at all the points.
+    """
+
+    node_coefficients = ("d",)
+    interval_coefficients = ("c", "b")
+    radius = 1
+    min_points = 4
+
+    def slopes(self, h, delta):
+        raise NotImplementedError
+
+    def fit(self):
+        h = np.diff(self.x)
+        delta = np.diff(self.y) / h
+        self.d = self.slopes(h, delta)
+        _, self.c, self.b = hermite_coefficients(h, delta, self.d)
+
+    def update(self, lo, hi):
+        n, r = len(self.x), self.radius
+        # Points whose slope changes, the end conditions use the 3 subintervals closest to the ends
+        first = 0 if lo <= r + 2 else lo - r
+        last = n - 1 if hi >= n - 1 - (r + 2) else hi + r
+        # Window of points used to compute those slopes (one extra point at each side, so it is never too short)
+        start, stop = max(first - r - 1, 0), min(last + r + 1, n - 1)
+        if start == 0 and stop == n - 1:
+            return self.fit()
+
+        h = np.diff(self.x[start : stop + 1])
+        delta = np.diff(self.y[start : stop + 1]) / h
+        self.d[first : last + 1] = self.slopes(h, delta)[
+            first - start : last - start + 1
+        ]
+
+        # Subintervals that touch one of the new slopes
+        k0, k1 = max(first - 1, 0), min(last, n - 2)
+        _, self.c[k0 : k1 + 1], self.b[k0 : k1 + 1] = hermite_coefficients(
+            h[k0 - start : k1 - start + 1],
+            delta[k0 - start : k1 - start + 1],
+            self.d[k0 : k1 + 2],
+        )
+
+
+class Pchip(HermiteInterpolant):
+    """
+    Piecewise Cubic Hermite Interpolation Polynomial (see pchip)
+    """
+
+    def slopes(self, h, delta):
+        return pchip_slopes(h, delta)
+
+
+class Akima(HermiteInterpolant):
+    """
+    Akima interpolant (see akima)
+    """
+
+    radius = 2
+
+    def slopes(self, h, delta):
+        return akima_slopes(h, delta)
+
+
+class Makima(Akima):
+    """
+    Modified Akima interpolant (see makima)
+    """
+
+    def slopes(self, h, delta):
+        return makima_slopes(h, delta)
+
+
+class Steffen(HermiteInterpolant):
+    """
+    Steffen monotone interpolant (see steffen)
+    """
+
+    def slopes(self, h, delta):
+        return steffen_slopes(h, delta)
+
+
+class CubicHermite(PiecewiseInterpolant):
+    """
+    Cubic Hermite interpolant with the given derivatives (see hermite).
+    Every slope is given, so a change of a point only changes the cubics of the two subintervals around it.
+    """
+
+    node_coefficients = ("d",)
+    interval_coefficients = ("c", "b")
+
+    def __init__(self, x, y, dydx, sorted=False, extrapolate="polynomial", dtype=None):
+        """
+        Sorts the points and computes the coefficients of the interpolant
+
+        params:
+            x: list of x coordinates
+            y: list of y coordinates
+            dydx: list of derivatives at the points
+            sorted (optional): if the points are sorted or not (default: False)
+            extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+            dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+        raises:
+            ValueError: if x, y and dydx have different lengths, x has repeated values, there are not enough points,
+                        the extrapolation policy is unknown or dtype is not a floating point type
+        """
+        if not len(x) == len(y) == len(dydx):
+            raise ValueError(
+                "The length of the X and Y coordinates and the derivatives must be the same"
+            )
+        x, yd = sort_points(x, np.stack([y, dydx], axis=-1), sorted, dtype)
+        # Derivatives of the first fit, afterwards the slopes d are updated with the points
+        self.dydx = yd[:, 1]
+        super().__init__(x, yd[:, 0], True, extrapolate, x.dtype)
+
+    def fit(self):
+        if self.d is None:
+            self.d = self.dydx
+        h = np.diff(self.x)
+        _, self.c, self.b = hermite_coefficients(h, np.diff(self.y) / h, self.d)
+
+    def update(self, lo, hi):
+        # Only the cubics of the subintervals that end in one of the points lo..hi change
+        k0, k1 = max(lo - 1, 0), min(hi, len(self.x) - 2)
+        h = np.diff(self.x[k0 : k1 + 2])
+        _, self.c[k0 : k1 + 1], self.b[k0 : k1 + 1] = hermite_coefficients(
+            h, np.diff(self.y[k0 : k1 + 2]) / h, self.d[k0 : k1 + 2]
+        )
+
+    def insert(self, x_i, y_i, dydx_i):
+        """
+        Inserts the point (x_i, y_i) with derivative dydx_i, updating only the two cubics around it
+
+        params:
+            x_i, y_i: coordinates of the new point
+            dydx_i: derivative at the new point
+
+        returns:
+            i: index of the new point in the sorted points
+
+        raises:
+            ValueError: if there is already a point with the same x coordinate
+        """
+        i = super().insert(x_i, y_i)
+        self.d[i] = dydx_i
+        self.update(i, i)
+        return i
+
+    def move(self, i, x_new, y_new, dydx_new=None):
+        """
+        Moves the i-th point (in sorted order) to (x_new, y_new), with a new derivative if given
+
+        params:
+            i: index of the point
+            x_new, y_new: new coordinates of the point
+            dydx_new (optional): new derivative at the point (default: the current one)
+
+        returns:
+            i: new index of the point in the sorted points
+
+        raises:
+            ValueError: if there is already another point with the same x coordinate
+        """
+        dydx = self.d[i] if dydx_new is None else dydx_new
+        j = super().move(i, x_new, y_new)
+        self.d[j] = dydx
+        self.update(j, j)
+        return j
+
+
+class Spline(HermiteInterpolant):
+    """
+    Cubic interpolatory spline (see splines), not-a-knot by default.
+    The slopes depend on all the points, so every change of x solves again the tridiagonal system in O(n).
+    The factorization of the system only depends on x and is kept, so refit(y) only needs a forward and a backward sweep.
+    """
+
+    def __init__(
+        self,
+        x,
+        y,
+        sorted=False,
+        end_condition="not-a-knot",
+        end_slopes=None,
+        extrapolate="polynomial",
+        dtype=None,
+    ):
+        """
+        Sorts the points and computes the coefficients of the spline
+
+        params:
+            x: list of x coordinates
+            y: list of y coordinates
+            sorted (optional): if the points are sorted or not (default: False)
+            end_condition (optional): "not-a-knot", "natural", "clamped" or "periodic", see spline_factor (default: "not-a-knot")
+            end_slopes (optional): slopes at the first and last points for "clamped" (default: (0, 0))
+            extrapolate (optional): what is done with the points outside [x[0], x[-1]], see piecewise_table (default: "polynomial")
+            dtype (optional): floating point type of the computations, e.g. np.float32 to halve the memory (default: np.float64)
+
+        raises:
+            ValueError: if x and y have different lengths, x has repeated values, there are not enough points,
+                        the end condition or the extrapolation policy is unknown, dtype is not a floating point type
+                        or y[0] != y[-1] for "periodic"
+        """
+        if end_condition not in end_conditions:
+            raise ValueError(f"The end condition must be one of {end_conditions}")
+        self.end_condition = end_condition
+        self.end_slopes = end_slopes
+        self.min_points = 4 if end_condition == "not-a-knot" else 2
+        if end_condition == "periodic":
+            self.min_points = 3
+        self.factor = (
+            None  # Factorization of the system of the slopes, it only depends on x
+        )
+        super().__init__(x, y, sorted, extrapolate, dtype)
+
+    def slopes(self, h, delta):
+        return splineslopes(
+            h, delta, self.end_condition, self.end_slopes, factor=self.factor
+        )
+
+    def fit(self):
+        check_periodic(self.y, self.end_condition)
+        self.factor = spline_factor(np.diff(self.x), self.end_condition)
+        super().fit()
+
+    def update(self, lo, hi):
+        self.fit()
+
+    def refit(self, y, end_slopes=None):
+        """
+        Changes all the y coordinates (in the order of self.x), reusing the factorization of the system in O(n)
+
+        params:
+            y: new y coordinates
+            end_slopes (optional): new slopes at the ends for "clamped" (default: the current ones)
+
+        raises:
+            ValueError: if y does not have one value per point or y[0] != y[-1] for "periodic"
+        """
+        y = np.asarray(y, dtype=self.x.dtype)
+        if y.shape != self.x.shape:
+            raise ValueError("There must be one y coordinate per point")
+        check_periodic(y, self.end_condition)
+        if end_slopes is not None:
+            self.end_slopes = end_slopes
+        self.y = y.copy()
+        self.table = None
+        super().fit()
+
+
+def sample_function(f, x, executor=None, batch_size=1024):
+    """
+    Evaluates the vectorized function f at the points x in batches of batch_size points.
+    With an executor the batches are evaluated in parallel with executor.map, e.g. a concurrent.futures.ProcessPoolExecutor
+    (f must then be picklable: a module level function, not a lambda).
+
+    params:
+        f: vectorized function, f(x) with x an array
+        x: points where f is evaluated
+        executor (optional): object with a map method that evaluates the batches (default: None, evaluated here one after another)
+        batch_size (optional): number of points of every call to f (default: 1024)
+
+    returns:
+        y: values of f at the points x
+    """
+    x = np.asarray(x, dtype=float)
+    batches = [x[i : i + batch_size] for i in range(0, len(x), batch_size)]
+    values = (map if executor is None else executor.map)(f, batches)
+    y = np.empty(len(x))
+    for batch, (start, v) in zip(batches, enumerate(values)):
+        start *= batch_size
+        y[start : start + len(batch)] = np.broadcast_to(
+            np.asarray(v, dtype=float), batch.shape
+        )
+    return y
+
+
+def local_polynomial(x, y, u, degree=5):
+    """
+    Value at every point u[k] of the polynomial of the given degree through the degree + 1 points of x closest to the subinterval [x[k], x[k+1]].
+    All the stencils are evaluated at once in barycentric form.
+
+    params:
+        x: sorted list of x coordinates
+        y: list of y coordinates
+        u: one point inside every subinterval (n - 1 points), not equal to any point of x
+        degree (optional): degree of the polynomials, reduced to len(x) - 1 if there are not enough points (default: 5)
+
+    returns:
+        v: value of the local polynomial of every subinterval at its point
+    """
+    size = min(degree + 1, len(x))
+    first = np.clip(np.arange(len(x) - 1) - (size - 2) // 2, 0, len(x) - size)
+    index = first[:, None] + np.arange(size)
+    X, Y = x[index], y[index]
+
+    differences = X[:, :, None] - X[:, None, :]
+    differences[:, np.arange(size), np.arange(size)] = 1
+    w = 1 / np.prod(differences, axis=2)  # Barycentric weights of every stencil
+    r = w / (np.asarray(u)[:, None] - X)
+    return np.sum(r * Y, axis=1) / np.sum(r, axis=1)
+
+
+# Fitted interpolants that adaptive_interpolant can build
+adaptive_methods = {"pchip": Pchip, "spline": Spline}
+
+
+def adaptive_interpolant(
+    f,
+    a,
+    b,
+    method="pchip",
+    tol=1e-6,
+    n=9,
+    max_points=100000,
+    executor=None,
+    batch_size=1024,
+    checks=7,
+):
+    """
+    Samples f adaptively in [a, b], starting from n equispaced points and adding the midpoints of the subintervals where the error is larger than tol.
+        1. The error of every subinterval is estimated, without evaluating f, as the difference at its midpoint between the interpolant
+           and the polynomial of degree 5 through the 6 closest points (see local_polynomial), which is of higher order.
+        2. f is evaluated (in batches, see sample_function) at the midpoints of the subintervals with a large estimate, and they are added.
+        3. When no estimate is above tol, f is evaluated at the checks Chebyshev points of every subinterval (the midpoint is one of them)
+           and the interpolant is accepted if they are all within tol of f. Otherwise, the midpoints of the subintervals that are not
+           are added and the process goes on.
+    The error is only measured at the check points, so it is not a bound of the error between them: the cubic interpolants have their
+    largest errors inside every subinterval, where the check points are dense enough to find them for smooth f, but a feature of f
+    narrower than the subintervals can be missed.
+
+    params:
+        f: vectorized function to interpolate, f(x) with x an array
+        a, b: ends of the interval
+        method (optional): "pchip" or "spline" (default: "pchip")
+        tol (optional): absolute tolerance of the error (default: 1e-6)
+        n (optional): number of points of the initial grid, at least 4 (default: 9)
+        max_points (optional): maximum number of points of the interpolant (default: 100000)
+        executor (optional): executor where f is evaluated, see sample_function (default: None)
+        batch_size (optional): number of points of every call to f (default: 1024)
+        checks (optional): number of check points per subinterval in the last step, odd (default: 7)
+
+    returns:
+        interpolant: the fitted Pchip or Spline
+        error: largest error |f - interpolant| measured at the check points (or estimated at the midpoints if max_points is reached
+               before the last step), at most tol unless max_points is reached
+
+    raises:
+        ValueError: if the method is unknown, a >= b, n < 4 or checks is not a positive odd number
+    """
+    if method not in adaptive_methods:
+        raise ValueError(f"The method must be one of {list(adaptive_methods)}")
+    if a >= b or n < 4:
+        raise ValueError(
+            "The interval must satisfy a < b and the initial grid needs 4 points"
+        )
+    if checks < 1 or checks % 2 == 0:
+        raise ValueError("The number of check points must be a positive odd number")
+
+    # Chebyshev points of [-1, 1], the middle one is exactly 0 so the midpoints are checked too
+    nodes = np.cos((2 * np.arange(checks) + 1) * np.pi / (2 * checks))
+    nodes[checks // 2] = 0
+
+    x = np.linspace(a, b, n)
+    y = sample_function(f, x, executor, batch_size)
+    while True:
+        interpolant = adaptive_methods[method](x, y, sorted=True)
+        middle = (x[:-1] + x[1:]) / 2
+        estimate = np.abs(local_polynomial(x, y, middle) - interpolant(middle))
+        refine = estimate > tol
+        if refine.any():
+            new_x = middle[refine]
+            new_y = sample_function(f, new_x, executor, batch_size)
+            error = np.max(estimate)
+        else:  # Check the interpolant against f at the Chebyshev points of every subinterval
+            points = middle[:, None] + (np.diff(x) / 2)[:, None] * nodes
+            values = sample_function(f, points.ravel(), executor, batch_size)
+            values = values.reshape(points.shape)
+            errors = np.abs(values - interpolant(points.ravel()).reshape(points.shape))
+            error = np.max(errors)
+            refine = np.max(errors, axis=1) > tol
+            if not refine.any():
+                return interpolant, error
+            new_x, new_y = middle[refine], values[refine, checks // 2]
+
+        if len(x) + len(new_x) > max_points:
+            return interpolant, error
+
+        # Merge the new points, both lists are sorted
+        order = np.argsort(np.concatenate([x, new_x]), kind="stable")
+        x = np.concatenate([x, new_x])[order]
+        y = np.concatenate([y, new_y])[order]
+
+
+class GridInterpolator:
+    """
+    Interpolation of values on an N-dimensional rectilinear grid in tensor-product form, the same result as interpolating along every axis one after the other (the last axis first) with the 1-D method:
+        - "linear": multilinear interpolation, it uses the 2^N corners of the cell of every point
+        - "pchip", "steffen": P.C.H.I.P. or Steffen along every axis, they use the 4^N grid values around every point
+        - "akima", "makima": (modified) Akima along every axis, they use the 6^N grid values around every point
+        - "spline": not-a-knot cubic splines along every axis, the derivatives of the splines are computed once when the interpolator is created
+    Only the grid values around the points are read, so values can be a np.memmap of a grid that does not fit in memory.
+    """
+
+    methods = {
+        "linear": 2,
+        "pchip": 4,
+        "spline": 4,
+        "akima": 3,
+        "makima": 3,
+        "steffen": 3,
+    }  # Method: minimum points per axis
+    # Local methods: slope rule and number of grid points around a point that determine its value along an axis
+    local_methods = {
+        "pchip": (pchip_slopes, 4),
+        "steffen": (steffen_slopes, 4),
+        "akima": (akima_slopes, 6),
+        "makima": (makima_slopes, 6),
+    }
+
+    def __init__(self, points, values, method="linear", derivatives_dir=None):
+        """
+        Checks the grid and, for splines, computes the derivatives at the grid points
+
+        params:
+            points: list with the sorted coordinates of the grid along every axis
+            values: array of values on the grid, with one axis per list of points (it can be a np.memmap)
+            method (optional): "linear", "pchip", "spline", "akima", "makima" or "steffen" (default: "linear")
+            derivatives_dir (optional): folder where the derivatives of the splines are stored as memory mapped .npy files, instead of memory (default: None)
+
+        raises:
+            ValueError: if the method is unknown, the shape of values does not match the grid or the coordinates of an axis are not increasing
+        """
+        if method not in self.methods:
+            raise ValueError(f"The method must be one of {list(self.methods)}")
+        self.points = [np.asarray(p, dtype=float) for p in points]
+        self.values = values if isinstance(values, np.ndarray) else np.asarray(values)
+        if self.values.shape != tuple(len(p) for p in self.points):
+            raise ValueError("The shape of the values does not match the grid")
+        for p in self.points:
+            if len(p) < self.methods[method]:
+                raise ValueError(
+                    f"The {method} method needs {self.methods[method]} points per axis"
+                )
+            if np.any(np.diff(p) <= 0):
+                raise ValueError("The grid coordinates must be strictly increasing")
+
+        self.method = method
+        self.ndim = len(self.points)
+        # Spacing of the uniform axes, where the subintervals are found in O(1)
+        self.spacings = [uniform_spacing(p) for p in self.points]
+        self.derivatives = {}  # Axes of the derivative: derivative on the grid
+        if method == "spline":
+            self.spline_derivatives(derivatives_dir)
+
+    def spline_derivatives(self, derivatives_dir=None):
+        """
+        Computes the derivatives of the tensor-product spline at the grid points, for every non-empty set of axes A
+        the derivative with respect to the axes in A is the spline slopes along the last axis of A of the derivative with respect to the rest of A.
+        The slopes are computed slab by slab, so only one slab of the grid is in memory at a time.
+
+        params:
+            derivatives_dir (optional): folder where the derivatives are stored as memory mapped .npy files (default: None)
+        """
+        for size in range(1, self.ndim + 1):
+            for axes in itertools.combinations(range(self.ndim), size):
+                source = self.derivatives.get(axes[:-1], self.values)
+                if derivatives_dir is None:
+                    target = np.empty(self.values.shape)
+                else:
+                    target = np.lib.format.open_memmap(
+                        os.path.join(
+                            derivatives_dir, f"d{''.join(map(str, axes))}.npy"
+                        ),
+                        mode="w+",
+                        dtype=float,
+                        shape=self.values.shape,
+                    )
+                self.slopes_along(source, axes[-1], target)
+                self.derivatives[axes] = target
+
+    def slopes_along(self, source, axis, target):
+        """
+        Stores in target the spline slopes of source along the given axis
+        """
+        h = np.diff(self.points[axis])
+        factor = spline_factor(h)  # The same system for every line along the axis
+        if self.ndim == 1:
+            target[:] = splineslopes(h, np.diff(source) / h, factor=factor)
+            return
+
+        other = 1 if axis == 0 else 0  # Axis used to split the grid in slabs
+        slab_axis = axis - (axis > other)  # Axis of the slopes inside a slab
+        index = [slice(None)] * self.ndim
+        for i in range(source.shape[other]):
+            index[other] = i
+            lines = np.moveaxis(np.asarray(source[tuple(index)]), slab_axis, 0)
+            delta = np.diff(lines, axis=0) / h.reshape((-1,) + (1,) * (lines.ndim - 1))
+            target[tuple(index)] = np.moveaxis(
+                splineslopes(h, delta, factor=factor), 0, slab_axis
+            )
+
+    def __call__(self, xi, chunk_size=65536, out=None):
+        """
+        Evaluates the interpolant at the points xi, chunk_size points at a time. The local methods read 4^N or 6^N grid values
+        per point, so their chunks have chunk_size grid values instead of points.
+
+        params:
+            xi: array of points, the last axis has the N coordinates of every point
+            chunk_size (optional): number of points (grid values for the local methods) evaluated at once (default: 65536)
+            out (optional): array with shape xi.shape[:-1] where the result is stored (default: a new array)
+
+        returns:
+            v: values of the interpolation at the points xi, with shape xi.shape[:-1] (out when given)
+
+        raises:
+            ValueError: if the points do not have N coordinates or out does not have the shape of the result
+        """
+        xi = np.asarray(xi, dtype=float)
+        if xi.shape[-1] != self.ndim:
+            raise ValueError(f"The points must have {self.ndim} coordinates")
+        if out is not None and out.shape != xi.shape[:-1]:
+            raise ValueError(f"out must have shape {xi.shape[:-1]}")
+        points = xi.reshape(-1, self.ndim)
+        if self.method in self.local_methods:
+            stencil = np.prod(
+                [min(self.local_methods[self.method][1], len(p)) for p in self.points]
+            )
+            chunk_size = -(-chunk_size // stencil)  # At least one point per chunk
+        # The result is written directly in out only if it is a flat view of it, otherwise it is copied at the end
+        direct = out is not None and out.dtype == float and out.flags.c_contiguous
+        v = out.reshape(-1) if direct else np.empty(len(points))
+
+        for _ in evaluate_chunks(self.evaluate, points, chunk_size, v):
+            pass
+
+        if out is None:
+            return v.reshape(xi.shape[:-1])
+        if not direct:
+            out[...] = v.reshape(out.shape)
+        return out
+
+    def evaluate(self, xi, out):
+        """
+        Evaluates the interpolant at the points xi (one point per row) and stores the result in out
+        """
+        k = [
+            interval_index(p, xi[:, a], self.spacings[a])
+            for a, p in enumerate(self.points)
+        ]
+
+        if self.method in self.local_methods:
+            out[:] = self.evaluate_local(xi, k)
+            return out
+
+        # Position of every point inside its cell along every axis
+        h = [p[k[a] + 1] - p[k[a]] for a, p in enumerate(self.points)]
+        t = [(xi[:, a] - p[k[a]]) / h[a] for a, p in enumerate(self.points)]
+
+        out[:] = 0
+        for corner in itertools.product((0, 1), repeat=self.ndim):
+            index = tuple(k[a] + corner[a] for a in range(self.ndim))
+            if self.method == "linear":
+                weights = [t[a] if corner[a] else 1 - t[a] for a in range(self.ndim)]
+                out += np.prod(weights, axis=0) * self.values[index]
+                continue
+
+            # Cubic Hermite basis: value and derivative basis functions of this corner
+            value_basis = [
+                t[a] ** 2 * (3 - 2 * t[a])
+                if corner[a]
+                else 1 - t[a] ** 2 * (3 - 2 * t[a])
+                for a in range(self.ndim)
+            ]
+            slope_basis = [
+                h[a] * t[a] ** 2 * (t[a] - 1)
+                if corner[a]
+                else h[a] * t[a] * (t[a] - 1) ** 2
+                for a in range(self.ndim)
+            ]
+            out += np.prod(value_basis, axis=0) * self.values[index]
+            for axes, derivative in self.derivatives.items():
+                basis = [
+                    slope_basis[a] if a in axes else value_basis[a]
+                    for a in range(self.ndim)
+                ]
+                out += np.prod(basis, axis=0) * derivative[index]
+
+        return out
+
+    def evaluate_local(self, xi, k):
+        """
+        Evaluates a local method along every axis with the grid points around every point (the slopes and end conditions only need them)
+        """
+        m = len(xi)
+        slopes, size = self.local_methods[self.method]
+        # Grid points around every point along every axis: the first one and how many (the whole axis if it is shorter)
+        sizes = [min(size, len(p)) for p in self.points]
+        first = [
+            np.clip(k[a] - (sizes[a] - 2) // 2, 0, len(p) - sizes[a])
+            for a, p in enumerate(self.points)
+        ]
+        index = tuple(
+            (first[a][:, None] + np.arange(sizes[a])).reshape(
+                (m,) + (1,) * a + (sizes[a],) + (1,) * (self.ndim - a - 1)
+            )
+            for a in range(self.ndim)
+        )
+        block = np.asarray(
+            self.values[index], dtype=float
+        )  # Shape (m, sizes[0], ..., sizes[-1])
+
+        for a in range(self.ndim - 1, -1, -1):  # Interpolate along the last axis first
+            lines = np.moveaxis(block, -1, 0)  # Shape (sizes[a], m, ...)
+            shape = (-1, m) + (1,) * (lines.ndim - 2)
+            x = self.points[a][first[a][:, None] + np.arange(sizes[a])].T
+            h = np.diff(x, axis=0).reshape(shape)
+            delta = np.diff(lines, axis=0) / h
+            d = slopes(h, delta)
+
+            # Subinterval of every point inside its grid points
+            j = (k[a] - first[a]).reshape((1,) + shape[1:])
+            y0 = np.take_along_axis(lines, j, axis=0)[0]
+            d0 = np.take_along_axis(d, j, axis=0)[0]
+            d1 = np.take_along_axis(d, j + 1, axis=0)[0]
+            hj = np.take_along_axis(h, j, axis=0)[0]
+            deltaj = np.take_along_axis(delta, j, axis=0)[0]
+            s = (xi[:, a] - self.points[a][k[a]]).reshape(shape[1:])
+
+            c = (3 * deltaj - 2 * d0 - d1) / hj
+            b = (d0 - 2 * deltaj + d1) / hj**2
+            block = y0 + s * (d0 + s * (c + s * b))
+
+        return block
+
+
+def chebyshev_points(n, a=-1.0, b=1.0):
+    """
+    Chebyshev points of the second kind (extrema of T_n) in the interval [a, b], from b down to a
+
+    params:
+        n: degree, there are n + 1 points
+        a, b (optional): ends of the interval (default: [-1, 1])
+
+    returns:
+        x: array with the n + 1 points x_j = (a + b)/2 + (b - a)/2 * cos(pi j / n)
+    """
+    if n == 0:
+        return np.array([(a + b) / 2])
+    return (a + b) / 2 + (b - a) / 2 * np.cos(np.pi * np.arange(n + 1) / n)
+
+
+def chebyshev_coefficients(values):
+    """
+    Coefficients c_k of the polynomial sum(c_k * T_k) that interpolates the values at the Chebyshev points of the second kind, in O(n log n).
+    The values at cos(pi j / n) are a DCT-I of the coefficients, which is computed with an FFT of the even extension of the values.
+
+    params:
+        values: array with the n + 1 values at chebyshev_points(n)
+
+    returns:
+        c: array with the n + 1 Chebyshev coefficients
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values) - 1
+    if n == 0:
+        return values.copy()
+
+    # Even extension v_0, ..., v_n, v_{n-1}, ..., v_1 of length 2n
+    extension = np.concatenate([values, values[-2:0:-1]])
+    c = np.fft.rfft(extension).real[: n + 1] / n
+    c[0] /= 2  # The first and last coefficients are counted twice
+    c[n] /= 2
+    return c
+
+
+def clenshaw(c, t, out=None):
+    """
+    Evaluates sum(c_k * T_k(t)) with Clenshaw's recurrence, O(n) per point and stable for high degrees
+
+    params:
+        c: Chebyshev coefficients
+        t: points in [-1, 1]
+        out (optional): array where the result is stored (default: a new array)
+
+    returns:
+        v: values of the series at the points t
+    """
+    t = np.asarray(t, dtype=float)
+    b1, b2 = np.zeros_like(t), np.zeros_like(t)
+    for ck in c[
+        :0:-1
+    ]:  # b_k = c_k + 2t b_{k+1} - b_{k+2}, from the highest degree down to 1
+        b1, b2 = 2 * t * b1 - b2 + ck, b1
+    if out is None:
+        out = np.empty_like(t)
+    out[...] = t * b1 - b2 + c[0]
+    return out
+
+
+class ChebyshevInterpolant:
+    """
+    Polynomial interpolant sum(c_k * T_k(t)) of a function at Chebyshev points of [a, b], t = (2x - a - b) / (b - a).
+    Unlike polinomial at equispaced points, it converges quickly for smooth functions even at high degrees.
+    """
+
+    def __init__(self, coefficients, a=-1.0, b=1.0):
+        """
+        params:
+            coefficients: Chebyshev coefficients c_0, ..., c_n
+            a, b (optional): ends of the interval (default: [-1, 1])
+
+        raises:
+            ValueError: if there are no coefficients or a >= b
+        """
+        if len(coefficients) == 0 or a >= b:
+            raise ValueError("There must be at least one coefficient and a < b")
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.a, self.b = float(a), float(b)
+        self.degree = len(self.coefficients) - 1
+
+    def __call__(self, u, out=None):
+        """
+        Evaluates the interpolant at the points u with Clenshaw's algorithm
+
+        params:
+            u: list of points where the interpolation is computed
+            out (optional): array where the result is stored (default: a new array)
+
+        returns:
+            v: list of values of the interpolation at the points u
+        """
+        t = (2 * np.asarray(u, dtype=float) - self.a - self.b) / (self.b - self.a)
+        return clenshaw(self.coefficients, t, out)
+
+    def chunks(self, u, chunk_size=65536, out=None):
+        """
+        Evaluates the interpolant chunk by chunk (see interpolate_chunks)
+
+        params:
+            u: points where the interpolation is computed, either an array (also np.memmap) or any iterable of points
+            chunk_size (optional): number of points evaluated at once (default: 65536)
+            out (optional): array where the results are stored, it must be at least as long as u
+
+        returns:
+            generator of the values of every chunk (views of out when given)
+        """
+        return evaluate_chunks(lambda chunk, o: self(chunk, o), u, chunk_size, out)
+
+    def roots(self, tol=1e-8):
+        """
+        Real roots of the interpolant in [a, b], the eigenvalues of its colleague matrix
+
+        params:
+            tol (optional): maximum imaginary part and distance outside [-1, 1] of the accepted eigenvalues (default: 1e-8)
+
+        returns:
+            r: sorted array with the roots
+        """
+        c = self.coefficients
+        n = len(c) - 1
+        while n > 0 and c[n] == 0:  # The leading coefficient must not be 0
+            n -= 1
+        if n == 0:
+            return np.array([])
+
+        # x T_0 = T_1, x T_j = (T_{j-1} + T_{j+1}) / 2 and T_n is replaced by -sum(c_k T_k) / c_n
+        colleague = np.diag(np.full(n - 1, 0.5), 1) + np.diag(np.full(n - 1, 0.5), -1)
+        if n > 1:
+            colleague[0, 1] = 1
+        colleague[-1, :] -= c[:n] / c[n] * (0.5 if n > 1 else 1)
+
+        t = np.linalg.eigvals(colleague)
+        t = t[(np.abs(t.imag) <= tol) & (np.abs(t.real) <= 1 + tol)].real
+        t = np.sort(np.clip(t, -1, 1))
+        return (self.a + self.b) / 2 + (self.b - self.a) / 2 * t
+
+
+def chebyshev_interpolant(f, a=-1.0, b=1.0, n=None, tol=1e-14, max_n=65536):
+    """
+    Interpolates f at Chebyshev points of [a, b], computing the coefficients with the FFT in O(n log n).
+    Without n, the number of points is doubled (reusing the previous samples) until the last coefficients are negligible.
+    The trailing coefficients below tol (relative to the largest one) are always dropped, so the degree is only the one needed.
+
+    params:
+        f: vectorized function to interpolate, f(x) with x an array
+        a, b (optional): ends of the interval (default: [-1, 1])
+        n (optional): degree of the interpolant, adaptive if None (default: None)
+        tol (optional): relative tolerance of the truncation (default: 1e-14)
+        max_n (optional): maximum degree of the adaptive construction (default: 65536)
+
+    returns:
+        interpolant: ChebyshevInterpolant, when the tolerance is not reached with max_n the interpolant of degree max_n is returned
+
+    raises:
+        ValueError: if a >= b or n is negative
+    """
+    if a >= b:
+        raise ValueError("The interval must satisfy a < b")
+    if n is not None and n < 0:
+        raise ValueError("The degree must be non-negative")
+
+    def sample(x):
+        return np.broadcast_to(np.asarray(f(x), dtype=float), x.shape)
+
+    if n is not None:
+        c = chebyshev_coefficients(sample(chebyshev_points(n, a, b)))
+    else:
+        n = 16
+        values = sample(chebyshev_points(n, a, b))
+        while True:
+            c = chebyshev_coefficients(values)
+            scale = np.max(np.abs(c))
+            # Converged when the last coefficients are negligible (the last few, in case of odd or even functions)
+            if np.all(np.abs(c[-3:]) <= tol * scale) or n >= max_n:
+                break
+            # The points of degree 2n are those of degree n (even indices) and the midpoints (odd indices)
+            new_values = np.empty(2 * n + 1)
+            new_values[::2] = values
+            new_values[1::2] = sample(
+                (a + b) / 2
+                + (b - a) / 2 * np.cos(np.pi * np.arange(1, 2 * n, 2) / (2 * n))
+            )
+            values, n = new_values, 2 * n
+
+    # Drop the trailing coefficients below the tolerance
+    scale = np.max(np.abs(c))
+    significant = np.flatnonzero(np.abs(c) > tol * scale)
+    return ChebyshevInterpolant(
+        c[: significant[-1] + 1] if len(significant) else c[:1], a, b
+    )
+
+
+def floater_hormann_weights(x, d=3):
+    """
+    Weights of the Floater-Hormann rational interpolant with blending degree d, in O(n d)
+        w_k = (-1)^k * sum over the windows i = max(k-d, 0) .. min(k, n-1-d) of prod_{j=i..i+d, j != k} 1 / |x_k - x_j|
+    The product of every window is obtained from the previous one with a multiplication and a division.
+    The interpolant blends all the polynomials of degree d that interpolate d + 1 consecutive points, it has no poles in the real line
+    and converges as h^(d+1), without Runge's oscillations at equispaced points. With d = n - 1 it is the interpolating polynomial.
+
+    params:
+        x: sorted list of x coordinates
+        d (optional): blending degree, 0 <= d <= len(x) - 1 (default: 3)
+
+    returns:
+        w: array with the weights, scaled by a common factor (it does not change the interpolant)
+
+    raises:
+        ValueError: if d is not in [0, len(x) - 1]
+    """
+    n = len(x)
+    if not 0 <= d <= n - 1:
+        raise ValueError("The blending degree must satisfy 0 <= d <= len(x) - 1")
+    # Distances in units of the mean spacing, so the products do not overflow
+    x = np.asarray(x, dtype=float)
+    x = (x - x[0]) / ((x[-1] - x[0]) / (n - 1)) if n > 1 else x - x[0]
+    k = np.arange(n)
+
+    # Product of the first window of every point
+    first = np.maximum(k - d, 0)
+    product = np.ones(n)
+    for offset in range(d + 1):
+        j = first + offset
+        other = j != k
+        product[other] /= np.abs(x[k[other]] - x[j[other]])
+
+    # Sum of the windows, moving from the window i to i + 1: divide by |x_k - x_{i+d+1}| and multiply by |x_k - x_i|
+    last = np.minimum(k, n - 1 - d)
+    w = np.zeros(n)
+    for offset in range(d + 1):
+        i = first + offset
+        valid = i <= last
+        w[valid] += product[valid]
+        moving = valid & (i + 1 <= last)
+        product[moving] *= np.abs(x[k[moving]] - x[i[moving]]) / np.abs(
+            x[k[moving]] - x[i[moving] + d + 1]
+        )
+
+    w[1::2] *= -1
+    return w
+
+
+def barycentric(x, y, w, u, out=None, block_size=2**20):
+    """
+    Evaluates the rational interpolant in barycentric form
+        r(u) = sum(w_k y_k / (u - x_k)) / sum(w_k / (u - x_k))
+    The sums are two matrix-vector products over blocks of u, with about block_size elements in each block of 1 / (u - x_k),
+    so the memory does not depend on the number of points. At the points u = x_k the value y_k is returned.
+
+    params:
+        x: sorted list of x coordinates
+        y: list of y coordinates
+        w: barycentric weights (floater_hormann_weights)
+        u: list of points where the interpolation is computed
+        out (optional): array where the result is stored (default: a new array)
+        block_size (optional): number of elements of the blocks of 1 / (u - x_k) (default: 2**20)
+
+    returns:
+        v: list of values of the interpolation at the points u
+    """
+    x, y, w = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(w)
+    u = np.asarray(u, dtype=float)
+    if out is None:
+        out = np.empty(u.shape)
+    flat_u, flat_out = u.reshape(-1), out.reshape(-1)
+    wy = w * y
+    rows = max(block_size // len(x), 1)  # Points of u in every block
+
+    for start in range(0, len(flat_u), rows):
+        block = flat_u[start : start + rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cauchy = 1 / (block[:, None] - x[None, :])
+            flat_out[start : start + rows] = (cauchy @ wy) / (cauchy @ w)
+
+    # Points that coincide with a node
+    k = np.clip(np.searchsorted(x, flat_u), 0, len(x) - 1)
+    exact = x[k] == flat_u
+    flat_out[exact] = y[k[exact]]
+    if not np.shares_memory(flat_out, out):  # out was not contiguous
+        out[...] = flat_out.reshape(out.shape)
+    return out
+
+
+def floater_hormann(x, y, u, d=3, sorted=False):
+    """
+    Floater-Hormann barycentric rational interpolation with blending degree d (see floater_hormann_weights).
+    Unlike polinomial, it is stable for large sets of equispaced points.
+
+    params:
+        x: list of x coordinates
+        y: list of y coordinates
+        u: list of points where the interpolation is computed
+        d (optional): blending degree (default: 3)
+        sorted (optional): if the points are sorted or not (default: False)
+
+    returns:
+        v: list of values of the interpolation at the points u
+
+    raises:
+        ValueError: if d is not in [0, len(x) - 1]
+    """
+    x, y = sort_points(x, y, sorted)
+    return barycentric(x, y, floater_hormann_weights(x, d), u)
+
+
+class FloaterHormann:
+    """
+    Floater-Hormann rational interpolant (see floater_hormann), the weights are computed once and then evaluated as many times as needed
+    """
+
+    def __init__(self, x, y, d=3, sorted=False):
+        """
+        Sorts the points and computes the weights of the interpolant
+
+        params:
+            x: list of x coordinates
+            y: list of y coordinates
+            d (optional): blending degree (default: 3)
+            sorted (optional): if the points are sorted or not (default: False)
+
+        raises:
+            ValueError: if x and y have different lengths, x has repeated values or d is not in [0, len(x) - 1]
+        """
+        if len(x) != len(y):
+            raise ValueError("The length of the X and Y coordinates must be the same")
+        x, y = sort_points(x, y, sorted)
+        if np.any(np.diff(x) == 0):
+            raise ValueError("The x coordinates must be different")
+
+        self.x = x.astype(float)
+        self.y = y.astype(float)
+        self.d = d
+        self.w = floater_hormann_weights(self.x, d)
+
+    def __call__(self, u, out=None):
+        """
+        Evaluates the interpolant at the points u
+
+        params:
+            u: list of points where the interpolation is computed
+            out (optional): array where the result is stored (default: a new array)
+
+        returns:
+            v: list of values of the interpolation at the points u
+        """
+        return barycentric(self.x, self.y, self.w, u, out)
+
+    def chunks(self, u, chunk_size=65536, out=None):
+        """
+        Evaluates the interpolant chunk by chunk (see interpolate_chunks)
+
+        params:
+            u: points where the interpolation is computed, either an array (also np.memmap) or any iterable of points
+            chunk_size (optional): number of points evaluated at once (default: 65536)
+            out (optional): array where the results are stored, it must be at least as long as u
+
+        returns:
+            generator of the values of every chunk (views of out when given)
+        """
+        return evaluate_chunks(lambda chunk, o: self(chunk, o), u, chunk_size, out)
+
+
+# Exponent of the distance between consecutive points in every parameterization of a curve
+parameterizations = {"uniform": 0.0, "centripetal": 0.5, "chord": 1.0}
+
+
+def curve_parameter(points, parameterization="chord"):
+    """
+    Parameter values of the points of a curve, t[0] = 0 and t[i+1] = t[i] + |P[i+1] - P[i]|^alpha with
+        - "uniform": alpha = 0, t[i] = i
+        - "centripetal": alpha = 1/2, avoids cusps and self-intersections in sharp turns
+        - "chord": alpha = 1, the length of the polygon
+
+    params:
+        points: array with one point per row
+        parameterization (optional): "uniform", "centripetal" or "chord" (default: "chord")
+
+    returns:
+        t: increasing array with the parameter of every point
+
+    raises:
+        ValueError: if the parameterization is unknown or two consecutive points are the same
+    """
+    if parameterization not in parameterizations:
+        raise ValueError(
+            f"The parameterization must be one of {list(parameterizations)}"
+        )
+    points = np.asarray(points, dtype=float)
+    distances = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    if np.any(distances == 0):
+        raise ValueError("Two consecutive points of the curve are the same")
+
+    t = np.zeros(len(points))
+    np.cumsum(distances ** parameterizations[parameterization], out=t[1:])
+    return t
+
+
+# Slope rules of the curves, the ones of the cubic methods
+curve_methods = {
+    "linear": None,
+    "pchip": pchip_slopes,
+    "spline": splineslopes,
+    "akima": akima_slopes,
+    "makima": makima_slopes,
+    "steffen": steffen_slopes,
+}
+
+
+class ParametricCurve:
+    """
+    Curve P(t) = (x(t), y(t), z(t), ...) through a list of points, for trajectories that are not the graph of a function.
+    The parameter is computed once (see curve_parameter) and all the coordinates are interpolated at once:
+    the slopes and the coefficients are computed with the points along the first axis and one column per coordinate,
+    and evaluate_table evaluates every coordinate in the same pass.
+    A table of the arc length is built on demand, so the curve can also be evaluated at a given distance from its start.
+    """
+
+    def __init__(
+        self,
+        points,
+        method="spline",
+        parameterization="chord",
+        end_condition="not-a-knot",
+    ):
+        """
+        Computes the parameter of the points and the coefficients of every coordinate
+
+        params:
+            points: array with one point per row (n points, at least 2, or 4 for the cubic methods)
+            method (optional): "linear", "pchip", "spline", "akima", "makima" or "steffen" (default: "spline")
+            parameterization (optional): "uniform", "centripetal" or "chord" (default: "chord")
+            end_condition (optional): end condition of the splines, see spline_factor (default: "not-a-knot")
+
+        raises:
+            ValueError: if the method or the parameterization is unknown, there are not enough points or two consecutive points are the same
+        """
+        if method not in curve_methods:
+            raise ValueError(f"The method must be one of {list(curve_methods)}")
+        points = np.asarray(points, dtype=float)
+        if points.ndim == 1:  # A single coordinate
+            points = points[:, None]
+        if len(points) < (2 if method == "linear" else 4):
+            raise ValueError(f"The {method} method needs more points")
+        if method == "spline":
+            check_periodic(points, end_condition)
+
+        self.points = points
+        self.method = method
+        self.t = curve_parameter(points, parameterization)
+
+        h = np.diff(self.t)
+        delta = np.diff(points, axis=0) / h[:, None]
+        if method == "linear":
+            coefficients = (delta,)
+        else:
+            if method == "spline":  # One tridiagonal system for every coordinate
+                d = splineslopes(h, delta, end_condition)
+            else:
+                d = curve_methods[method](h[:, None], delta)
+            coefficients = hermite_coefficients(h[:, None], delta, d)
+        self.coefficients = coefficients
+        self.table = piecewise_table(self.t, points, *coefficients)
+        self.lengths = None  # Table of the arc length, see arc_length_table
+
+    def __call__(self, t, out=None):
+        """
+        Evaluates the curve at the parameters t, in [0, self.t[-1]]
+
+        params:
+            t: list of parameters
+            out (optional): array where the result is stored (default: a new array)
+
+        returns:
+            P: array with one point per parameter (one row per parameter and one column per coordinate)
+        """
+        return evaluate_table(self.table, t, out)
+
+    def derivative(self, t):
+        """
+        Derivative P'(t) of the curve at the parameters t
+
+        params:
+            t: list of parameters
+
+        returns:
+            dP: array with the derivative at every parameter (one row per parameter and one column per coordinate)
+        """
+        t = np.asarray(t, dtype=float)
+        k = interval_index(self.t, t)
+        s = (t - self.t[k])[..., None]
+        if self.method == "linear":
+            return self.coefficients[0][k]
+        d, c, b = self.coefficients
+        return d[k] + s * (2 * c[k] + 3 * s * b[k])
+
+    def arc_length_table(self, samples=8):
+        """
+        Builds the table of the arc length L(t) at samples equispaced parameters of every subinterval.
+        The length of every piece is the integral of |P'(t)| with 5-point Gauss-Legendre quadrature.
+        L(t) and its inverse are stored as monotone P.C.H.I.P. tables, so both are evaluated with a binary search and a cubic.
+
+        params:
+            samples (optional): number of pieces of every subinterval (default: 8)
+
+        returns:
+            length: total length of the curve
+        """
+        # Parameters of the table
+        fractions = np.arange(samples) / samples
+        h = np.diff(self.t)
+        t = np.concatenate(
+            [(self.t[:-1, None] + h[:, None] * fractions).ravel(), self.t[-1:]]
+        )
+
+        # Gauss-Legendre quadrature of |P'| on every piece
+        nodes, weights = np.polynomial.legendre.leggauss(5)
+        dt = np.diff(t)
+        middle = (t[:-1] + t[1:]) / 2
+        quadrature = middle[:, None] + dt[:, None] / 2 * nodes
+        speed = np.linalg.norm(self.derivative(quadrature), axis=-1)
+        pieces = speed @ weights * dt / 2
+
+        lengths = np.zeros(len(t))
+        np.cumsum(pieces, out=lengths[1:])
+        self.lengths = (
+            piecewise_table(*pchip_coefficients(t, lengths, sorted=True)),
+            piecewise_table(*pchip_coefficients(lengths, t, sorted=True)),
+            lengths[-1],
+        )
+        return lengths[-1]
+
+    @property
+    def length(self):
+        """
+        Total length of the curve (the arc length table is built if needed)
+        """
+        if self.lengths is None:
+            self.arc_length_table()
+        return self.lengths[2]
+
+    def arc_length(self, t):
+        """
+        Arc length L(t) from the start of the curve to the parameters t
+
+        params:
+            t: list of parameters
+
+        returns:
+            L: list of lengths
+        """
+        if self.lengths is None:
+            self.arc_length_table()
+        return evaluate_table(self.lengths[0], t)
+
+    def parameter_at(self, s):
+        """
+        Inverse of the arc length: the parameters t with L(t) = s, from the table in O(log n) per length
+
+        params:
+            s: list of lengths, in [0, self.length]
+
+        returns:
+            t: list of parameters
+        """
+        if self.lengths is None:
+            self.arc_length_table()
+        return evaluate_table(self.lengths[1], s)
+
+    def at_length(self, s, out=None):
+        """
+        Evaluates the curve parameterized by its arc length, the points at distance s from its start along the curve
+
+        params:
+            s: list of lengths, in [0, self.length]
+            out (optional): array where the result is stored (default: a new array)
+
+        returns:
+            P: array with one point per length
+        """
+        return self(self.parameter_at(s), out)
@@ -297,6 +297,118 @@ def lu_solve(A, b):
     return x
 
 
+def lu_factor(A, block_size=64):
+    """
+    Computes the LU factorization PA = LU with partial pivoting, packed in a single matrix, so that systems with the same matrix
+    are solved with lu_factor_solve in O(n^2) without eliminating again.
+    The columns are eliminated in blocks: the block is factorized column by column and the rest of the matrix is updated
+    with a single matrix product per block.
+
+    Parameters
+    ----------
+    A : np.array
+        A square matrix.
+    block_size : int, optional
+        Number of columns eliminated per block (default 64).
+
+    Returns
+    -------
+    factor : tuple
+        The matrix with L below the diagonal (unit diagonal not stored) and U on and above it, and the permutation of the rows
+        (row i of PA is row pivots[i] of A).
+
+    raises
+    ------
+    ValueError
+        If the matrix is not square or it is singular.
+    """
+    LU = np.array(A, dtype=float)  # Copy of A, overwritten by L and U
+    if LU.ndim != 2 or LU.shape[0] != LU.shape[1]:
+        raise ValueError("Matrix must be square")
+
+    n = LU.shape[0]
+    pivots = np.arange(n)
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        # Factorize the columns of the block, updating only the block
+        for col in range(start, end):
+            # Swap the whole row with the largest pivot element
+            maximum_index = int(np.argmax(np.abs(LU[col:, col])) + col)
+            if maximum_index != col:
+                LU[[col, maximum_index]] = LU[[maximum_index, col]]
+                pivots[[col, maximum_index]] = pivots[[maximum_index, col]]
+            if LU[col, col] == 0:
+                raise ValueError("Matrix is singular")
+
+            LU[col + 1 :, col] /= LU[col, col]  # Multipliers
+            LU[col + 1 :, col + 1 : end] -= np.outer(
+                LU[col + 1 :, col], LU[col, col + 1 : end]
+            )
+
+        if end < n:
+            # Rows of U to the right of the block: forward substitution with the unit lower triangle of the block
+            for col in range(start, end):
+                LU[col + 1 : end, end:] -= np.outer(
+                    LU[col + 1 : end, col], LU[col, end:]
+                )
+            # Update of the rest of the matrix (Schur complement)
+            LU[end:, end:] -= LU[end:, start:end] @ LU[start:end, end:]
+
+    return LU, pivots
+
+
+def lu_factor_solve(factor, r, transpose=False):
+    """
+    Solves Ax = r (or A^T x = r) with the LU factorization of A (see lu_factor), a forward and a backward substitution in O(n^2).
+
+    Parameters
+    ----------
+    factor : tuple
+        The factorization returned by lu_factor.
+    r : np.array
+        The right-hand side (n elements), or n rows of right-hand sides solved at once.
+    transpose : bool, optional
+        Solve the system with the transposed matrix (default False).
+
+    Returns
+    -------
+    x : np.array
+        A vector (or one column per right-hand side).
+
+    raises
+    ------
+    ValueError
+        If the sizes of the factorization and the right-hand side differ.
+    """
+    LU, pivots = factor
+    n = len(pivots)  # Size of the system
+    if len(r) != n:
+        raise ValueError(
+            "The sizes of the factorization and the right-hand side differ"
+        )
+
+    if not transpose:
+        x = np.array(r, dtype=float)[pivots]  # Pb, overwritten by the solution
+        # Forward substitution with L (unit diagonal)
+        for row in range(1, n):
+            x[row] -= LU[row, :row] @ x[:row]
+        # Backward substitution with U
+        for row in range(n - 1, -1, -1):
+            x[row] = (x[row] - LU[row, row + 1 :] @ x[row + 1 :]) / LU[row, row]
+        return x
+
+    # A^T = U^T L^T P: forward substitution with U^T and backward substitution with L^T
+    x = np.array(r, dtype=float)
+    for row in range(n):
+        x[row] = (x[row] - LU[:row, row] @ x[:row]) / LU[row, row]
+    for row in range(n - 2, -1, -1):
+        x[row] -= LU[row + 1 :, row] @ x[row + 1 :]
+    # Undo the permutation of the rows
+    solution = np.empty_like(x)
+    solution[pivots] = x
+    return solution
+
+
 def qr_factorization(A):
     """
     QR using Householder reflections.
@@ -326,12 +438,14 @@ def qr_factorization(A):
         # 2. Compute the norm of x
         # 3. Create an identity matrix with the same number of rows as x
         # 4. Add the result of step 1 to the identity matrix, scaled by the result of step 2
-        qk = np.sign(x[0]) * np.linalg.norm(x) * np.eye(x.shape[0], 1) + x.reshape(
-            -1, 1
-        )
+        # (copysign instead of sign so that a zero leading entry still reflects)
+        qk = np.copysign(1.0, x[0]) * np.linalg.norm(x) * np.eye(
+            x.shape[0], 1
+        ) + x.reshape(-1, 1)
 
-        # Normalize the Householder vector
-        qk = qk / np.linalg.norm(qk)
+        # Normalize the Householder vector (a zero column needs no reflection)
+        norm = np.linalg.norm(qk)
+        qk = qk / norm if norm > 0 else qk
 
         # Update the k-th column and the columns below it of R
         R[k:, k:] = R[k:, k:] - 2 * np.dot(qk, np.dot(qk.T, R[k:, k:]))
@@ -373,10 +487,13 @@ def qr_solve(A, b):
 
     for k in range(n):
         x = R[k:, k]  # Get the kth column of R, starting from the kth row
-        qk = np.sign(x[0]) * np.linalg.norm(x) * np.eye(x.shape[0], 1) + x.reshape(
+        qk = np.copysign(1.0, x[0]) * np.linalg.norm(x) * np.eye(
+            x.shape[0], 1
+        ) + x.reshape(
             -1, 1
         )  # Householder vector: calculate the Householder reflection vector qk
-        qk = qk / np.linalg.norm(qk)  # Normalize qk so it has a length of 1
+        norm = np.linalg.norm(qk)
+        qk = qk / norm if norm > 0 else qk  # Normalize qk so it has a length of 1
 
         R[k:, k:] = R[k:, k:] - 2 * np.dot(
             qk, np.dot(qk.T, R[k:, k:])
@@ -391,3 +508,589 @@ def qr_solve(A, b):
     )  # Solve the system R*x = b using backward substitution
 
     return x  # Return the solution x
+
+
+def balance(A):
+    """
+    Balances a square matrix with a diagonal similarity D^-1 A D (Parlett-Reinsch), so that every row and its matching column have comparable norms. The scaling factors are powers of 2, so no rounding error is introduced and the eigenvalues are unchanged, but they are computed far more accurately afterwards (companion matrices are the classic example).
+
+    Parameters
+    ----------
+    A : np.array
+        A square matrix.
+
+    Returns
+    -------
+    B : np.array
+        The balanced matrix.
+
+    """
+    B = np.array(A, dtype=float)  # Work on a float copy
+    n = B.shape[0]
+    off_diagonal = ~np.eye(n, dtype=bool)
+
+    converged = False
+    while not converged:
+        converged = True
+        for i in range(n):
+            # Norms of the i-th column and row without the diagonal entry
+            c = np.abs(B[off_diagonal[:, i], i]).sum()
+            r = np.abs(B[i, off_diagonal[i]]).sum()
+            if c == 0 or r == 0:
+                continue  # Nothing to balance against
+
+            # Find the power of 2 that brings c and r closest together
+            f, s = 1.0, c + r
+            while c < r / 2:
+                c, r, f = c * 2, r / 2, f * 2
+            while c >= r * 2:
+                c, r, f = c / 2, r * 2, f / 2
+
+            # Only apply it if it reduces the norm noticeably (avoids cycling)
+            if c + r < 0.95 * s:
+                converged = False
+                B[i, :] /= f
+                B[:, i] *= f
+    return B
+
+
+def hessenberg(A):
+    """
+    Reduces a square matrix to upper Hessenberg form H = Q^T A Q (zeros below the first subdiagonal) with Householder reflections. Being a similarity, H keeps the eigenvalues of A.
+
+    Parameters
+    ----------
+    A : np.array
+        A square matrix.
+
+    Returns
+    -------
+    H : np.array
+        The upper Hessenberg matrix.
+
+    """
+    H = np.array(A, dtype=float)  # Work on a float copy
+    n = H.shape[0]
+
+    for k in range(n - 2):
+        x = H[k + 1 :, k]  # The part of the column to bring to the subdiagonal
+        if not np.any(x[1:]):
+            continue  # Already zero below the subdiagonal
+
+        # Householder vector sending x to a multiple of e1
+        v = x.copy()
+        v[0] += np.copysign(np.linalg.norm(x), x[0])
+        v /= np.linalg.norm(v)
+
+        # Apply the reflection from the left and from the right
+        H[k + 1 :, :] -= 2 * np.outer(v, v @ H[k + 1 :, :])
+        H[:, k + 1 :] -= 2 * np.outer(H[:, k + 1 :] @ v, v)
+        H[k + 2 :, k] = 0  # Clean the round-off left below the subdiagonal
+    return H
+
+
+def givens(a, b):
+    """
+    Givens rotation that sends the vector (a, b) to (r, 0).
+
+    Parameters
+    ----------
+    a, b : float
+        The vector.
+
+    Returns
+    -------
+    G : np.array
+        The 2x2 rotation [[c, s], [-s, c]].
+    r : float
+        The norm of (a, b).
+    """
+    r = np.hypot(a, b)
+    c, s = (a / r, b / r) if r > 0 else (1.0, 0.0)
+    return np.array([[c, s], [-s, c]]), r
+
+
+def eigenvalues(A, stop_iters=None):
+    """
+    Computes all the (possibly complex) eigenvalues of a real square matrix with the shifted QR algorithm:
+        1. The matrix is balanced and reduced to upper Hessenberg form
+        2. On the active block, shifted QR steps are taken, the shifts s1, s2 being the eigenvalues of the trailing 2x2 block. If they are real, a single step with the one closer to the last diagonal entry (Wilkinson shift): H - mu I = QR and H <- RQ + mu I. If they are complex conjugate, a double step: M = (H - s1 I)(H - s2 I) is real, M = QR and H <- Q^T H Q, so complex eigenvalues are found without leaving real arithmetic. Both keep the Hessenberg form and are done with Givens rotations in O(n^2) per step, as on a Hessenberg matrix every rotation only changes two rows and two columns: the single step rotates away the subdiagonal of H - mu I, and the double step (Francis) only needs the first column of M, which has 3 entries, and then chases the bulge it creates down the subdiagonal
+        3. Whenever a subdiagonal entry becomes negligible the problem splits (deflation): a trailing 1x1 block is an eigenvalue and a trailing 2x2 block gives two through the quadratic formula
+
+    Parameters
+    ----------
+    A : np.array
+        A square matrix.
+    stop_iters : int, optional
+        Maximum number of QR steps without a deflation, by default 30 per row of A.
+
+    Returns
+    -------
+    eigenvalues : np.array
+        The n eigenvalues (complex), in the order they were deflated.
+
+    raises
+    ------
+    ValueError
+        If the matrix is not square or the iteration does not converge.
+
+    """
+    A = np.asarray(A)
+    if A.ndim != 2 or A.shape[0] != A.shape[1]:
+        raise ValueError("Matrix must be square")
+    H = hessenberg(balance(A))
+    n = H.shape[0]
+    stop_iters = 30 * max(n, 1) if stop_iters is None else stop_iters
+    eps = np.finfo(float).eps
+
+    found = []  # Eigenvalues found so far
+    hi = n - 1  # Last row of the active block
+    iterations = 0  # QR steps since the last deflation
+    while hi >= 0:
+        # Look for the start of the active block: the lowest negligible subdiagonal
+        lo = hi
+        while lo > 0 and abs(H[lo, lo - 1]) > eps * (
+            abs(H[lo - 1, lo - 1]) + abs(H[lo, lo])
+        ):
+            lo -= 1
+        if lo > 0:
+            H[lo, lo - 1] = 0  # Split the problem
+
+        if lo == hi:  # 1x1 block: an eigenvalue
+            found.append(complex(H[hi, hi]))
+            hi, iterations = hi - 1, 0
+            continue
+        if lo == hi - 1:  # 2x2 block: a pair of eigenvalues
+            a, b, c, d = H[hi - 1, hi - 1], H[hi - 1, hi], H[hi, hi - 1], H[hi, hi]
+            half_trace = (a + d) / 2
+            root = np.sqrt(complex(((a - d) / 2) ** 2 + b * c))
+            found.extend([half_trace + root, half_trace - root])
+            hi, iterations = hi - 2, 0
+            continue
+
+        iterations += 1
+        if iterations > stop_iters:
+            raise ValueError("QR iteration did not converge")
+
+        # Shifts from the trailing 2x2 block: s = s1 + s2, t = s1 s2 and the discriminant of s1, s2
+        B = H[lo : hi + 1, lo : hi + 1]  # View, the steps work in place
+        s = B[-2, -2] + B[-1, -1]
+        t = B[-2, -2] * B[-1, -1] - B[-2, -1] * B[-1, -2]
+        discriminant = s * s / 4 - t
+        if iterations % 10 == 0:
+            # Exceptional shift (EISPACK) to break a possible cycle
+            w = abs(B[-1, -2]) + abs(B[-2, -3])
+            s, t, discriminant = 1.5 * w, w * w, -0.4375 * w * w
+
+        if discriminant >= 0:
+            # Real shifts: single step with the one closer to the last diagonal entry (Wilkinson shift), B - mu I = QR -> RQ + mu I
+            root = np.sqrt(discriminant)
+            mu = s / 2 + root if B[-1, -1] >= s / 2 else s / 2 - root
+            diagonal = np.arange(B.shape[0])
+            B[diagonal, diagonal] -= mu
+            # R = G_m ... G_1 (B - mu I), the rotations zero the subdiagonal from the top
+            rotations = []
+            for k in range(B.shape[0] - 1):
+                G, _ = givens(B[k, k], B[k + 1, k])
+                B[k : k + 2, k:] = G @ B[k : k + 2, k:]
+                rotations.append(G)
+            # RQ = R G_1^T ... G_m^T
+            for k, G in enumerate(rotations):
+                B[: k + 2, k : k + 2] = B[: k + 2, k : k + 2] @ G.T
+            B[diagonal, diagonal] += mu
+        else:
+            # Complex conjugate shifts: implicit double step, the first column of M = B^2 - s B + t I is (x, y, z, 0, ...).
+            # The similarity that sends it to (r, 0, 0, ...) leaves a bulge below the subdiagonal, which is chased down
+            x = B[0, 0] * B[0, 0] + B[0, 1] * B[1, 0] - s * B[0, 0] + t
+            y = B[1, 0] * (B[0, 0] + B[1, 1] - s)
+            z = B[1, 0] * B[2, 1]
+            for k in range(B.shape[0] - 1):
+                if k > 0:  # The bulge in column k-1
+                    x, y = B[k, k - 1], B[k + 1, k - 1]
+                    z = B[k + 2, k - 1] if k + 2 < B.shape[0] else 0
+                # Rotations of the planes (k+1, k+2) and (k, k+1) that zero z and y, applied as similarities G B G^T
+                # (only the columns from k-1 and the rows up to k+3 are not zero, Hessenberg plus the bulge)
+                first, last = max(k - 1, 0), k + 4
+                if k + 2 < B.shape[0]:
+                    G, y = givens(y, z)
+                    B[k + 1 : k + 3, first:] = G @ B[k + 1 : k + 3, first:]
+                    B[:last, k + 1 : k + 3] = B[:last, k + 1 : k + 3] @ G.T
+                G, _ = givens(x, y)
+                B[k : k + 2, first:] = G @ B[k : k + 2, first:]
+                B[:last, k : k + 2] = B[:last, k : k + 2] @ G.T
+        H[lo : hi + 1, lo : hi + 1] = np.triu(B, -1)
+
+    return np.array(found, dtype=complex)
+
+
+def tridiagonal_solve(a, b, c, r):
+    """
+    Solves the tridiagonal system Ax = r using Gaussian elimination without pivoting (Thomas algorithm) in O(n).
+
+    Parameters
+    ----------
+    a : np.array
+        The sub-diagonal of A (n-1 elements).
+    b : np.array
+        The diagonal of A (n elements).
+    c : np.array
+        The super-diagonal of A (n-1 elements).
+    r : np.array
+        The right-hand side (n elements), or n rows of right-hand sides solved at once.
+
+    Returns
+    -------
+    x : np.array
+        A vector (or one column per right-hand side).
+
+    raises
+    ------
+    ValueError
+        If the sizes of the diagonals do not match or a pivot is zero.
+    """
+    return tridiagonal_lu_solve(tridiagonal_lu(a, b, c), r)
+
+
+def tridiagonal_lu(a, b, c):
+    """
+    Computes the LU factorization of a tridiagonal matrix without pivoting in O(n), so that systems with the same matrix
+    are solved with tridiagonal_lu_solve without eliminating again.
+
+    Parameters
+    ----------
+    a : np.array
+        The sub-diagonal of A (n-1 elements).
+    b : np.array
+        The diagonal of A (n elements).
+    c : np.array
+        The super-diagonal of A (n-1 elements).
+
+    Returns
+    -------
+    factor : tuple
+        The multipliers (sub-diagonal of L), the diagonal of U and the super-diagonal of U (the one of A).
+
+    raises
+    ------
+    ValueError
+        If the sizes of the diagonals do not match or a pivot is zero.
+    """
+    n = len(b)  # Size of the system
+    if len(a) != n - 1 or len(c) != n - 1:
+        raise ValueError("The sizes of the diagonals and the right-hand side differ")
+
+    # Single precision diagonals are kept in single precision, anything else is computed in double precision
+    dtype = np.result_type(*map(np.asarray, (a, b, c)), np.float32)
+    multipliers = np.zeros(n - 1, dtype=dtype)  # Sub-diagonal of L
+    diagonal = np.array(b, dtype=dtype)  # Diagonal of U (copied, b is not modified)
+
+    # Forward elimination: remove the sub-diagonal
+    for row in range(1, n):
+        if diagonal[row - 1] == 0:
+            raise ValueError("Zero pivot found, the matrix needs pivoting")
+        multipliers[row - 1] = a[row - 1] / diagonal[row - 1]  # Multiplier of the row
+        diagonal[row] -= multipliers[row - 1] * c[row - 1]  # Update the diagonal
+
+    if diagonal[-1] == 0:
+        raise ValueError("Zero pivot found, the matrix needs pivoting")
+
+    return multipliers, diagonal, np.array(c, dtype=dtype)
+
+
+def tridiagonal_lu_solve(factor, r):
+    """
+    Solves Ax = r with the LU factorization of a tridiagonal matrix (see tridiagonal_lu), a forward and a backward sweep in O(n).
+
+    Parameters
+    ----------
+    factor : tuple
+        The factorization returned by tridiagonal_lu.
+    r : np.array
+        The right-hand side (n elements), or n rows of right-hand sides solved at once.
+
+    Returns
+    -------
+    x : np.array
+        A vector (or one column per right-hand side).
+
+    raises
+    ------
+    ValueError
+        If the sizes of the factorization and the right-hand side differ.
+    """
+    multipliers, diagonal, c = factor
+    n = len(diagonal)  # Size of the system
+    if len(r) != n:
+        raise ValueError("The sizes of the diagonals and the right-hand side differ")
+    x = np.array(
+        r, dtype=np.result_type(np.asarray(r), diagonal)
+    )  # Right-hand side, overwritten by the solution
+
+    # Forward substitution with L
+    for row in range(1, n):
+        x[row] -= multipliers[row - 1] * x[row - 1]
+
+    # Backward substitution on the upper bidiagonal system
+    x[-1] /= diagonal[-1]
+    for row in range(n - 2, -1, -1):
+        x[row] = (x[row] - c[row] * x[row + 1]) / diagonal[row]
+
+    return x
+
+
+def cyclic_tridiagonal_lu(a, b, c, alpha, beta):
+    """
+    Prepares the solution of a cyclic tridiagonal system: a tridiagonal matrix plus the corners A[0, n-1] = alpha and A[n-1, 0] = beta.
+    A = T + u v^T with T tridiagonal, u = (gamma, 0, ..., 0, beta), v = (1, 0, ..., 0, alpha / gamma) (Sherman-Morrison),
+    so T is factorized and T z = u is solved once; every system is then solved with two sweeps in O(n).
+
+    Parameters
+    ----------
+    a : np.array
+        The sub-diagonal of A (n-1 elements).
+    b : np.array
+        The diagonal of A (n elements, at least 3).
+    c : np.array
+        The super-diagonal of A (n-1 elements).
+    alpha : float
+        The top right corner A[0, n-1].
+    beta : float
+        The bottom left corner A[n-1, 0].
+
+    Returns
+    -------
+    factor : tuple
+        The factorization of T, z = T^-1 u, the last element of v and 1 + v^T z.
+
+    raises
+    ------
+    ValueError
+        If the sizes do not match, a pivot is zero or the matrix is singular.
+    """
+    if len(b) < 3:
+        raise ValueError("A cyclic tridiagonal system needs at least 3 rows")
+    gamma = -b[0]  # Avoids cancellation in the first pivot of T
+    modified = np.array(
+        b, dtype=np.result_type(*map(np.asarray, (a, b, c)), np.float32)
+    )
+    modified[0] -= gamma
+    modified[-1] -= alpha * beta / gamma
+
+    lu_factor = tridiagonal_lu(a, modified, c)
+    u = np.zeros(len(b), dtype=modified.dtype)
+    u[0], u[-1] = gamma, beta
+    z = tridiagonal_lu_solve(lu_factor, u)
+    v_last = alpha / gamma
+    denominator = 1 + z[0] + v_last * z[-1]  # 1 + v^T z
+    if denominator == 0:
+        raise ValueError("Matrix is singular")
+
+    return lu_factor, z, v_last, denominator
+
+
+def cyclic_tridiagonal_lu_solve(factor, r):
+    """
+    Solves the cyclic tridiagonal system Ax = r with the factorization returned by cyclic_tridiagonal_lu, in O(n).
+
+    Parameters
+    ----------
+    factor : tuple
+        The factorization returned by cyclic_tridiagonal_lu.
+    r : np.array
+        The right-hand side (n elements), or n rows of right-hand sides solved at once.
+
+    Returns
+    -------
+    x : np.array
+        A vector (or one column per right-hand side).
+    """
+    lu_factor, z, v_last, denominator = factor
+    y = tridiagonal_lu_solve(lu_factor, r)  # T y = r
+    # x = y - z (v^T y) / (1 + v^T z)
+    z = z.reshape(z.shape + (1,) * (y.ndim - 1))
+    return y - z * ((y[0] + v_last * y[-1]) / denominator)
+
+
+def batched_lu_solve(A, b):
+    """
+    Solves many independent systems A[i] x[i] = b[i] at once, using Gaussian elimination with partial pivoting vectorized over the systems.
+
+    Parameters
+    ----------
+    A : np.array
+        A stack of square matrices with shape (m, n, n).
+    b : np.array
+        A stack of vectors with shape (m, n).
+
+    Returns
+    -------
+    x : np.array
+        The solutions, with shape (m, n).
+
+    raises
+    ------
+    ValueError
+        If the shapes do not match or any of the matrices is singular.
+    """
+    A = np.array(A, dtype=float)  # Copy of the matrices, overwritten by U
+    x = np.array(b, dtype=float)  # Copy of the right-hand sides, overwritten by x
+    if A.ndim != 3 or A.shape[1] != A.shape[2] or x.shape != A.shape[:2]:
+        raise ValueError("A must have shape (m, n, n) and b shape (m, n)")
+
+    m, n = A.shape[:2]
+    systems = np.arange(m)
+    for col in range(n):
+        # Row with the largest pivot of every system, swapped with the current row
+        pivot = np.argmax(np.abs(A[:, col:, col]), axis=1) + col
+        A[systems, col], A[systems, pivot] = A[systems, pivot], A[systems, col].copy()
+        x[systems, col], x[systems, pivot] = x[systems, pivot], x[systems, col].copy()
+
+        if np.any(A[:, col, col] == 0):
+            raise ValueError("Matrix is singular")
+
+        # Gaussian elimination of the rows below the pivot, for every system
+        factors = A[:, col + 1 :, col] / A[:, col, col, None]
+        A[:, col + 1 :, col:] -= factors[:, :, None] * A[:, None, col, col:]
+        x[:, col + 1 :] -= factors * x[:, col, None]
+
+    # Backward substitution, for every system
+    for row in range(n - 1, -1, -1):
+        x[:, row] -= np.einsum("ij,ij->i", A[:, row, row + 1 :], x[:, row + 1 :])
+        x[:, row] /= A[:, row, row]
+
+    return x
+
+
+def banded_cholesky(ab, check=True):
+    """
+    Computes the Cholesky factorization A = L L^T of a symmetric positive definite banded matrix in O(n p^2), p being the bandwidth.
+    A stack of matrices with the same size is factored at once, every step of the recursion is vectorized over the stack.
+
+    Parameters
+    ----------
+    ab : np.array
+        The lower band of A with shape (p+1, n): ab[j, i] = A[i+j, i] (the diagonal is ab[0]), or a stack of bands with shape (..., p+1, n).
+    check : bool, optional
+        If True, raise ValueError when a matrix is not positive definite; if False, its factor is NaN instead (default: True).
+
+    Returns
+    -------
+    factor : np.array
+        The lower band of L in the same layout: factor[..., j, i] = L[i+j, i].
+
+    raises
+    ------
+    ValueError
+        If the band has less than 2 dimensions, or check is True and a matrix is not positive definite.
+    """
+    ab = np.asarray(ab, dtype=float)
+    if ab.ndim < 2:
+        raise ValueError("The band must have shape (p+1, n)")
+    p, n = ab.shape[-2] - 1, ab.shape[-1]
+    # Copy with shape (p+1, n, ...), overwritten by L: the band of column i is L[:, i] and the diagonals are L[j],
+    # the matrices of the stack are the last (contiguous) axis of every element
+    L = np.moveaxis(ab, (-2, -1), (0, 1)).copy()
+
+    with np.errstate(
+        invalid="ignore", divide="ignore"
+    ):  # NaN factors when check is False
+        for i in range(n):
+            if check and not (L[0, i] > 0).all():
+                raise ValueError("The matrix is not positive definite")
+            pivot = L[0, i] = np.sqrt(L[0, i])
+            m = min(p, n - 1 - i)  # Rows below the diagonal inside the band
+            column = L[1 : m + 1, i]  # Column i of L
+            column /= pivot
+
+            # Update of the trailing submatrix A[i+j, i+k] -= L[i+j, i] L[i+k, i], one diagonal d = j - k of the band at a time
+            for d in range(m):
+                L[d, i + 1 : i + 1 + m - d] -= column[d:] * column[: m - d]
+
+    return np.moveaxis(L, (0, 1), (-2, -1))
+
+
+def banded_cholesky_solve(factor, r):
+    """
+    Solves Ax = r with the Cholesky factor of a banded matrix (see banded_cholesky) in O(n p).
+
+    Parameters
+    ----------
+    factor : np.array
+        The lower band of L, as returned by banded_cholesky, or a stack of them.
+    r : np.array
+        The right-hand side (n elements), or n rows of right-hand sides solved at once. With a stack of factors,
+        one right-hand side per factor, with shape (..., n).
+
+    Returns
+    -------
+    x : np.array
+        A vector (or one column per right-hand side), with the shape of r.
+
+    raises
+    ------
+    ValueError
+        If the sizes of the factor and the right-hand side differ.
+    """
+    factor = np.asarray(factor, dtype=float)
+    stack = factor.shape[:-2]
+    p, n = factor.shape[-2] - 1, factor.shape[-1]
+    x = np.array(r, dtype=float)  # Right-hand side, overwritten by the solution
+    if x.shape[: len(stack) + 1] != stack + (n,):
+        raise ValueError("The sizes of the factor and the right-hand side differ")
+    # Views with the rows first, as in banded_cholesky; several right-hand sides are columns broadcast against L
+    x = np.moveaxis(x, len(stack), 0).copy()
+    L = np.moveaxis(factor, (-2, -1), (0, 1)).copy()
+    L = L.reshape(L.shape + (1,) * (x.ndim - 1 - len(stack)))
+
+    # Forward substitution, L y = r
+    for i in range(n):
+        m = min(p, n - 1 - i)
+        x[i] /= L[0, i]
+        x[i + 1 : i + 1 + m] -= L[1 : m + 1, i] * x[i]
+
+    # Backward substitution, L^T x = y
+    for i in range(n - 1, -1, -1):
+        m = min(p, n - 1 - i)
+        x[i] -= (L[1 : m + 1, i] * x[i + 1 : i + 1 + m]).sum(axis=0)
+        x[i] /= L[0, i]
+
+    return np.moveaxis(x, 0, len(stack))
+
+
+def banded_inverse(factor):
+    """
+    Computes the band of the inverse of a banded matrix from its Cholesky factor (Hutchinson - de Hoog recursion) in O(n p^2).
+    The rest of the inverse is not computed; the band is enough for traces such as tr(A^-1 B) with B banded.
+
+    Parameters
+    ----------
+    factor : np.array
+        The lower band of L, as returned by banded_cholesky, or a stack of them.
+
+    Returns
+    -------
+    band : np.array
+        The lower band of A^-1 in the same layout: band[..., j, i] = A^-1[i+j, i].
+    """
+    factor = np.asarray(factor, dtype=float)
+    p, n = factor.shape[-2] - 1, factor.shape[-1]
+    L = np.moveaxis(
+        factor, (-2, -1), (0, 1)
+    ).copy()  # Rows first, as in banded_cholesky
+    band = np.zeros_like(L)
+
+    # A^-1[i+j, i+k] for j, k = 1..p is in the band, below or above the diagonal: band[|j-k|, i+min(j,k)]
+    j, k = np.meshgrid(np.arange(1, p + 1), np.arange(1, p + 1), indexing="ij")
+    rows, columns = np.abs(j - k), np.minimum(j, k)
+
+    # A^-1 L = L^-T is upper triangular with diagonal 1/L[i, i], solved column by column from the last one
+    for i in range(n - 1, -1, -1):
+        m = min(p, n - 1 - i)
+        window = band[rows[:m, :m], i + columns[:m, :m]]
+        column = L[1 : m + 1, i]
+        # A^-1[i+j, i] = -sum(A^-1[i+j, i+k] L[i+k, i]) / L[i, i]
+        band[1 : m + 1, i] = -(window * column).sum(axis=1) / L[0, i]
+        total = (column * band[1 : m + 1, i]).sum(axis=0)
+        band[0, i] = (1 / L[0, i] - total) / L[0, i]
+
+    return np.moveaxis(band, (0, 1), (-2, -1))
@@ -1,27 +1,186 @@
+import asyncio
+from collections import OrderedDict
+from functools import partial
+import warnings
 import numpy as np
-from BNumMet.Interpolation import polinomial
+from BNumMet.AutomaticDifferentiation import complex_step, derivatives
+from BNumMet.Interpolation import polinomial, sample_function
+from BNumMet.LinearSystems import eigenvalues, lu_factor, lu_factor_solve
 
 global exceptions
 exceptions = [ValueError("The function has no zeros in the given interval")]
 
+# Names of the procedures of zBrentDekker, the traces store their indices
+procedures = ("Bisection", "Secant", "IQI")
+# Reasons why a root finding method stops, the vectorized methods store their indices
+reasons = (
+    "zero found",
+    "tolerance reached",
+    "maximum iterations reached",
+    "zero derivative",
+    "no progress",
+    "diverged",
+    "secant undefined",
+)
 
-def bisect(f, interval, stop_iters=100, iters=False, *args):
+
+class Memoized:
+    """
+    Wraps a function counting its evaluations and remembering the last maxsize values in a LRU cache,
+    so that repeated calls with the same point and arguments do not evaluate the function again.
+    The calls with arguments that cannot be hashed (arrays) are evaluated and counted, but not cached.
+    """
+
+    def __init__(self, f, maxsize=128):
+        """
+        params:
+            f: function to wrap, f(x, *args)
+            maxsize (optional): number of values kept in the cache, 0 disables the cache (default: 128)
+        """
+        self.f = f
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        # Number of evaluations of f and of values taken from the cache
+        self.nfev = 0
+        self.hits = 0
+
+    def __call__(self, x, *args):
+        """
+        Value of the function at x, from the cache if it was already evaluated
+
+        params:
+            x: point where the function is evaluated
+            *args: arguments of the function
+
+        returns:
+            f(x, *args)
+        """
+        key = (x, *args)
+        try:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        except TypeError:  # The key cannot be hashed, skip the cache
+            key = None
+
+        self.nfev += 1
+        value = self.f(x, *args)
+        if key is not None and self.maxsize > 0:
+            self.cache[key] = value
+            # Drop the least recently used value when the cache is full
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return value
+
+
+class RootResult:
+    """
+    Result of a root finding method
+    """
+
+    __slots__ = (
+        "root",
+        "froot",
+        "iterations",
+        "nfev",
+        "njev",
+        "converged",
+        "reason",
+        "trace",
+    )
+
+    def __init__(
+        self,
+        root,
+        froot,
+        iterations,
+        nfev,
+        njev=0,
+        converged=True,
+        reason=None,
+        trace=None,
+    ):
+        """
+        params:
+            root: zero found by the method
+            froot: value of the function at the zero
+            iterations: number of iterations performed
+            nfev: number of evaluations of the function
+            njev (optional): number of evaluations of the derivative (default: 0)
+            converged (optional): whether the method met its stopping criteria before the maximum number of iterations (default: True)
+            reason (optional): why the method stopped, one of reasons (default: None)
+            trace (optional): index in procedures of the step of every iteration, as an int8 array (default: None, not traced)
+
+        In the vectorized methods every attribute is an array with one value per interval, reason holds indices of reasons and
+        trace has one row per interval with the number of steps of every procedure.
+        """
+        self.root = root
+        self.froot = froot
+        self.iterations = iterations
+        self.nfev = nfev
+        self.njev = njev
+        self.converged = converged
+        self.reason = reason
+        self.trace = trace
+
+    def __repr__(self):
+        return (
+            f"RootResult(root={self.root}, froot={self.froot}, iterations={self.iterations}, "
+            f"nfev={self.nfev}, njev={self.njev}, converged={self.converged}, reason={self.reason!r})"
+        )
+
+
+def deprecated_output(name, result, iters=False, steps=False):
+    """
+    Output of the iters and steps flags of the root finding methods, deprecated in favour of the attributes of RootResult
+    and kept for one release: the zero followed by the number of iterations and the names of the procedures, as requested
+
+    params:
+        name: name of the method, for the warning
+        result: RootResult of the method
+        iters (optional): a flag to return the number of iterations (default: False)
+        steps (optional): a flag to return the procedure of every iteration of zBrentDekker (default: False)
+
+    returns:
+        tuple with the zero and the requested values
+    """
+    warnings.warn(
+        f"The iters and steps arguments of {name} are deprecated and will be removed, "
+        "use the attributes of the returned RootResult instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+    output = (result.root,)
+    if iters:
+        output += (result.iterations,)
+    if steps:
+        output += ([procedures[k] for k in result.trace],)
+    return output
+
+
+def bisect(f, interval, stop_iters=100, iters=False, *args, cache=0):
     """
     Finds a zeros over the given interval using the Bisection method and tolerance ~ machine precision
 
     params:
         f: function to find the zeros
         interval: interval where the zeros are searched
+        stop_iters (optional): maximum number of iterations (default: 100)
+        iters (optional): deprecated, a flag to return (zero, iterations) instead of a RootResult (default: False)
         *args: arguments of the function f
+        cache (optional): size of the LRU cache of the values of f, see Memoized (default: 0, no cache)
 
     returns:
-        x: zeros of the function f
+        RootResult with the zero of the function f
 
     raises:
         ValueError: if the function has no zeros in the given interval
 
     """
 
+    # Count the evaluations of the function
+    f = Memoized(f, cache)
     x0, x1 = interval
     # Evaluate the function at the two points of the interval
     f0 = f(x0, *args)
@@ -32,49 +191,61 @@ def bisect(f, interval, stop_iters=100, iters=False, *args):
         raise exceptions[0]
 
     # Initialize x to the right endpoint of the interval
-    x = x1
+    x, fx = x1, f1
     # Initialize the iteration count to 0
     iterations = 0
+    reason = reasons[2]
     # Repeat the following loop until the function value at x is zero or the iteration count exceeds the maximum
     while f1 and iterations < stop_iters:
-        # Increment the iteration count
-        iterations += 1
         # Update x to be the midpoint of the interval
         x = 0.5 * (x0 + x1)
+        # Stop if the interval cannot be split anymore, its ends are consecutive floating point numbers
+        if x == x0 or x == x1:
+            fx = f0 if x == x0 else f1
+            reason = reasons[1]
+            break
+        # Increment the iteration count
+        iterations += 1
         # Evaluate the function at the new x
-        faux = f(x, *args)
+        fx = f(x, *args)
         # If the function has different signs at x and x1, set x0 to x
-        if faux * f1 < 0:
-            x0 = x
+        if fx * f1 < 0:
+            x0, f0 = x, fx
         # If the function has the same sign at x and x1, set x1 to x and update f1
         else:
-            x1 = x
-            f1 = faux
-    # If the iters argument is set to True, return the zero of the function and the number of iterations taken
+            x1, f1 = x, fx
+
+    if fx == 0:
+        reason = reasons[0]
+    result = RootResult(
+        x, fx, iterations, f.nfev, converged=reason != reasons[2], reason=reason
+    )
     if iters:
-        return x, iterations
-    # If the iters argument is set to False (default), return just the zero of the function
-    return x
+        return deprecated_output("bisect", result, iters)
+    return result
 
 
-def secant(fun, interval, stop_iters=100, iters=False, *args):
+def secant(fun, interval, stop_iters=100, iters=False, *args, cache=0):
     """
     Finds a zeros over the given interval using the secant method
 
     params:
         fun: function to find the zeros
         interval: interval where the zeros are searched
-        *args: arguments of the function fun
         stop_iters: maximum number of iterations (default 100)
-        iters: a flag to return the number of iterations performed (default False)
+        iters: deprecated, a flag to return (zero, iterations) instead of a RootResult (default False)
+        *args: arguments of the function fun
+        cache: size of the LRU cache of the values of fun, see Memoized (default 0, no cache)
 
     returns:
-        x: zeros of the function fun
+        RootResult with the zero of the function fun
 
     raises:
         ValueError: if the function has no zeros in the given interval
 
     """
+    # Count the evaluations of the function
+    fun = Memoized(fun, cache)
     # Set initial values for x0, x1
     x0, x1 = interval
     # Evaluate the function at x0 and x1
@@ -88,39 +259,70 @@ def secant(fun, interval, stop_iters=100, iters=False, *args):
 
     # Initialize the number of iterations
     iterations = 0
-    # Use the secant method to find the zero
-    while abs(x1 - x0) > np.finfo(float).eps and iterations < stop_iters:
+    eps = np.finfo(float).eps
+    lower, upper = min(x0, x1), max(x0, x1)
+    reason = None
+    # Use the secant method to find the zero, until the last two points are close enough, the zero is found or the secant fails
+    while abs(x1 - x0) > eps and f1 and iterations < stop_iters:
+        # The secant through two points with the same value has no zero
+        if f0 == f1:
+            reason = reasons[6]
+            break
         # Increase the iteration count
         iterations += 1
-        # Update the values of x2, x0, and x1
-        x2 = x0
-        x0 = x1
-        x1 = x1 + (x1 - x2) / (fun(x2, *args) / fun(x1, *args) - 1)
+        # Update the values of x2, x0, and x1, the values of the function are carried with them
+        x2, f2 = x0, f0
+        x0, f0 = x1, f1
+        x1 = x1 + (x1 - x2) / (f2 / f0 - 1)
+        # The iterates went to infinity (or nan), there is nothing left to evaluate
+        if not np.isfinite(x1):
+            f1, reason = np.nan, reasons[5]
+            break
+        f1 = fun(x1, *args)
 
-    # Check if the flag `iters` is set to True
+    if reason is None:  # The secant did not fail
+        if f1 == 0:
+            reason = reasons[0]
+        elif abs(x1 - x0) <= eps:
+            # Close points only count as a zero if the function decreased or they are still in the interval
+            inside = abs(f1) < abs(f0) or lower <= x1 <= upper
+            reason = reasons[1] if inside else reasons[5]
+        else:
+            reason = reasons[2]
+    result = RootResult(
+        x1,
+        f1,
+        iterations,
+        fun.nfev,
+        converged=reason in reasons[:2],
+        reason=reason,
+    )
     if iters:
-        # Return the zero and the number of iterations
-        return x1, iterations
-    # Return the zero
-    return x1
+        return deprecated_output("secant", result, iters)
+    return result
 
 
-def newton(fun, derivative, start_point, stop_iters=100, iters=False, *args):
+def newton(fun, derivative, start_point, stop_iters=100, iters=False, *args, cache=0):
     """
     Finds a zeros over the given interval using the Newton-Raphson method
 
     params:
         f: function to find the zeros
         interval: interval where the zeros are searched
+        stop_iters (optional): maximum number of iterations (default: 100)
+        iters (optional): deprecated, a flag to return (zero, iterations) instead of a RootResult (default: False)
         *args: arguments of the function f
+        cache (optional): size of the LRU caches of the values of f and its derivative, see Memoized (default: 0, no cache)
 
     returns:
-        x: zeros of the function f
+        RootResult with the zero of the function f, and the number of evaluations of its derivative
 
     raises:
         ValueError: if the function has no zeros in the given interval
 
     """
+    # Count the evaluations of the function and its derivative
+    fun, derivative = Memoized(fun, cache), Memoized(derivative, cache)
     # initializing previousX with a value not equal to startPoint
     # and xn with the startPoint to allow for iteration
     previous_x = start_point - 1
@@ -131,7 +333,8 @@ def newton(fun, derivative, start_point, stop_iters=100, iters=False, *args):
 
     # checking if the derivative of the function at xn is zero
     # and raising an error if it is
-    if derivative(xn, *args) == 0:
+    dfn = derivative(xn, *args)
+    if dfn == 0:
         raise ValueError("The derivative of the function is zero")
 
     # initializing iteration count to zero
@@ -144,7 +347,7 @@ def newton(fun, derivative, start_point, stop_iters=100, iters=False, *args):
     while (
         fn != 0
         and not np.isclose(xn - previous_x, 0)
-        and derivative(xn, *args) != 0
+        and dfn != 0
         and iterations < stop_iters
     ):
         # incrementing iteration count by one
@@ -154,35 +357,177 @@ def newton(fun, derivative, start_point, stop_iters=100, iters=False, *args):
         previous_x = xn
         # updating xn with the next iteration value
         # computed using the Newton-Raphson method
-        xn = xn - fn / derivative(xn, *args)
+        xn = xn - fn / dfn
         # evaluating the function at xn
         fn = fun(xn, *args)
+        # evaluating the derivative at xn, only if there is another iteration
+        if fn != 0 and not np.isclose(xn - previous_x, 0) and iterations < stop_iters:
+            dfn = derivative(xn, *args)
 
-    # if the iters flag is set, return xn and the number of iterations
-    # otherwise return only xn
+    if fn == 0:
+        reason = reasons[0]
+    elif np.isclose(xn - previous_x, 0):
+        reason = reasons[1]
+    elif dfn == 0:
+        reason = reasons[3]
+    else:
+        reason = reasons[2]
+    converged = reason in reasons[:2]
+    result = RootResult(
+        xn, fn, iterations, fun.nfev, derivative.nfev, converged, reason
+    )
     if iters:
-        return xn, iterations
-    return xn
+        return deprecated_output("newton", result, iters)
+    return result
+
+
+def safeguarded_newton(
+    f,
+    interval,
+    tol=10 ** (-20),
+    stop_iters=100,
+    *args,
+    method="newton",
+    derivative="dual",
+):
+    """
+    Finds a zero over the given interval with Newton, Halley or Steffensen steps kept inside a bracket: the interval is
+    shrunk with the sign of every evaluation, and a bisection is taken instead whenever the step leaves the bracket, is not
+    finite (a zero derivative) or does not halve the step before the last one. So it converges like bisection far from the
+    zero and quadratically (Newton, Steffensen) or cubically (Halley) near it, without a derivative written by hand:
+        - "newton": x - f / f'
+        - "halley": x - 2 f f' / (2 f'^2 - f f'')
+        - "steffensen": x - f / g with the slope g = (f(x + h) - f) / h, h = |f| towards the inside of the bracket (at most
+          half of it), two evaluations and no derivatives.
+    The derivatives are computed with forward mode automatic differentiation (AutomaticDifferentiation.Dual, one call with
+    f, f' and f'') or the complex step (one call for f and f', another for f'' of Halley), see AutomaticDifferentiation.
+
+    params:
+        f: function to find the zeros, f(x, *args), written with numpy functions for the derivatives
+        interval: interval where the zeros are searched
+        tol (optional): absolute tolerance of the zero (default: 1e-20)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function f
+        method (optional): "newton", "halley" or "steffensen" (default: "newton")
+        derivative (optional): "dual" or "complex", how the derivatives are computed (default: "dual")
+
+    returns:
+        RootResult with the zero of the function f, njev counts the evaluations that computed derivatives too
+
+    raises:
+        ValueError: if the function has no zeros in the given interval, or the method or derivative is unknown
+    """
+    if method not in ("newton", "halley", "steffensen"):
+        raise ValueError("The method must be 'newton', 'halley' or 'steffensen'")
+    if derivative not in ("dual", "complex"):
+        raise ValueError("The derivative must be 'dual' or 'complex'")
+    nfev, njev = 0, 0
+
+    def fun(x):
+        # Value of the function, counting the evaluations
+        nonlocal nfev
+        nfev += 1
+        return f(x, *args)
+
+    def evaluate(x):
+        # Value of the function and the derivatives the method needs
+        nonlocal nfev, njev
+        if method == "steffensen":
+            return fun(x), 0.0, 0.0
+        calls = 2 if method == "halley" and derivative == "complex" else 1
+        nfev, njev = nfev + calls, njev + calls
+        if derivative == "dual":
+            return derivatives(f, x, *args)
+        if method == "newton":
+            return (*complex_step(f, x, *args), 0.0)
+        return complex_step(f, x, *args, second=True)
+
+    a, b = interval
+    fa, fb = fun(a), fun(b)
+    if fa * fb > 0:
+        raise exceptions[0]
+    if fa == 0 or fb == 0:
+        x, fx = (a, fa) if fa == 0 else (b, fb)
+        return RootResult(x, fx, 0, nfev, njev, reason=reasons[0])
+
+    # Start at the middle of the bracket
+    x = 0.5 * (a + b)
+    fx, d1, d2 = evaluate(x)
+    step = step_before = b - a
+    iterations = 0
+    reason = reasons[2]
+    while fx != 0 and iterations < stop_iters:
+        # Keep the zero between a and b
+        if np.sign(fx) == np.sign(fa):
+            a, fa = x, fx
+        else:
+            b, fb = x, fx
+        tolerance = 2 * np.finfo(float).eps * abs(x) + tol
+        if abs(b - a) <= tolerance:
+            reason = reasons[1]
+            break
+
+        # Step of the method (a zero derivative or slope gives an infinite step, caught below)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if method == "newton":
+                delta = fx / np.float64(d1)
+            elif method == "halley":
+                delta = 2 * fx * d1 / np.float64(2 * d1 * d1 - fx * d2)
+            else:
+                # x is an end of the bracket, the step |f| goes towards the other end and at most to the middle
+                h = np.copysign(min(abs(fx), 0.5 * (b - a)), a + b - 2 * x)
+                slope = (fun(x + h) - fx) / h
+                delta = fx / np.float64(slope)
+        # A step below the tolerance (it may not even change x) means x is the zero
+        if abs(delta) <= tolerance:
+            reason = reasons[1]
+            break
+        new = x - delta
+
+        # Safeguard: bisection if the step is not finite, leaves the bracket or is not at most half of the one before the last
+        if not np.isfinite(new) or not a < new < b or abs(2 * delta) > abs(step_before):
+            new = 0.5 * (a + b)
+            delta = x - new
+        step_before, step = step, delta
 
+        iterations += 1
+        x = new
+        fx, d1, d2 = evaluate(x)
+        if abs(delta) <= tolerance:
+            reason = reasons[1]
+            break
+
+    if fx == 0:
+        reason = reasons[0]
+    return RootResult(
+        x, fx, iterations, nfev, njev, converged=reason != reasons[2], reason=reason
+    )
 
-def IQI(f, x_values, stop_iters=100, iters=False, *args):
+
+def IQI(f, x_values, stop_iters=100, iters=False, *args, cache=0):
     """
     Finds a zeros over the given interval using the Inverse Quadratic Interpolation method
 
     params:
         f: function to find the zeros
         xVals : [x0,x1,x2]
+        stop_iters (optional): maximum number of iterations (default: 100)
+        iters (optional): deprecated, a flag to return (zero, iterations) instead of a RootResult (default: False)
         *args: arguments of the function f
+        cache (optional): size of the LRU cache of the values of f, see Memoized (default: 0, no cache)
 
     returns:
-        x: zeros of the function f
+        RootResult with the zero of the function f
 
     raises:
         ValueError: if the function has no zeros in the given interval
 
     """
-    # Unpacking the initial values for x0, x1 and x2
+    # Count the evaluations of the function
+    f = Memoized(f, cache)
+    # Unpacking the initial values for x0, x1 and x2, their values are computed on the first iteration
     x0, x1, x2 = x_values
+    f0 = f1 = f2 = None
     # Initializing the iteration counter to 0
     iterations = 0
     # The main loop, where the inverse quadratic interpolation is performed
@@ -191,25 +536,112 @@ def IQI(f, x_values, stop_iters=100, iters=False, *args):
     while abs(x1 - x0) > np.finfo(float).eps and iterations < stop_iters:
         # Increase the iteration counter
         iterations += 1
-        # Evaluate the function at x0, x1, and x2
-        f0, f1, f2 = f(x0, *args), f(x1, *args), f(x2, *args)
+        # Evaluate the function at the points without value: all of them on the first iteration, only x0 afterwards
+        f0, f1, f2 = (
+            f(x, *args) if fx is None else fx
+            for x, fx in ((x0, f0), (x1, f1), (x2, f2))
+        )
         # Perform the inverse quadratic interpolation
         aux1 = (x0 * f1 * f2) / ((f0 - f1) * (f0 - f2))
         aux2 = (x1 * f0 * f2) / ((f1 - f0) * (f1 - f2))
         aux3 = (x2 * f1 * f0) / ((f2 - f0) * (f2 - f1))
         new = aux1 + aux2 + aux3
-        # Shift x0, x1, x2 to the right by 1 position
+        # Shift x0, x1, x2 and their values to the right by 1 position
         x0, x1, x2 = new, x0, x1
+        f0, f1, f2 = None, f0, f1
 
-    # If the argument iters is set to True, return both the result and the number of iterations
+    # The value at the last point is only computed for the result
+    if f0 is None:
+        f0 = f(x0, *args)
+    converged = abs(x1 - x0) <= np.finfo(float).eps
+    reason = reasons[0] if f0 == 0 else reasons[1] if converged else reasons[2]
+    result = RootResult(
+        x0, f0, iterations, f.nfev, converged=converged or f0 == 0, reason=reason
+    )
     if iters:
-        return x0, iterations
-    # Otherwise, return only the result
-    return x0
+        return deprecated_output("IQI", result, iters)
+    return result
+
+
+def brent_step(a, b, c, fa, fb, fc, d, e, m, tolerance):
+    """
+    Chooses the next step of zBrentDekker from the current best point b, the previous one a and the other end c of the
+    bracket: inverse quadratic interpolation, secant or bisection when the interpolation is not safe.
+
+    params:
+        a, b, c: previous point, best point and other end of the bracket
+        fa, fb, fc: values of the function at a, b and c
+        d, e: last step and the one before it
+        m: half of the bracket, (c - b) / 2
+        tolerance: tolerance of the current iteration
+
+    returns:
+        d, e: the new step and the previous one
+        procedure: index in procedures of the step taken
+    """
+    # Check if bisection is forced
+    if abs(e) < tolerance or abs(fa) <= abs(fb):
+        return m, m, 0
+
+    # Calculate the ratio of fb and fa
+    s = fb / fa
+    if a == c:
+        # Use linear interpolation
+        p = 2 * m * s
+        q = 1 - s
+    else:
+        # Use inverse quadratic interpolation
+        q = fa / fc
+        r = fb / fc
+        p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+        q = (q - 1) * (r - 1) * (s - 1)
+
+    # Correct the sign of p and q
+    if p > 0:
+        q = -q
+    else:
+        p = -p
+
+    # Validate the interpolation
+    if 2 * p < 3 * m * q - abs(tolerance * q) and p < abs(0.5 * e * q):
+        # The interpolation is valid
+        return p / q, d, 2 if a != c else 1
+    # The interpolation is not valid, we use bisection
+    return m, m, 0
+
+
+def brent_bracket(a, b, c, fa, fb, fc, d, e):
+    """
+    Updates the bracket of zBrentDekker after evaluating the new point b: c is moved so that the zero stays between b and c,
+    or else b and c are swapped if c is the best point.
+
+    params:
+        a, b, c: previous point, new point and other end of the bracket
+        fa, fb, fc: values of the function at a, b and c
+        d, e: last step and the one before it
+
+    returns:
+        a, b, c, fa, fb, fc, d, e updated
+    """
+    # Section: int, the zero is between a and b
+    if np.sign(fb) == np.sign(fc) != 0:
+        c, fc, d, e = a, fa, b - a, b - a
+    # Section: ext, c is the best point
+    elif abs(fc) < abs(fb):
+        a, b, c, fa, fb, fc = b, c, b, fb, fc, fb
+    return a, b, c, fa, fb, fc, d, e
 
 
 def zBrentDekker(
-    f, interval, tol=10 ** (-20), stop_iters=100, iters=False, steps=False, *args
+    f,
+    interval,
+    tol=10 ** (-20),
+    stop_iters=100,
+    iters=False,
+    steps=False,
+    *args,
+    trace=False,
+    cache=0,
 ):
     """
     Finds a zeros over the given interval using a combination of Bisection and secant method
@@ -217,15 +649,23 @@ def zBrentDekker(
     params:
         f: function to find the zeros
         interval: interval where the zeros are searched
+        tol (optional): absolute tolerance of the zero (default: 1e-20)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        iters (optional): deprecated, a flag to return (zero, iterations) instead of a RootResult (default: False)
+        steps (optional): deprecated, a flag to also return the names of the procedures of every iteration (default: False)
         *args: arguments of the function f
+        trace (optional): a flag to record the procedure of every iteration, see RootResult (default: False)
+        cache (optional): size of the LRU cache of the values of f, see Memoized (default: 0, no cache)
 
     returns:
-        x: zeros of the function f
+        RootResult with the zero of the function f
 
     raises:
         ValueError: if the function has no zeros in the given interval
 
     """
+    # Count the evaluations of the function
+    f = Memoized(f, cache)
     # Split the interval into a and b
     a, b = interval
     # Evaluate the function at a and b
@@ -237,90 +677,1266 @@ def zBrentDekker(
         raise exceptions[0]
 
     # Initialize the variables for the internal section
-    c, fc, d, e = a, fa, b - a, b - a
-
-    # Check if fc is smaller than fb, if so swap the values
-    if abs(fc) < abs(fb):
-        a, b, c, fa, fb, fc = b, c, b, fb, fc, fb
+    a, b, c, fa, fb, fc, d, e = brent_bracket(a, b, a, fa, fb, fa, b - a, b - a)
 
     # Calculate the tolerance level
     tolerance = 2 * np.finfo(float).eps * abs(b) + tol
     m = 0.5 * (c - b)
 
-    # Initialize iteration and procedure stack
+    # Initialize iteration count and the trace of the procedures, only if it is requested
     iterations = 0
-    procedure_stack = []
+    procedure_stack = [] if trace or steps else None
 
     # Repeat until the tolerance level is met or max iterations is reached
     while abs(m) > tolerance and fb and iterations < stop_iters:
         # Calculate next step
-        # =============================================================================================================
-        # Check if bisection is forced
-        if abs(e) < tolerance or abs(fa) <= abs(fb):
-            d = m
-            e = m
-            procedure_stack.append("Bisection")
+        d, e, procedure = brent_step(a, b, c, fa, fb, fc, d, e, m, tolerance)
+        if procedure_stack is not None:
+            procedure_stack.append(procedure)
+        a = b
+        fa = fb
+
+        b += d if abs(d) > tolerance else np.sign(m) * tolerance
+        fb = f(b, *args)
+
+        # Update interval
+        a, b, c, fa, fb, fc, d, e = brent_bracket(a, b, c, fa, fb, fc, d, e)
+
+        # Update tolerance and m for the next iteration
+        tolerance = 2 * np.finfo(float).eps * abs(b) + tol
+        m = 0.5 * (c - b)
+
+        iterations += 1
+    zero = b
+    if procedure_stack is not None:
+        procedure_stack = np.array(procedure_stack, dtype=np.int8)
+    if fb == 0:
+        reason = reasons[0]
+    elif abs(m) <= tolerance:
+        reason = reasons[1]
+    else:
+        reason = reasons[2]
+    result = RootResult(
+        zero,
+        fb,
+        iterations,
+        f.nfev,
+        converged=reason != reasons[2],
+        reason=reason,
+        trace=procedure_stack,
+    )
+    if iters or steps:
+        return deprecated_output("zBrentDekker", result, iters, steps)
+    return result
+
+
+def parallel_zBrentDekker(
+    f,
+    interval,
+    tol=10 ** (-20),
+    stop_iters=100,
+    *args,
+    executor=None,
+    k=8,
+    trace=False,
+):
+    """
+    Speculative parallel version of zBrentDekker for expensive functions: every iteration evaluates a batch of candidates
+    at once on the executor instead of a single point:
+        - the step zBrentDekker would take (IQI, secant or bisection) and that point moved by the tolerance to both sides
+        - the secant point and the midpoint of the bracket
+        - the k - 1 points that split the bracket into k equal parts (k-section)
+    and the bracket is shrunk to the pair of consecutive evaluated points around the sign change. The bracket shrinks at
+    least k times per iteration (log2(k) bisections) and, once the interpolation is accurate, the points next to it close
+    the bracket in a single iteration. zBrentDekker stays the reference for the number of evaluations, this method trades
+    more evaluations for fewer iterations (wall-clock time when the batch runs in parallel).
+
+    params:
+        f: function to find the zeros, f(x, *args), it must be picklable for a process pool
+        interval: interval where the zeros are searched
+        tol (optional): absolute tolerance of the zero (default: 1e-20)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function f
+        executor (optional): executor where the candidates are evaluated, e.g. a concurrent.futures.ProcessPoolExecutor
+            (default: None, evaluated one after the other)
+        k (optional): number of parts of the k-section, up to k + 4 evaluations per iteration (default: 8)
+        trace (optional): a flag to record the procedure zBrentDekker would take in every iteration, see RootResult (default: False)
+
+    returns:
+        RootResult with the zero of the function f, iterations counts the batches
+
+    raises:
+        ValueError: if the function has no zeros in the given interval or k is smaller than 2
+    """
+    if k < 2:
+        raise ValueError("The k-section needs k >= 2")
+    fun = partial(call, f, args)
+    nfev = 0
+
+    def evaluate(points):
+        # Evaluate a batch of points, in parallel if there is an executor
+        nonlocal nfev
+        nfev += len(points)
+        if executor is None:
+            return [fun(x) for x in points]
+        return list(executor.map(fun, points))
+
+    a, b = interval
+    fa, fb = evaluate([a, b])
+    if fa * fb > 0:
+        raise exceptions[0]
+
+    a, b, c, fa, fb, fc, d, e = brent_bracket(a, b, a, fa, fb, fa, b - a, b - a)
+    tolerance = 2 * np.finfo(float).eps * abs(b) + tol
+    m = 0.5 * (c - b)
+
+    iterations = 0
+    procedure_stack = [] if trace else None
+    while abs(m) > tolerance and fb and iterations < stop_iters:
+        # Candidates: the step of zBrentDekker, its neighbours, the secant point, the midpoint and the k-section
+        d, e, procedure = brent_step(a, b, c, fa, fb, fc, d, e, m, tolerance)
+        if procedure_stack is not None:
+            procedure_stack.append(procedure)
+        step = b + (d if abs(d) > tolerance else np.sign(m) * tolerance)
+        candidates = np.concatenate(
+            [
+                [step, step - tolerance, step + tolerance],
+                [b - fb * (c - b) / (fc - fb), b + m],
+                b + (c - b) * np.arange(1, k) / k,
+            ]
+        )
+        # Keep the distinct candidates strictly inside the bracket
+        low, high = min(b, c), max(b, c)
+        candidates = np.unique(candidates[(candidates > low) & (candidates < high)])
+        values = evaluate(candidates.tolist())
+
+        # All the evaluated points of the bracket, in order
+        points = np.concatenate([[low], candidates, [high]])
+        fpoints = np.concatenate(
+            [[fb if low == b else fc], values, [fc if high == c else fb]]
+        )
+        iterations += 1
+
+        if np.any(fpoints == 0):  # A zero was evaluated
+            b, fb = points[np.argmax(fpoints == 0)], 0.0
+            break
+
+        # Pairs of consecutive points with a sign change (signs, products can underflow), keep the one with the smallest value
+        signs = np.sign(fpoints)
+        change = np.flatnonzero(signs[:-1] != signs[1:])
+        i = change[
+            np.argmin(np.minimum(np.abs(fpoints[change]), np.abs(fpoints[change + 1])))
+        ]
+        # b is the best end and c the other one, a is the point next to b outside the bracket (for the interpolation)
+        if abs(fpoints[i]) <= abs(fpoints[i + 1]):
+            b, fb, c, fc, j = (
+                points[i],
+                fpoints[i],
+                points[i + 1],
+                fpoints[i + 1],
+                i - 1,
+            )
         else:
-            # Calculate the ratio of fb and fa
-            s = fb / fa
-            if a == c:
-                # Use linear interpolation
-                p = 2 * m * s
-                q = 1 - s
-            else:
-                # Use inverse quadratic interpolation
-                q = fa / fc
-                r = fb / fc
-                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
-                q = (q - 1) * (r - 1) * (s - 1)
+            b, fb, c, fc, j = (
+                points[i + 1],
+                fpoints[i + 1],
+                points[i],
+                fpoints[i],
+                i + 2,
+            )
+        a, fa = (points[j], fpoints[j]) if 0 <= j < len(points) else (c, fc)
+        # The bracket shrinks by the k-section, so the interpolation does not need the step history
+        d = e = c - b
 
-            # Correct the sign of p and q
-            if p > 0:
-                q = -q
-            else:
-                p = -p
+        tolerance = 2 * np.finfo(float).eps * abs(b) + tol
+        m = 0.5 * (c - b)
 
-            s = e
-            e = d
+    if procedure_stack is not None:
+        procedure_stack = np.array(procedure_stack, dtype=np.int8)
+    if fb == 0:
+        reason = reasons[0]
+    elif abs(m) <= tolerance:
+        reason = reasons[1]
+    else:
+        reason = reasons[2]
+    return RootResult(
+        b,
+        fb,
+        iterations,
+        nfev,
+        converged=reason != reasons[2],
+        reason=reason,
+        trace=procedure_stack,
+    )
 
-            # Validate the interpolation
-            if 2 * p < 3 * m * q - abs(tolerance * q) and p < abs(0.5 * s * q):
-                # The interpolation is valid
-                d = p / q
-                procedure_stack.append("IQI" if a != c else "Secant")
-            else:
-                # The interpolation is not valid, we use bisection
-                d = m
-                e = m
-                procedure_stack.append("Bisection")
-        a = b
-        fa = fb
 
+async def async_bisect(f, interval, stop_iters=100, *args):
+    """
+    Bisection method for a coroutine function, see bisect. The two ends of the interval are evaluated concurrently, so
+    that the wait for an I/O-bound function (a request to a server, a simulation, ...) can be overlapped with other tasks.
+
+    params:
+        f: coroutine function to find the zeros, awaited as f(x, *args)
+        interval: interval where the zeros are searched
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function f
+
+    returns:
+        RootResult with the zero of the function f
+
+    raises:
+        ValueError: if the function has no zeros in the given interval
+    """
+    nfev = 0
+
+    async def fun(x):
+        # Count the evaluations of the function
+        nonlocal nfev
+        nfev += 1
+        return await f(x, *args)
+
+    x0, x1 = interval
+    f0, f1 = await asyncio.gather(fun(x0), fun(x1))
+    if f0 * f1 > 0:
+        raise exceptions[0]
+
+    x, fx = x1, f1
+    iterations = 0
+    reason = reasons[2]
+    while f1 and iterations < stop_iters:
+        x = 0.5 * (x0 + x1)
+        # Stop if the interval cannot be split anymore
+        if x == x0 or x == x1:
+            fx = f0 if x == x0 else f1
+            reason = reasons[1]
+            break
+        iterations += 1
+        fx = await fun(x)
+        # Keep the half with the sign change
+        if fx * f1 < 0:
+            x0, f0 = x, fx
+        else:
+            x1, f1 = x, fx
+
+    if fx == 0:
+        reason = reasons[0]
+    return RootResult(
+        x, fx, iterations, nfev, converged=reason != reasons[2], reason=reason
+    )
+
+
+async def async_zBrentDekker(
+    f, interval, tol=10 ** (-20), stop_iters=100, *args, trace=False
+):
+    """
+    Brent-Dekker method for a coroutine function, it takes the same steps as zBrentDekker (so it finds the same zero) but
+    awaits every evaluation, and the two ends of the interval are evaluated concurrently.
+
+    params:
+        f: coroutine function to find the zeros, awaited as f(x, *args)
+        interval: interval where the zeros are searched
+        tol (optional): absolute tolerance of the zero (default: 1e-20)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function f
+        trace (optional): a flag to record the procedure of every iteration, see RootResult (default: False)
+
+    returns:
+        RootResult with the zero of the function f
+
+    raises:
+        ValueError: if the function has no zeros in the given interval
+    """
+    nfev = 0
+
+    async def fun(x):
+        # Count the evaluations of the function
+        nonlocal nfev
+        nfev += 1
+        return await f(x, *args)
+
+    a, b = interval
+    fa, fb = await asyncio.gather(fun(a), fun(b))
+    if fa * fb > 0:
+        raise exceptions[0]
+
+    a, b, c, fa, fb, fc, d, e = brent_bracket(a, b, a, fa, fb, fa, b - a, b - a)
+    tolerance = 2 * np.finfo(float).eps * abs(b) + tol
+    m = 0.5 * (c - b)
+
+    iterations = 0
+    procedure_stack = [] if trace else None
+    while abs(m) > tolerance and fb and iterations < stop_iters:
+        d, e, procedure = brent_step(a, b, c, fa, fb, fc, d, e, m, tolerance)
+        if procedure_stack is not None:
+            procedure_stack.append(procedure)
+        a, fa = b, fb
         b += d if abs(d) > tolerance else np.sign(m) * tolerance
-        fb = f(b, *args)
+        fb = await fun(b)
+        a, b, c, fa, fb, fc, d, e = brent_bracket(a, b, c, fa, fb, fc, d, e)
+
+        tolerance = 2 * np.finfo(float).eps * abs(b) + tol
+        m = 0.5 * (c - b)
+        iterations += 1
+
+    if procedure_stack is not None:
+        procedure_stack = np.array(procedure_stack, dtype=np.int8)
+    if fb == 0:
+        reason = reasons[0]
+    elif abs(m) <= tolerance:
+        reason = reasons[1]
+    else:
+        reason = reasons[2]
+    return RootResult(
+        b,
+        fb,
+        iterations,
+        nfev,
+        converged=reason != reasons[2],
+        reason=reason,
+        trace=procedure_stack,
+    )
+
+
+async def async_find_roots(
+    f,
+    intervals,
+    tol=10 ** (-20),
+    stop_iters=100,
+    *args,
+    method="zBrentDekker",
+    max_concurrency=100,
+    return_exceptions=False,
+):
+    """
+    Finds a zero in every interval of a list with async_zBrentDekker or async_bisect, interleaving all the problems over the
+    running event loop: while one problem waits for f, the others evaluate theirs, with at most max_concurrency evaluations
+    of f in flight at once (a limit for the server behind f). From synchronous code, use asyncio.run(async_find_roots(...)).
+
+    params:
+        f: coroutine function to find the zeros, awaited as f(x, *args)
+        intervals: list of intervals where the zeros are searched, one problem per interval
+        tol (optional): absolute tolerance of the zeros of zBrentDekker (default: 1e-20)
+        stop_iters (optional): maximum number of iterations of every problem (default: 100)
+        *args: arguments of the function f
+        method (optional): "zBrentDekker" or "bisect" (default: "zBrentDekker")
+        max_concurrency (optional): maximum number of evaluations of f awaited at the same time (default: 100)
+        return_exceptions (optional): return the ValueError of an interval without zeros in its place instead of raising it,
+            as in asyncio.gather (default: False)
+
+    returns:
+        list with the RootResult of every interval
+
+    raises:
+        ValueError: if the method is unknown or max_concurrency is smaller than 1, or a function has no zeros in an interval
+    """
+    if method not in ("zBrentDekker", "bisect"):
+        raise ValueError("The method must be 'zBrentDekker' or 'bisect'")
+    if max_concurrency < 1:
+        raise ValueError("There must be at least one evaluation in flight")
+
+    # Every evaluation of every problem waits for a free slot
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(x, *args):
+        async with semaphore:
+            return await f(x, *args)
+
+    if method == "bisect":
+        problems = [
+            async_bisect(limited, interval, stop_iters, *args) for interval in intervals
+        ]
+    else:
+        problems = [
+            async_zBrentDekker(limited, interval, tol, stop_iters, *args)
+            for interval in intervals
+        ]
+    return list(await asyncio.gather(*problems, return_exceptions=return_exceptions))
+
+
+def lane_arguments(args, lanes, n):
+    """
+    Selects the arguments of the active lanes of a vectorized solver: the arrays with one value per lane (first dimension n) are indexed,
+    the rest (scalars, shared arrays) are passed as they are
+
+    params:
+        args: arguments of the function
+        lanes: indices of the active lanes
+        n: number of lanes
+
+    returns:
+        args: arguments of the function for the active lanes
+    """
+    return tuple(
+        arg[lanes]
+        if isinstance(arg, np.ndarray) and arg.ndim and len(arg) == n
+        else arg
+        for arg in args
+    )
+
+
+def bracket_lanes(f, interval, args):
+    """
+    Evaluates a vectorized function at the ends of an array of intervals, checking that every interval brackets a zero
+
+    params:
+        f: vectorized function to find the zeros
+        interval: pair (a, b) of arrays (or scalars) with the ends of every interval
+        args: arguments of the function f, see lane_arguments
+
+    returns:
+        a, b: ends of the intervals, as flat float arrays
+        fa, fb: values of f at a and b
+
+    raises:
+        ValueError: if the function has no zeros in any of the intervals
+    """
+    a, b = np.broadcast_arrays(*(np.asarray(end, dtype=float) for end in interval))
+    a, b = a.ravel().copy(), b.ravel().copy()
+    fa = np.broadcast_to(np.asarray(f(a, *args), dtype=float), a.shape).copy()
+    fb = np.broadcast_to(np.asarray(f(b, *args), dtype=float), b.shape).copy()
+
+    # Every interval must have a sign change, as in the scalar methods
+    if np.any(fa * fb > 0):
+        raise exceptions[0]
+    return a, b, fa, fb
+
+
+def vectorized_bisect(f, interval, tol=0, stop_iters=100, *args):
+    """
+    Finds a zero in every interval of an array of intervals using the Bisection method, advancing all of them at once.
+    f is called once per iteration with the midpoints of the intervals that have not converged yet, which are retired as soon as
+    their zero is found, they cannot be split anymore or they are shorter than tol.
+
+    params:
+        f: vectorized function to find the zeros, f(x, *args) with x an array
+        interval: pair (a, b) of arrays (or scalars) with the ends of every interval
+        tol (optional): absolute tolerance of the zeros (default: 0, machine precision)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function f, the arrays with one value per interval are split among them
+
+    returns:
+        RootResult with arrays of the zeros of the function f and the rest of the results of every interval
+
+    raises:
+        ValueError: if the function has no zeros in any of the intervals
+    """
+    x0, x1, f0, f1 = bracket_lanes(f, interval, args)
+    n = len(x0)
+    # Results of every interval, the right ends are the zeros of the intervals that are already converged
+    x, fx = x1.copy(), f1.copy()
+    iterations = np.zeros(n, dtype=int)
+    reason = np.where(f1 == 0, 0, 2).astype(np.int8)
+    # Indices of the intervals that are still being bisected, and their state
+    lanes = np.flatnonzero(f1 != 0)
+    x0, x1, f0, f1 = x0[lanes], x1[lanes], f0[lanes], f1[lanes]
+
+    for iteration in range(1, stop_iters + 1):
+        # Midpoints of all the active intervals
+        middle = 0.5 * (x0 + x1)
+        # Retire the intervals that cannot be split anymore, as bisect does
+        split = (middle != x0) & (middle != x1)
+        if not split.all():
+            done = lanes[~split]
+            x[done], fx[done] = middle[~split], np.where(middle == x0, f0, f1)[~split]
+            reason[done] = 1
+            lanes, x0, x1, f0, f1, middle = (
+                v[split] for v in (lanes, x0, x1, f0, f1, middle)
+            )
+        if not len(lanes):
+            break
+
+        # Evaluate all the midpoints in a single call
+        faux = np.asarray(f(middle, *lane_arguments(args, lanes, n)), dtype=float)
+        x[lanes], fx[lanes], iterations[lanes] = middle, faux, iteration
+
+        # Keep the half of every interval with the sign change, as in bisect
+        left = faux * f1 < 0
+        x0, f0 = np.where(left, middle, x0), np.where(left, faux, f0)
+        x1, f1 = np.where(left, x1, middle), np.where(left, f1, faux)
+
+        # Retire the intervals with a zero or that are short enough
+        reason[lanes[np.abs(x1 - x0) <= tol]] = 1
+        reason[lanes[faux == 0]] = 0
+        active = (faux != 0) & (np.abs(x1 - x0) > tol)
+        lanes, x0, x1, f0, f1 = (v[active] for v in (lanes, x0, x1, f0, f1))
+
+    # Every interval is evaluated at its ends and once per iteration
+    return RootResult(x, fx, iterations, iterations + 2, 0, reason != 2, reason)
+
+
+def vectorized_secant(fun, interval, tol=0, stop_iters=100, *args):
+    """
+    Finds a zero in every interval of an array of intervals using the secant method, advancing all of them at once.
+    fun is called once per iteration with the new points of the intervals that have not converged yet, which are retired when
+    the last two points are closer than tol + 2 * eps * |x| (if |f| decreased or the point is inside the interval), the zero
+    is found, the iterates diverge or the secant cannot be computed.
+
+    params:
+        fun: vectorized function to find the zeros, fun(x, *args) with x an array
+        interval: pair (a, b) of arrays (or scalars) with the ends of every interval, the starting points of the method
+        tol (optional): absolute tolerance of the zeros (default: 0, machine precision)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function fun, the arrays with one value per interval are split among them
+
+    returns:
+        RootResult with arrays of the zeros of the function fun and the rest of the results of every interval
+
+    raises:
+        ValueError: if the function has no zeros in any of the intervals
+    """
+    x0, x1, f0, f1 = bracket_lanes(fun, interval, args)
+    n = len(x0)
+    x, fx = x1.copy(), f1.copy()
+    iterations = np.zeros(n, dtype=int)
+    reason = np.full(n, 2, dtype=np.int8)
+    eps = np.finfo(float).eps
+
+    lower, upper = np.minimum(x0, x1), np.maximum(x0, x1)
+
+    def converged(x0, x1, f0, f1, lower, upper):
+        # Reason of every interval to stop (-1 for the ones that go on): the zero is found, the iterates diverged, the last
+        # two points are close enough while |f| decreased or they are still in the interval, or the secant is not defined
+        close = np.abs(x1 - x0) <= tol + 2 * eps * np.abs(x1)
+        settled = (np.abs(f1) < np.abs(f0)) | ((lower <= x1) & (x1 <= upper))
+        return np.select(
+            [
+                f1 == 0,
+                ~np.isfinite(x1) | ~np.isfinite(f1),
+                close & settled,
+                f0 == f1,
+                close,
+            ],
+            [0, 5, 1, 6, 5],
+            -1,
+        )
+
+    stop = converged(x0, x1, f0, f1, lower, upper)
+    reason[stop >= 0] = stop[stop >= 0]
+    lanes = np.flatnonzero(stop < 0)
+    x0, x1, f0, f1, lower, upper = (v[lanes] for v in (x0, x1, f0, f1, lower, upper))
+
+    for iteration in range(1, stop_iters + 1):
+        if not len(lanes):
+            break
+        # Secant step of every active interval, the value at the last point is carried to the next iteration
+        x2 = x1 - f1 * (x1 - x0) / (f1 - f0)
+        f2 = np.asarray(fun(x2, *lane_arguments(args, lanes, n)), dtype=float)
+        x0, f0, x1, f1 = x1, f1, x2, f2
+        x[lanes], fx[lanes], iterations[lanes] = x1, f1, iteration
+
+        stop = converged(x0, x1, f0, f1, lower, upper)
+        reason[lanes[stop >= 0]] = stop[stop >= 0]
+        active = stop < 0
+        lanes, x0, x1, f0, f1, lower, upper = (
+            v[active] for v in (lanes, x0, x1, f0, f1, lower, upper)
+        )
+
+    # Every interval is evaluated at its ends and once per iteration
+    return RootResult(x, fx, iterations, iterations + 2, 0, reason <= 1, reason)
+
+
+def vectorized_zBrentDekker(
+    f, interval, tol=10 ** (-20), stop_iters=100, *args, trace=False
+):
+    """
+    Finds a zero in every interval of an array of intervals using the Brent-Dekker method, advancing all of them at once.
+    Every interval takes the same steps as in zBrentDekker, choosing Bisection, Secant or IQI on its own through NumPy masks.
+    f is called once per iteration with the new points of the intervals that have not converged yet, and the converged ones are retired.
+
+    params:
+        f: vectorized function to find the zeros, f(x, *args) with x an array
+        interval: pair (a, b) of arrays (or scalars) with the ends of every interval
+        tol (optional): absolute tolerance of the zeros (default: 1e-20)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the function f, the arrays with one value per interval are split among them
+        trace (optional): a flag to count the Bisection, Secant and IQI steps of every interval, see RootResult (default: False)
+
+    returns:
+        RootResult with arrays of the zeros of the function f and the rest of the results of every interval
+
+    raises:
+        ValueError: if the function has no zeros in any of the intervals
+    """
+    a, b, fa, fb = bracket_lanes(f, interval, args)
+    n = len(a)
+    eps = np.finfo(float).eps
+
+    # Initialize the variables for the internal section
+    c, fc, d, e = a, fa, b - a, b - a
+
+    # Swap the intervals where fc is smaller than fb
+    swap = np.abs(fc) < np.abs(fb)
+    a, b, c = np.where(swap, b, a), np.where(swap, c, b), np.where(swap, b, c)
+    fa, fb, fc = np.where(swap, fb, fa), np.where(swap, fc, fb), np.where(swap, fb, fc)
+
+    # Calculate the tolerance levels
+    tolerance = 2 * eps * np.abs(b) + tol
+    m = 0.5 * (c - b)
+
+    # Results of every interval and the indices of the ones that are not converged yet
+    x, fx = b.copy(), fb.copy()
+    iterations = np.zeros(n, dtype=int)
+    reason = np.where(fb == 0, 0, np.where(np.abs(m) <= tolerance, 1, 2)).astype(
+        np.int8
+    )
+    # Number of steps of every procedure, only if they are traced
+    counts = np.zeros((n, 3), dtype=int) if trace else None
+    lanes = np.flatnonzero(reason == 2)
+    a, b, c, fa, fb, fc, d, e, tolerance, m = (
+        v[lanes] for v in (a, b, c, fa, fb, fc, d, e, tolerance, m)
+    )
+
+    for iteration in range(1, stop_iters + 1):
+        if not len(lanes):
+            break
+        # Calculate next step of every interval
         # =============================================================================================================
+        # Bisection is forced where the last step was too small or did not improve
+        bisection = (np.abs(e) < tolerance) | (np.abs(fa) <= np.abs(fb))
+        use_secant = a == c
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = fb / fa
+            # Linear interpolation where a == c, inverse quadratic interpolation elsewhere
+            q = fa / fc
+            r = fb / fc
+            p = np.where(
+                use_secant, 2 * m * s, s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+            )
+            q = np.where(use_secant, 1 - s, (q - 1) * (r - 1) * (s - 1))
 
-        # Update interval
+            # Correct the sign of p and q
+            q = np.where(p > 0, -q, q)
+            p = np.abs(p)
+
+            # Validate the interpolation, the intervals where it is not valid use bisection
+            valid = (
+                ~bisection
+                & (2 * p < 3 * m * q - np.abs(tolerance * q))
+                & (p < np.abs(0.5 * e * q))
+            )
+            e = np.where(valid, d, m)
+            d = np.where(valid, p / q, m)
+        # Count the procedure of every interval: 0 Bisection, 1 Secant, 2 IQI
+        if counts is not None:
+            counts[lanes, np.where(valid, np.where(use_secant, 1, 2), 0)] += 1
+
+        a, fa = b, fb
+        b = b + np.where(np.abs(d) > tolerance, d, np.sign(m) * tolerance)
+        fb = np.asarray(f(b, *lane_arguments(args, lanes, n)), dtype=float)
         # =============================================================================================================
-        # Correct points accordingly
-        if np.sign(fb) == np.sign(fc) != 0:
-            # Section: int
-            c, fc, d, e = a, fa, b - a, b - a
+
+        # Update intervals
+        # =============================================================================================================
+        # Section: int, where the new point has the sign of c
+        inside = (np.sign(fb) == np.sign(fc)) & (np.sign(fc) != 0)
+        c, fc = np.where(inside, a, c), np.where(inside, fa, fc)
+        d, e = np.where(inside, b - a, d), np.where(inside, b - a, e)
         # Section: ext
-        elif abs(fc) < abs(fb):
-            a, b, c, fa, fb, fc = b, c, b, fb, fc, fb
+        swap = ~inside & (np.abs(fc) < np.abs(fb))
+        a, b, c = np.where(swap, b, a), np.where(swap, c, b), np.where(swap, b, c)
+        fa, fb, fc = (
+            np.where(swap, fb, fa),
+            np.where(swap, fc, fb),
+            np.where(swap, fb, fc),
+        )
 
         # Update tolerance and m for the next iteration
-        tolerance = 2 * np.finfo(float).eps * abs(b) + tol
+        tolerance = 2 * eps * np.abs(b) + tol
         m = 0.5 * (c - b)
+        x[lanes], fx[lanes], iterations[lanes] = b, fb, iteration
+
+        # Retire the converged intervals
+        reason[lanes[np.abs(m) <= tolerance]] = 1
+        reason[lanes[fb == 0]] = 0
+        active = (np.abs(m) > tolerance) & (fb != 0)
+        lanes, a, b, c, fa, fb, fc, d, e, tolerance, m = (
+            v[active] for v in (lanes, a, b, c, fa, fb, fc, d, e, tolerance, m)
+        )
+
+    # Every interval is evaluated at its ends and once per iteration
+    return RootResult(x, fx, iterations, iterations + 2, 0, reason != 2, reason, counts)
+
+
+def column_coloring(sparsity):
+    """
+    Colors the columns of a sparse Jacobian matrix so that the columns of the same color have no nonzero in a common row
+    (Curtis-Powell-Reid), with the greedy algorithm: the columns with more nonzeros are colored first, each with the lowest color
+    not used by the columns it shares a row with.
+
+    params:
+        sparsity: pattern of the nonzeros of the Jacobian, a boolean array or a scipy.sparse matrix of shape (m, n)
+
+    returns:
+        colors: color of every column, from 0 to the number of colors - 1
+    """
+    rows, cols = sparsity.nonzero()
+    m, n = sparsity.shape
+    # Rows of every column, the columns sorted by their number of nonzeros
+    order = np.argsort(cols, kind="stable")
+    rows, cols = rows[order], cols[order]
+    starts = np.searchsorted(cols, np.arange(n + 1))
+    counts = np.diff(starts)
+
+    colors = np.zeros(n, dtype=int)
+    # Colors already used in every row, with room for more colors when needed
+    used = np.zeros((m, max(np.bincount(rows, minlength=1).max(), 1)), dtype=bool)
+    for col in np.argsort(-counts, kind="stable"):
+        col_rows = rows[starts[col] : starts[col + 1]]
+        free = np.flatnonzero(~used[col_rows].any(axis=0))
+        if len(free):
+            color = free[0]
+        else:
+            color = used.shape[1]
+            used = np.hstack([used, np.zeros_like(used)])
+        colors[col] = color
+        used[col_rows, color] = True
+    return colors
+
+
+def sparse_modules():
+    """
+    Imports scipy.sparse and scipy.sparse.linalg.splu, which are only needed for sparse Jacobians (the sparsity option), so
+    scipy is an optional dependency: pip install BNumMet[sparse]
+
+    returns:
+        sparse, splu
+
+    raises:
+        ImportError: if scipy is not installed
+    """
+    try:
+        from scipy import sparse
+        from scipy.sparse.linalg import splu
+    except ImportError as error:
+        raise ImportError(
+            "Sparse Jacobians (the sparsity option) need scipy, install it with: pip install BNumMet[sparse]"
+        ) from error
+    return sparse, splu
+
+
+def finite_difference_jacobian(F, x, fx=None, *args, sparsity=None, colors=None):
+    """
+    Approximates the Jacobian matrix of F at x with forward differences.
+    Without sparsity pattern, F is evaluated once per column. With it, the columns of the same color (see column_coloring) are
+    perturbed at once, since they do not share rows, so F is evaluated once per color, and the result is a scipy.sparse matrix.
+
+    params:
+        F: function of the system, F(x, *args) with x an array of n values
+        x: point where the Jacobian is approximated
+        fx (optional): F(x) if it is already known (default: None, it is evaluated)
+        *args: arguments of the function F
+        sparsity (optional): pattern of the nonzeros of the Jacobian, a boolean array or a scipy.sparse matrix (default: None, dense)
+        colors (optional): coloring of the columns of the pattern, if it is already computed (default: None, computed here)
+
+    returns:
+        J: Jacobian matrix, J[i, j] = dF_i / dx_j, as a CSC scipy.sparse matrix if sparsity is given
+    """
+    x = np.asarray(x, dtype=float)
+    fx = np.asarray(F(x, *args) if fx is None else fx, dtype=float)
+    # Steps of the order of the square root of the machine precision, scaled by x
+    shifted = x + np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(x), 1)
+    h = shifted - x
+
+    if sparsity is None:
+        J = np.empty((len(fx), len(x)))
+        for j in range(len(x)):
+            point = x.copy()
+            point[j] = shifted[j]
+            J[:, j] = (np.asarray(F(point, *args), dtype=float) - fx) / h[j]
+        return J
+
+    sparse, _ = sparse_modules()
+
+    if colors is None:
+        colors = column_coloring(sparsity)
+    # Differences of F when the columns of every color are perturbed
+    differences = np.empty((len(fx), colors.max(initial=-1) + 1))
+    for color in range(differences.shape[1]):
+        point = np.where(colors == color, shifted, x)
+        differences[:, color] = np.asarray(F(point, *args), dtype=float) - fx
+
+    # Each nonzero is the only one of its row among the columns of its color
+    rows, cols = sparsity.nonzero()
+    values = differences[rows, colors[cols]] / h[cols]
+    return sparse.csc_matrix((values, (rows, cols)), shape=(len(fx), len(x)))
+
+
+def factorize(J):
+    """
+    LU factorization of a Jacobian matrix: LinearSystems.lu_factor for dense arrays, scipy.sparse.linalg.splu for scipy.sparse matrices
+
+    params:
+        J: Jacobian matrix
+
+    returns:
+        factor: factorization, to be used with factor_solve
+    """
+    if hasattr(J, "tocsc"):
+        _, splu = sparse_modules()
+        return splu(J.tocsc())
+    return lu_factor(J)
+
+
+def factor_solve(factor, r, transpose=False):
+    """
+    Solves J x = r (or J^T x = r) with the factorization of J returned by factorize
+
+    params:
+        factor: factorization of J
+        r: right-hand side
+        transpose (optional): solve the system with the transposed matrix (default: False)
+
+    returns:
+        x: solution of the system
+    """
+    if isinstance(factor, tuple):
+        return lu_factor_solve(factor, r, transpose)
+    return factor.solve(np.asarray(r, dtype=float), trans="T" if transpose else "N")
+
+
+def backtracking(F, x, fx, step, args, halvings=30):
+    """
+    Line search along a descent step of the system F(x) = 0: the step is halved until the norm of F decreases enough (Armijo rule)
+
+    params:
+        F: function of the system
+        x: current point
+        fx: F(x)
+        step: full step (Newton or quasi-Newton) from x
+        args: arguments of the function F
+        halvings (optional): maximum number of times the step is halved (default: 30)
+
+    returns:
+        x, fx: the new point and the value of F there, or None if the norm of F does not decrease
+    """
+    norm = np.linalg.norm(fx)
+    t = 1.0
+    for _ in range(halvings + 1):
+        new_x = x + t * step
+        new_fx = np.asarray(F(new_x, *args), dtype=float)
+        if np.linalg.norm(new_fx) <= (1 - 1e-4 * t) * norm:
+            return new_x, new_fx
+        t /= 2
+    return None
+
+
+def newton_system(
+    F,
+    x0,
+    jacobian=None,
+    tol=1e-10,
+    stop_iters=100,
+    *args,
+    line_search=True,
+    reuse=1,
+    sparsity=None,
+):
+    """
+    Solves the nonlinear system F(x) = 0 using Newton's method, with the LU factorization of the Jacobian matrix (see factorize).
+    The factorization can be reused for several iterations (chord method), it is recomputed when the step does not decrease the norm of F.
+
+    params:
+        F: function of the system, F(x, *args) with x an array of n values, returns an array of n values
+        x0: starting point
+        jacobian (optional): function that returns the Jacobian matrix, jacobian(x, *args) (default: None, approximated with finite_difference_jacobian)
+        tol (optional): tolerance of the maximum norm of F at the solution (default: 1e-10)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the functions F and jacobian
+        line_search (optional): a flag to shorten the steps that do not decrease the norm of F, see backtracking (default: True)
+        reuse (optional): number of iterations every factorization of the Jacobian is used for (default: 1, Newton's method)
+        sparsity (optional): pattern of the nonzeros of the Jacobian, to approximate it with one evaluation of F per color
+            and solve with sparse LU, see finite_difference_jacobian (default: None, dense)
+
+    returns:
+        RootResult with the solution, the value of F there, and the number of evaluations of F and of the Jacobian (njev)
+    """
+    # Count the evaluations of the function
+    F = Memoized(F, 0)
+    x = np.array(x0, dtype=float)
+    fx = np.asarray(F(x, *args), dtype=float)
+    # The coloring of the sparsity pattern is computed only once
+    colors = None if sparsity is None else column_coloring(sparsity)
+
+    iterations, njev = 0, 0
+    age = reuse  # Iterations of the current factorization, to compute one on the first iteration
+    # The tolerance is checked at the start and after every step, so the last allowed step can still converge
+    reason = reasons[1] if np.max(np.abs(fx)) <= tol else reasons[2]
+    while reason == reasons[2] and iterations < stop_iters:
+        # Factorize the Jacobian, only when the last factorization is too old
+        if age >= reuse:
+            J = (
+                finite_difference_jacobian(
+                    F, x, fx, *args, sparsity=sparsity, colors=colors
+                )
+                if jacobian is None
+                else jacobian(x, *args)
+            )
+            factor, age = factorize(J), 0
+            njev += 1
+
+        # Newton step, shortened by the line search if needed
+        step = -factor_solve(factor, fx)
+        if line_search:
+            new = backtracking(F, x, fx, step, args)
+        else:
+            new = x + step, np.asarray(F(x + step, *args), dtype=float)
+        if new is None:
+            if age > 0:  # Try again with the Jacobian at x
+                age = reuse
+                continue
+            reason = reasons[4]
+            break
 
         iterations += 1
-        # print(b,e)
-    zero = b
-    if steps and iters:
-        return zero, iterations, procedure_stack
-    if iters:
-        return zero, iterations
-    if steps:
-        return zero, procedure_stack
-    return zero
+        age += 1
+        x, fx = new
+        if np.max(np.abs(fx)) <= tol:
+            reason = reasons[1]
+
+    return RootResult(
+        x, fx, iterations, F.nfev, njev, reason == reasons[1], reason=reason
+    )
+
+
+def broyden(
+    F, x0, jacobian=None, tol=1e-10, stop_iters=100, *args, restart=50, sparsity=None
+):
+    """
+    Solves the nonlinear system F(x) = 0 using Broyden's (good) quasi-Newton method.
+    The Jacobian matrix is computed and factorized (see factorize) only at the start and at every restart; in between,
+    its inverse is updated with rank one corrections, H = J0^-1 + sum u_i w_i^T, so that every iteration costs O(n^2)
+    instead of the O(n^3) of a new factorization. The method restarts when the step does not decrease the norm of F
+    (see backtracking) or after restart updates.
+
+    params:
+        F: function of the system, F(x, *args) with x an array of n values, returns an array of n values
+        x0: starting point
+        jacobian (optional): function that returns the Jacobian matrix, jacobian(x, *args) (default: None, approximated with finite_difference_jacobian)
+        tol (optional): tolerance of the maximum norm of F at the solution (default: 1e-10)
+        stop_iters (optional): maximum number of iterations (default: 100)
+        *args: arguments of the functions F and jacobian
+        restart (optional): maximum number of updates before the Jacobian is computed again (default: 50)
+        sparsity (optional): pattern of the nonzeros of the Jacobian, to approximate it with one evaluation of F per color
+            and solve with sparse LU, see finite_difference_jacobian (default: None, dense)
+
+    returns:
+        RootResult with the solution, the value of F there, and the number of evaluations of F and of the Jacobian (njev)
+    """
+    # Count the evaluations of the function
+    F = Memoized(F, 0)
+    x = np.array(x0, dtype=float)
+    fx = np.asarray(F(x, *args), dtype=float)
+    # The coloring of the sparsity pattern is computed only once
+    colors = None if sparsity is None else column_coloring(sparsity)
+
+    def inverse(r, transpose=False):
+        # Product of the approximate inverse of the Jacobian (or its transpose) with r
+        v = factor_solve(factor, r, transpose)
+        for u, w in updates:
+            v += w * (u @ r) if transpose else u * (w @ r)
+        return v
+
+    iterations, njev = 0, 0
+    factor, updates = None, []
+    # The tolerance is checked at the start and after every step, so the last allowed step can still converge
+    reason = reasons[1] if np.max(np.abs(fx)) <= tol else reasons[2]
+    while reason == reasons[2] and iterations < stop_iters:
+        # (Re)start from the Jacobian at x
+        if factor is None:
+            J = (
+                finite_difference_jacobian(
+                    F, x, fx, *args, sparsity=sparsity, colors=colors
+                )
+                if jacobian is None
+                else jacobian(x, *args)
+            )
+            factor, updates = factorize(J), []
+            njev += 1
+
+        new = backtracking(F, x, fx, -inverse(fx), args)
+        if new is None:
+            if updates:  # Try again with the Jacobian at x
+                factor = None
+                continue
+            reason = reasons[4]
+            break
+
+        iterations += 1
+        s, y = new[0] - x, new[1] - fx
+        x, fx = new
+        if np.max(np.abs(fx)) <= tol:
+            reason = reasons[1]
+            break
+
+        # Broyden update of the inverse: H += (s - H y) (s^T H) / (s^T H y)
+        Hy = inverse(y)
+        denominator = s @ Hy
+        if (
+            abs(denominator)
+            > np.finfo(float).eps * np.linalg.norm(s) * np.linalg.norm(Hy)
+            and len(updates) < restart
+        ):
+            updates.append(((s - Hy) / denominator, inverse(s, transpose=True)))
+        else:
+            factor = None
+
+    return RootResult(
+        x, fx, iterations, F.nfev, njev, reason == reasons[1], reason=reason
+    )
+
+
+def call(f, args, x):
+    """
+    Evaluates f(x, *args), used to send f with its arguments to an executor (a partial of call can be pickled, a lambda cannot)
+    """
+    return f(x, *args)
+
+
+def golden_section(g, a, b, tol=0, stop_iters=100):
+    """
+    Finds a minimum of g in every interval of an array of intervals with the golden section search, advancing all of them at once
+    with one call to g per iteration.
+
+    params:
+        g: vectorized function to minimize, g(x) with x an array
+        a, b: arrays with the ends of every interval
+        tol (optional): absolute tolerance of the minima (default: 0, machine precision)
+        stop_iters (optional): maximum number of iterations (default: 100)
+
+    returns:
+        x: a point of every interval where g is minimum
+        gx: value of g at x
+    """
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = np.array(a, dtype=float), np.array(b, dtype=float)
+    # Inner points of every interval and their values, evaluated together
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    values = np.asarray(g(np.concatenate([c, d])), dtype=float)
+    gc, gd = values[: len(a)], values[len(a) :]
+
+    eps = np.finfo(float).eps
+    for _ in range(stop_iters):
+        if np.all(np.abs(b - a) <= tol + 4 * eps * np.abs(c)):
+            break
+        # Keep the side of the smaller value, its inner point is reused
+        left = gc < gd
+        a, b = np.where(left, a, c), np.where(left, d, b)
+        new = np.where(left, b - ratio * (b - a), a + ratio * (b - a))
+        gnew = np.asarray(g(new), dtype=float)
+        c, d, gc, gd = (
+            np.where(left, new, d),
+            np.where(left, c, new),
+            np.where(left, gnew, gd),
+            np.where(left, gc, gnew),
+        )
+    left = gc < gd
+    return np.where(left, c, d), np.where(left, gc, gd)
+
+
+def find_all_roots(
+    f,
+    interval,
+    n_samples=1000,
+    tol=10 ** (-20),
+    stop_iters=100,
+    *args,
+    ftol=None,
+    executor=None,
+    batch_size=1024,
+):
+    """
+    Finds all the zeros of f in the interval, not only one, that are separated by at least one of the n_samples equispaced samples:
+        1. f is sampled in a single vectorized call, the samples with value zero are zeros.
+        2. The zeros between samples with different signs are refined at once with vectorized_zBrentDekker.
+        3. The local minima of |f| between samples of the same sign (zeros of even multiplicity, like double roots) are refined
+           at once with golden_section, and they are zeros if |f| there is at most ftol.
+    The evaluations of f can be split into batches run on an executor, see Interpolation.sample_function.
+
+    params:
+        f: vectorized function to find the zeros, f(x, *args) with x an array
+        interval: interval where the zeros are searched
+        n_samples (optional): number of samples of f (default: 1000)
+        tol (optional): absolute tolerance of the zeros (default: 1e-20)
+        stop_iters (optional): maximum number of iterations of the refinements (default: 100)
+        *args: arguments of the function f
+        ftol (optional): largest |f| at a minimum to be taken as a zero (default: None, 1000 eps times the largest sample)
+        executor (optional): executor where f is evaluated, e.g. a concurrent.futures.ProcessPoolExecutor (default: None)
+        batch_size (optional): number of points of every call to f when an executor is used (default: 1024)
+
+    returns:
+        roots: sorted array of the zeros found, without duplicates
+
+    raises:
+        ValueError: if the interval is empty or there are less than 3 samples
+    """
+    a, b = interval
+    if not a < b or n_samples < 3:
+        raise ValueError("The interval must satisfy a < b and there must be 3 samples")
+
+    def fun(x):
+        # Evaluations of f in a single call, or in batches on the executor
+        if executor is None:
+            return f(x, *args)
+        return sample_function(partial(call, f, args), x, executor, batch_size)
+
+    x = np.linspace(a, b, n_samples)
+    y = np.asarray(fun(x), dtype=float)
+    if ftol is None:
+        ftol = 1000 * np.finfo(float).eps * np.max(np.abs(y))
+
+    # Samples that are zeros
+    roots = [x[y == 0]]
+
+    # Signs of the samples, compared instead of multiplied as the products of tiny values underflow to zero
+    negative = np.signbit(y)
+    signed = (y != 0) & ~np.isnan(y)
+
+    # Sign changes between consecutive samples
+    change = np.flatnonzero(signed[:-1] & signed[1:] & (negative[:-1] != negative[1:]))
+    if len(change):
+        roots.append(
+            vectorized_zBrentDekker(
+                fun, (x[change], x[change + 1]), tol, stop_iters
+            ).root
+        )
+
+    # Local minima of |f| with the same sign as both neighbours
+    absolute = np.abs(y)
+    middle = np.arange(1, n_samples - 1)
+    minimum = middle[
+        (absolute[1:-1] <= absolute[:-2])
+        & (absolute[1:-1] <= absolute[2:])
+        & signed[:-2]
+        & signed[1:-1]
+        & signed[2:]
+        & (negative[:-2] == negative[1:-1])
+        & (negative[1:-1] == negative[2:])
+    ]
+    if len(minimum):
+        points, values = golden_section(
+            lambda x: np.abs(fun(x)), x[minimum - 1], x[minimum + 1], tol, stop_iters
+        )
+        roots.append(points[values <= ftol])
+
+    # Sort the zeros and drop the ones found twice
+    roots = np.sort(np.concatenate(roots))
+    if len(roots):
+        spacing = tol + 4 * np.finfo(float).eps * np.maximum(np.abs(roots[1:]), 1)
+        roots = roots[np.concatenate([[True], np.diff(roots) > spacing])]
+    return roots
+
+
+def polynomial_newton_step(coeffs, z):
+    """
+    Evaluates the Newton correction p(z)/p'(z) of a polynomial at every point of z with Horner's rule. For |z| > 1 the reversed
+    polynomial is evaluated at 1/z instead, so that high degrees do not overflow.
+
+    params:
+        coeffs: coefficients of the polynomial, highest degree first
+        z: array of points (complex)
+
+    returns:
+        step: array with p(z)/p'(z)
+    """
+    n = len(coeffs) - 1
+    outside = np.abs(z) > 1
+    # Points where the polynomial is evaluated and the coefficients used at each of them
+    y = np.where(outside, 1 / np.where(outside, z, 1), z)
+    p, dp = np.where(outside, coeffs[-1], coeffs[0]), np.zeros_like(z)
+    for c, rc in zip(coeffs[1:], coeffs[-2::-1]):
+        dp = dp * y + p
+        p = p * y + np.where(outside, rc, c)
+    # Inside p/p', outside p(z) = z^n q(1/z) gives p/p' = z q(y) / (n q(y) - y q'(y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(outside, z * p / (n * p - y * dp), p / dp)
+
+
+def aberth(coeffs, tol=0, stop_iters=100):
+    """
+    Finds all the zeros of a polynomial at once with the Aberth-Ehrlich method: every approximation z_k takes a Newton step
+    corrected with the repulsion of the other approximations,
+        z_k <- z_k - N_k / (1 - N_k sum_{j != k} 1 / (z_k - z_j)),    N_k = p(z_k) / p'(z_k)
+    which converges cubically to simple zeros from initial values on a circle, and needs O(n^2) operations per iteration
+    instead of the O(n^3) of the eigenvalues, so it is the method of choice for high degrees.
+
+    params:
+        coeffs: coefficients of the polynomial, highest degree first (as numpy.polyval), the last one must not be zero
+        tol (optional): relative tolerance of the zeros (default: 0, machine precision)
+        stop_iters (optional): maximum number of iterations (default: 100)
+
+    returns:
+        roots: array with the n zeros (complex)
+    """
+    coeffs = np.asarray(coeffs, dtype=complex)
+    n = len(coeffs) - 1
+    # Initial values on the circle with the geometric mean of the zeros as radius, rotated to break symmetries
+    radius = np.abs(coeffs[-1] / coeffs[0]) ** (1 / n)
+    z = radius * np.exp(1j * (2 * np.pi * np.arange(n) / n + 0.4))
+
+    active = np.ones(n, dtype=bool)  # Approximations that have not converged yet
+    tol = max(tol, 4 * np.finfo(float).eps)
+    for _ in range(stop_iters):
+        newton_step = polynomial_newton_step(coeffs, z[active])
+        # Repulsion of all the other approximations
+        difference = z[active, None] - z[None, :]
+        difference[np.arange(len(difference)), np.flatnonzero(active)] = np.inf
+        repulsion = np.sum(1 / difference, axis=1)
+        step = newton_step / (1 - newton_step * repulsion)
+        # A zero of p (the Newton step is 0) needs no step
+        step = np.where(np.isfinite(step), step, 0)
+
+        z[active] -= step
+        done = np.abs(step) <= tol * np.abs(z[active])
+        active[np.flatnonzero(active)[done]] = False
+        if not np.any(active):
+            break
+    return z
+
+
+def poly_roots(coeffs, method=None, tol=0, stop_iters=100):
+    """
+    Finds all the zeros (real and complex) of a polynomial at once:
+        - "companion": the zeros are the eigenvalues of the companion matrix, which are computed with LinearSystems.eigenvalues
+          (balancing, Hessenberg and shifted QR steps).
+        - "aberth": Aberth-Ehrlich simultaneous iteration, see aberth.
+    The leading zero coefficients are dropped and the trailing ones are zeros at x = 0.
+
+    params:
+        coeffs: coefficients of the polynomial, highest degree first (as numpy.polyval and numpy.roots)
+        method (optional): "companion" or "aberth" (default: None, companion for real coefficients up to degree 50, aberth otherwise)
+        tol (optional): relative tolerance of the zeros of aberth (default: 0, machine precision)
+        stop_iters (optional): maximum number of iterations of aberth (default: 100)
+
+    returns:
+        roots: array with the zeros (complex), sorted by real and imaginary part
+
+    raises:
+        ValueError: if all the coefficients are zero, the method is unknown or companion is used with complex coefficients
+    """
+    coeffs = np.atleast_1d(np.asarray(coeffs))
+    nonzero = np.flatnonzero(coeffs)
+    if len(nonzero) == 0:
+        raise ValueError("The polynomial must not be zero")
+    if method not in (None, "companion", "aberth"):
+        raise ValueError("The method must be 'companion' or 'aberth'")
+
+    # Trailing zeros are zeros at x = 0
+    zeros = np.zeros(len(coeffs) - 1 - nonzero[-1], dtype=complex)
+    coeffs = coeffs[nonzero[0] : nonzero[-1] + 1]
+    n = len(coeffs) - 1
+    if n == 0:
+        return zeros
+    if method is None:
+        method = "companion" if n <= 50 and not np.iscomplexobj(coeffs) else "aberth"
+
+    if method == "aberth":
+        roots = aberth(coeffs, tol, stop_iters)
+    elif np.iscomplexobj(coeffs):
+        raise ValueError("The companion method needs real coefficients")
+    else:
+        # Companion matrix of the monic polynomial: -coefficients on the first row and ones on the subdiagonal
+        companion = np.diag(np.ones(n - 1), -1)
+        companion[0, :] = -coeffs[1:] / coeffs[0]
+        roots = eigenvalues(companion)
+
+    return np.sort_complex(np.concatenate([roots, zeros]))
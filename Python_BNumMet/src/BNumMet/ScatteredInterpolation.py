@@ -0,0 +1,437 @@
+import numpy as np
+from BNumMet.LinearSystems import batched_lu_solve
+
+
+class KDTree:
+    """
+    k-d tree over a set of points in any dimension, built once and then queried for the k nearest neighbours of many points.
+    Every node is a box that is split in two by the median along its widest dimension, until it has at most leaf_size points.
+    Every query point gets its own bound of the distance to its k-th neighbour, from the points of the node around its leaf,
+    and only searches the leaves within that bound (tightened while descending the tree), so points far from the data or in
+    the gaps between clusters do not search the whole tree.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        """
+        Builds the tree in O(n log n)
+
+        params:
+            points: array of shape (n, D) with the points
+            leaf_size (optional): maximum number of points of a leaf (default: 16)
+
+        raises:
+            ValueError: if there are no points or leaf_size is not positive
+        """
+        self.points = np.asarray(points, dtype=float)
+        if self.points.ndim == 1:  # 1-D points
+            self.points = self.points[:, None]
+        if len(self.points) == 0 or leaf_size < 1:
+            raise ValueError("There must be at least one point and leaf_size > 0")
+
+        self.leaf_size = leaf_size
+        self.index = np.arange(len(self.points))  # Points in the order of the leaves
+        # Nodes: box, range of points in self.index, split dimension and value, children and parent
+        self.lower, self.upper = [], []
+        self.start, self.stop = [], []
+        self.split_dim, self.split_value = [], []
+        self.left, self.right, self.parent = [], [], []
+
+        self.build(0, len(self.points), -1)
+        self.squared_norms = np.einsum("ij,ij->i", self.points, self.points)
+        for name in [
+            "lower",
+            "upper",
+            "start",
+            "stop",
+            "split_dim",
+            "split_value",
+            "left",
+            "right",
+            "parent",
+        ]:  # Lists to arrays, for vectorized access
+            setattr(self, name, np.array(getattr(self, name)))
+
+    def build(self, start, stop, parent):
+        """
+        Creates the node of the points self.index[start:stop] and its children, returns the number of the node
+        """
+        node = len(self.start)
+        box = self.points[self.index[start:stop]]
+        self.lower.append(box.min(axis=0))
+        self.upper.append(box.max(axis=0))
+        self.start.append(start)
+        self.stop.append(stop)
+        self.parent.append(parent)
+        self.split_dim.append(-1)
+        self.split_value.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+
+        if stop - start > self.leaf_size:
+            dim = int(
+                np.argmax(self.upper[node] - self.lower[node])
+            )  # Widest dimension
+            middle = (start + stop) // 2
+            order = np.argpartition(box[:, dim], middle - start)  # Median split
+            self.index[start:stop] = self.index[start:stop][order]
+
+            self.split_dim[node] = dim
+            self.split_value[node] = self.points[self.index[middle], dim]
+            self.left[node] = self.build(start, middle, node)
+            self.right[node] = self.build(middle, stop, node)
+
+        return node
+
+    def find_leaves(self, x):
+        """
+        Descends the tree with all the points x at once, returns the leaf of every point
+        """
+        node = np.zeros(len(x), dtype=int)
+        inner = self.left[node] >= 0
+        while np.any(inner):
+            current = node[inner]
+            go_left = (
+                x[inner, self.split_dim[current]] < self.split_value[current]
+            )  # The median point belongs to the right child
+            node[inner] = np.where(go_left, self.left[current], self.right[current])
+            inner = self.left[node] >= 0
+        return node
+
+    def nodes_near(self, lower, upper):
+        """
+        Leaves whose box intersects the box [lower, upper], the tree is searched one level at a time
+        """
+        leaves, level = [], np.zeros(1, dtype=int)
+        while len(level):
+            touching = level[
+                np.all(self.lower[level] <= upper, axis=1)
+                & np.all(self.upper[level] >= lower, axis=1)
+            ]
+            inner = self.left[touching] >= 0
+            leaves.append(touching[~inner])
+            level = np.concatenate(
+                [self.left[touching[inner]], self.right[touching[inner]]]
+            )
+        return np.concatenate(leaves)
+
+    def query(self, x, k=1, batch_size=4096):
+        """
+        Finds the k nearest points of every point of x, in O(log n) per point (for well distributed points)
+
+        params:
+            x: array of shape (m, D) with the query points
+            k (optional): number of neighbours (default: 1)
+            batch_size (optional): maximum number of query points processed at once (default: 4096)
+
+        returns:
+            distances: array of shape (m, k) with the distances to the neighbours, sorted
+            indices: array of shape (m, k) with the indices of the neighbours in the points of the tree
+
+        raises:
+            ValueError: if k is not between 1 and the number of points or the dimensions do not match
+        """
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1:
+            x = x[:, None] if self.points.shape[1] == 1 else x[None, :]
+        if x.shape[1] != self.points.shape[1]:
+            raise ValueError(
+                "The query points must have the same dimension as the tree"
+            )
+        if not 1 <= k <= len(self.points):
+            raise ValueError("k must be between 1 and the number of points")
+
+        distances = np.empty((len(x), k))
+        indices = np.empty((len(x), k), dtype=int)
+        sizes = self.stop - self.start
+
+        # Query points are grouped by the smallest node around their leaf with at least max(k, 8 * leaf_size) points
+        nodes = self.find_leaves(x)
+        small = (sizes[nodes] < max(k, 8 * self.leaf_size)) & (nodes > 0)
+        while np.any(small):
+            nodes[small] = self.parent[nodes[small]]
+            small = (sizes[nodes] < max(k, 8 * self.leaf_size)) & (nodes > 0)
+
+        # Bound of the distance to the k-th neighbour of every query point: the largest exact distance to k points of its node
+        radius2 = np.empty(len(x))
+        order = np.argsort(nodes, kind="stable")
+        groups = np.flatnonzero(np.diff(nodes[order])) + 1
+        for group in np.split(order, groups):
+            for batch in np.array_split(group, -(-len(group) // batch_size)):
+                node = nodes[batch[0]]
+                near = self.index[self.start[node] : self.stop[node]]
+                chosen = near[
+                    np.argpartition(self.squared_distances(x[batch], near), k - 1)[
+                        :, :k
+                    ]
+                ]
+                difference = self.points[chosen] - x[batch, None, :]
+                radius2[batch] = np.einsum("ijk,ijk->ij", difference, difference).max(
+                    axis=1
+                )
+
+        # Every query point only searches the leaves within its own bound
+        for start in range(0, len(x), batch_size):
+            batch = np.arange(start, min(start + batch_size, len(x)))
+            query, leaf = self.leaves_within(x[batch], radius2[batch], k)
+            distances[batch], indices[batch] = self.nearest_in_leaves(
+                x[batch], query, leaf, k
+            )
+
+        return distances, indices
+
+    def leaves_within(self, x, radius2, k):
+        """
+        Pairs (query point, leaf) such that the box of the leaf is within the squared distance radius2 of the point,
+        the tree is descended one level at a time with all the pairs at once. On every level the bound of every point is
+        tightened: all the points of a node are within the distance to its farthest corner, so the bound is at most the
+        farthest corner of any node with k points or more.
+
+        params:
+            x: query points
+            radius2: squared bound of the distance to the k-th neighbour of every point
+            k: number of neighbours
+
+        returns:
+            query: index in x of the point of every pair
+            leaf: leaf of every pair
+        """
+        radius2 = radius2.copy()
+        query = np.arange(len(x))
+        node = np.zeros(len(x), dtype=int)
+        queries, leaves = [], []
+        while len(query):
+            # Squared distances from every point to the closest and the farthest point of the box of its node
+            below, above = self.lower[node] - x[query], x[query] - self.upper[node]
+            gap = np.maximum(below, 0) + np.maximum(above, 0)
+            far = np.maximum(np.abs(below), np.abs(above))
+            closest = np.einsum("ij,ij->i", gap, gap)
+            farthest = np.einsum("ij,ij->i", far, far)
+
+            # Tighter bounds: all the points of a node with at least k points are within its farthest corner
+            full = (self.stop - self.start)[node] >= k
+            np.minimum.at(radius2, query[full], farthest[full])
+
+            touching = closest <= radius2[query]
+            query, node = query[touching], node[touching]
+            inner = self.left[node] >= 0
+            queries.append(query[~inner])
+            leaves.append(node[~inner])
+            query = np.concatenate([query[inner], query[inner]])
+            node = np.concatenate([self.left[node[inner]], self.right[node[inner]]])
+        return np.concatenate(queries), np.concatenate(leaves)
+
+    def nearest_in_leaves(self, x, query, leaf, k, chunk_size=2**20):
+        """
+        The k nearest points of every point of x among the points of its leaves, the pairs (query point, point of the tree)
+        are processed in chunks of about chunk_size so the memory used is bounded, keeping the k best of every query point
+
+        params:
+            x: query points
+            query, leaf: pairs (query point, leaf) returned by leaves_within, every point must have at least k candidates
+            k: number of neighbours
+            chunk_size (optional): number of candidate points processed at once (default: 2**20)
+
+        returns:
+            distances, indices: arrays of shape (len(x), k), sorted by distance
+        """
+        lengths = self.stop[leaf] - self.start[leaf]
+        ends = np.cumsum(lengths)
+        # Leaves of every chunk, so that a chunk has at most chunk_size + leaf_size candidates
+        cuts = np.searchsorted(ends, np.arange(chunk_size, ends[-1], chunk_size))
+
+        best_query = np.empty(0, dtype=int)
+        best_point = np.empty(0, dtype=int)
+        best = np.empty(0)
+        for chunk in np.split(np.arange(len(leaf)), cuts):
+            # Every candidate point of the chunk and its query point
+            size = lengths[chunk]
+            first = np.repeat(self.start[leaf[chunk]] - np.cumsum(size) + size, size)
+            point = self.index[first + np.arange(size.sum())]
+            owner = np.repeat(query[chunk], size)
+            difference = self.points[point] - x[owner]
+
+            # Keep the k closest candidates of every query point, with the ones kept so far
+            owner = np.concatenate([best_query, owner])
+            point = np.concatenate([best_point, point])
+            squared = np.concatenate(
+                [best, np.einsum("ij,ij->i", difference, difference)]
+            )
+            order = np.lexsort((squared, owner))
+            owner, point, squared = owner[order], point[order], squared[order]
+            rank = np.arange(len(owner)) - np.searchsorted(owner, owner)
+            keep = rank < k
+            best_query, best_point, best = owner[keep], point[keep], squared[keep]
+
+        return np.sqrt(best).reshape(len(x), k), best_point.reshape(len(x), k)
+
+    def squared_distances(self, x, candidates):
+        """
+        Matrix of squared distances between the points x and the points of the tree with the given indices,
+        expanded as |x|^2 + |p|^2 - 2 x.p so that the bulk of the work is a matrix product (only used to rank)
+        """
+        squared = self.points[candidates] @ (-2 * x.T)
+        squared += self.squared_norms[candidates][:, None]
+        squared += np.einsum("ij,ij->i", x, x)
+        return squared.T
+
+
+def rbf_kernels(r, kernel, epsilon):
+    """
+    Radial basis functions phi(r)
+
+    params:
+        r: array of distances
+        kernel: "linear", "cubic", "thin_plate", "gaussian", "multiquadric" or "inverse_multiquadric"
+        epsilon: shape parameter of the gaussian and (inverse) multiquadric kernels
+
+    returns:
+        phi: the kernel at the distances r
+
+    raises:
+        ValueError: if the kernel is unknown
+    """
+    if kernel == "linear":
+        return r
+    if kernel == "cubic":
+        return r**3
+    if kernel == "thin_plate":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(r > 0, r**2 * np.log(r), 0.0)
+    if kernel == "gaussian":
+        return np.exp(-((epsilon * r) ** 2))
+    if kernel == "multiquadric":
+        return np.sqrt(1 + (epsilon * r) ** 2)
+    if kernel == "inverse_multiquadric":
+        return 1 / np.sqrt(1 + (epsilon * r) ** 2)
+    raise ValueError(f"Unknown kernel {kernel}")
+
+
+class IDWInterpolator:
+    """
+    Inverse distance weighting (Shepard) interpolation of scattered data with the k nearest samples of every point
+        v(u) = sum(w_i * y_i) / sum(w_i), w_i = 1 / |u - x_i|^power
+    Like LocalRBFInterpolator, it jumps where the k nearest samples change (by little, the sample that changes has the smallest weight).
+    """
+
+    def __init__(self, points, values, k=8, power=2, leaf_size=16):
+        """
+        Builds the k-d tree of the sample points
+
+        params:
+            points: array of shape (n, D) with the sample points
+            values: array with the n sample values
+            k (optional): number of neighbours used for every point (default: 8)
+            power (optional): power of the distance in the weights (default: 2)
+            leaf_size (optional): maximum number of points of a leaf of the k-d tree (default: 16)
+
+        raises:
+            ValueError: if the number of points and values differ
+        """
+        self.tree = KDTree(points, leaf_size)
+        self.values = np.asarray(values, dtype=float)
+        if len(self.values) != len(self.tree.points):
+            raise ValueError("The number of points and values must be the same")
+        self.k = min(k, len(self.values))
+        self.power = power
+
+    def __call__(self, u):
+        """
+        Evaluates the interpolant at the points u, of shape (m, D)
+
+        returns:
+            v: values of the interpolation at the points u
+        """
+        distances, indices = self.tree.query(u, self.k)
+
+        with np.errstate(divide="ignore"):
+            weights = 1 / distances**self.power
+        exact = distances[:, 0] == 0  # Points that are samples take the sample value
+        weights[exact] = 0
+        weights[exact, 0] = 1
+
+        return np.sum(weights * self.values[indices], axis=1) / np.sum(weights, axis=1)
+
+
+class LocalRBFInterpolator:
+    """
+    Local radial basis function interpolation of scattered data: every point is interpolated with the RBF (plus a linear polynomial) through its k nearest samples
+        v(u) = sum(a_i * phi(|u - x_i|)) + c_0 + c^T u
+    The local systems of all the points are solved at once with LinearSystems.batched_lu_solve.
+    The interpolant is NOT continuous: it jumps where the set of the k nearest samples changes (in 1-D, at the midpoints of x[j] and x[j+k]).
+    The jumps are of the size of the local interpolation error, so they shrink with denser samples or a larger k, but a global RBF
+    (one system with all the samples) is needed when the interpolant must be continuous, e.g. to differentiate it.
+    """
+
+    def __init__(
+        self, points, values, k=16, kernel="thin_plate", epsilon=1.0, leaf_size=16
+    ):
+        """
+        Builds the k-d tree of the sample points
+
+        params:
+            points: array of shape (n, D) with the sample points
+            values: array with the n sample values
+            k (optional): number of neighbours used for every point, at least D + 1 (default: 16)
+            kernel (optional): radial basis function, see rbf_kernels (default: "thin_plate")
+            epsilon (optional): shape parameter of the kernel (default: 1.0)
+            leaf_size (optional): maximum number of points of a leaf of the k-d tree (default: 16)
+
+        raises:
+            ValueError: if the number of points and values differ, the kernel is unknown or there are not enough points
+        """
+        self.tree = KDTree(points, leaf_size)
+        self.values = np.asarray(values, dtype=float)
+        if len(self.values) != len(self.tree.points):
+            raise ValueError("The number of points and values must be the same")
+        rbf_kernels(np.zeros(1), kernel, epsilon)  # Check the kernel
+
+        dimension = self.tree.points.shape[1]
+        self.k = min(k, len(self.values))
+        if self.k < dimension + 1:
+            raise ValueError(f"At least {dimension + 1} neighbours are needed")
+        self.kernel, self.epsilon = kernel, epsilon
+
+    def __call__(self, u, batch_size=4096):
+        """
+        Evaluates the interpolant at the points u, of shape (m, D), batch_size points at a time
+
+        returns:
+            v: values of the interpolation at the points u
+
+        raises:
+            ValueError: if a local system is singular (e.g. all the neighbours are aligned)
+        """
+        u = np.asarray(u, dtype=float)
+        if u.ndim == 1:
+            u = u[:, None] if self.tree.points.shape[1] == 1 else u[None, :]
+        v = np.empty(len(u))
+        for start in range(0, len(u), batch_size):
+            v[start : start + batch_size] = self.evaluate(u[start : start + batch_size])
+        return v
+
+    def evaluate(self, u):
+        """
+        Builds and solves the local systems of the points u
+        """
+        m, dimension = u.shape
+        k = self.k
+        distances, indices = self.tree.query(u, k)
+        # Local coordinates, centered at the query point for a better conditioning
+        x = self.tree.points[indices] - u[:, None, :]  # Shape (m, k, D)
+
+        # [Phi P; P^T 0] [a; c] = [y; 0]
+        size = k + dimension + 1
+        A = np.zeros((m, size, size))
+        r = np.sqrt(np.sum((x[:, :, None, :] - x[:, None, :, :]) ** 2, axis=-1))
+        A[:, :k, :k] = rbf_kernels(r, self.kernel, self.epsilon)
+        A[:, :k, k] = A[:, k, :k] = 1
+        A[:, :k, k + 1 :] = x
+        A[:, k + 1 :, :k] = np.transpose(x, (0, 2, 1))
+        b = np.zeros((m, size))
+        b[:, :k] = self.values[indices]
+
+        coefficients = batched_lu_solve(A, b)
+
+        # At the query point (the origin of the local coordinates) only phi and c_0 remain
+        phi = rbf_kernels(distances, self.kernel, self.epsilon)
+        return np.sum(coefficients[:, :k] * phi, axis=1) + coefficients[:, k]
@@ -1,5 +1,13 @@
 import numpy as np
-from ..Interpolation import polinomial, piecewise_linear, pchip, splines
+from ..Interpolation import (
+    polinomial,
+    piecewise_linear,
+    pchip,
+    splines,
+    PiecewiseLinear,
+    Pchip,
+    Spline,
+)
 from bqplot import pyplot as plt
 import ipywidgets as widgets
 import bqplot as bq
@@ -36,6 +44,15 @@ class InterpolVisualizer:
             "Splines": [splines, "purple"],
         }
 
+        # Fitted interpolants of the methods that can be updated point by point
+        self.interpolants = {
+            "Piecewise Linear": PiecewiseLinear,
+            "Pchip": Pchip,
+            "Splines": Spline,
+        }
+        self.fitted = {}  # Fitted interpolant of every method
+        self.fitted_points = (None, None)  # Points used in the fitted interpolants
+
     def initialize_components(self):
         """
         Initializes the components of the GUI
@@ -163,11 +180,15 @@ class InterpolVisualizer:
         """
         Updates the interpolation lines according to the new points
         It creates an array of Lines for every interpolation method that is checked in the checkboxes
+        The methods with a fitted interpolant that do not have enough points for it (see update_interpolants) are hidden
         """
+        self.update_interpolants()
         self.interpolation_lines = [
             bq.Lines(
                 x=self.u,
-                y=val[0](self.x, self.y, self.u),
+                y=self.fitted[key](self.u)
+                if key in self.fitted
+                else val[0](self.x, self.y, self.u),
                 scales={"x": self.x_sc, "y": self.y_sc},
                 colors=[val[1]],
                 name=key,
@@ -177,9 +198,42 @@ class InterpolVisualizer:
                 enable_add=False,
             )
             for key, val in self.methods.items()
-            if val[2].value
+            if val[2].value and (key in self.fitted or key not in self.interpolants)
         ]
 
+    def update_interpolants(self):
+        """
+        Updates the fitted interpolants of the checked methods according to the new points
+        If only one point was added or moved, only the coefficients affected by that point are computed again, otherwise they are fitted from scratch
+        The interpolants of unchecked methods and of methods with less than min_points points are dropped (their lines are hidden)
+        """
+        x, y = np.array(self.x, dtype=float), np.array(self.y, dtype=float)
+        old_x, old_y = self.fitted_points
+        unchanged = False
+        if old_x is not None and len(x) == len(old_x) + 1:  # A point was added
+            changed = None if (x[:-1] != old_x).any() or (y[:-1] != old_y).any() else -1
+        elif old_x is not None and len(x) == len(old_x):  # Points were moved
+            changed = np.flatnonzero((x != old_x) | (y != old_y))
+            unchanged = len(changed) == 0
+            changed = changed[0] if len(changed) == 1 else None
+        else:
+            changed = None
+
+        for key, interpolant in self.interpolants.items():
+            if not self.methods[key][2].value or len(x) < interpolant.min_points:
+                self.fitted.pop(key, None)  # Not shown
+            elif key in self.fitted and unchanged:  # Nothing to update
+                continue
+            elif key not in self.fitted or changed is None:
+                self.fitted[key] = interpolant(x, y)  # Fit from scratch
+            elif len(x) > len(old_x):
+                self.fitted[key].insert(x[changed], y[changed])
+            else:  # The fitted points are sorted, find the moved one by its old x
+                i = int(np.searchsorted(self.fitted[key].x, old_x[changed]))
+                self.fitted[key].move(i, x[changed], y[changed])
+
+        self.fitted_points = (x, y)
+
     def update_x(self, change):
         """
         Updates the x coordinates and the plot according to the new x coordinates if the change is not None and does not contain Repetitions (Definition of a function)
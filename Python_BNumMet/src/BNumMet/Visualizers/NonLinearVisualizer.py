@@ -9,9 +9,8 @@ class NonLinearVisualizer:
         self, fun=lambda x: (x - 1) * (x - 4) * np.exp(-x), interval=(0, 3), tol=1e-3
     ):
         # Initialize basic Parameters
-        self.brent_dekker = zBrentDekker(
-            fun, interval, tol, iters=True, steps=True
-        )  # Get the output of Brent Dekkers Alg --> (x, iters)
+        # Get the output of Brent Dekkers Alg --> RootResult
+        self.brent_dekker = zBrentDekker(fun, interval, tol)
 
         # Set the input function, the interval for the function evaluation,
         # and the tolerance for the algorithm
@@ -97,7 +96,7 @@ class NonLinearVisualizer:
         # Widget for displaying Brent-Dekker solution output
         # Brent-Dekker Solution: (x^, f(x^)) in N^ iterations
         self.brent_dekker_output = widgets.HTML(
-            value=f"<blockquote> Brent-Dekker Solution: <b>({self.brent_dekker[0]:.4e}, {self.f(self.brent_dekker[0]):.4e})</b> in <b>{self.brent_dekker[1]}</b> iterations"
+            value=f"<blockquote> Brent-Dekker Solution: <b>({self.brent_dekker.root:.4e}, {self.brent_dekker.froot:.4e})</b> in <b>{self.brent_dekker.iterations}</b> iterations"
         )
 
         # Reset Button
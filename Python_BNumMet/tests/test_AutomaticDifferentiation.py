@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+import numpy as np
+
+from BNumMet.AutomaticDifferentiation import Dual, complex_step, derivatives
+
+
+class Test_Dual(TestCase):
+    def test_arithmetic(self):
+        """
+        The operators apply the product, quotient and power rules
+        """
+        x = Dual(2.0, 1.0)
+        for y, expected in [
+            (3 * x + 1 - x, (5, 2, 0)),
+            (x * x * x, (8, 12, 12)),
+            (1 / x, (0.5, -0.25, 0.25)),
+            (x / (x + 1), (2 / 3, 1 / 9, -2 / 27)),
+            (x**3 - 2**x, (4, 12 - 4 * np.log(2), 12 - 4 * np.log(2) ** 2)),
+            (x**x, (4, 4 * (np.log(2) + 1), 4 * ((np.log(2) + 1) ** 2 + 0.5))),
+            (-abs(-x), (-2, -1, 0)),
+            (np.float64(2) * x - x**1 + x**0, (3, 1, 0)),
+        ]:
+            self.assertTrue(np.allclose([y.value, y.first, y.second], expected))
+
+        self.assertTrue(x < 3 and x >= 2 and x == 2.0 and x != 1)
+
+    def test_numpy_functions(self):
+        """
+        The numpy functions give the exact derivatives, checked with the analytic ones
+        """
+        x = 0.3
+        for f, first, second in [
+            (np.sin, np.cos, lambda x: -np.sin(x)),
+            (np.exp, np.exp, np.exp),
+            (np.log, lambda x: 1 / x, lambda x: -1 / x**2),
+            (np.sqrt, lambda x: 0.5 / np.sqrt(x), lambda x: -0.25 * x**-1.5),
+            (np.arctan, lambda x: 1 / (1 + x * x), lambda x: -2 * x / (1 + x * x) ** 2),
+            (
+                np.tanh,
+                lambda x: 1 - np.tanh(x) ** 2,
+                lambda x: -2 * np.tanh(x) * (1 - np.tanh(x) ** 2),
+            ),
+            (
+                np.arcsin,
+                lambda x: (1 - x * x) ** -0.5,
+                lambda x: x * (1 - x * x) ** -1.5,
+            ),
+            (np.log1p, lambda x: 1 / (1 + x), lambda x: -1 / (1 + x) ** 2),
+        ]:
+            self.assertTrue(np.allclose(derivatives(f, x), (f(x), first(x), second(x))))
+
+        # Composition and arguments
+        value, first, second = derivatives(
+            lambda x, c: np.sin(c * x) * np.exp(-x), x, 2
+        )
+        self.assertAlmostEqual(first, np.exp(-x) * (2 * np.cos(2 * x) - np.sin(2 * x)))
+        self.assertAlmostEqual(
+            second, np.exp(-x) * (-3 * np.sin(2 * x) - 4 * np.cos(2 * x))
+        )
+        self.assertEqual(derivatives(lambda x: 5.0, x), (5.0, 0.0, 0.0))
+
+        with self.assertRaises(TypeError):
+            np.floor(Dual(1.5, 1))
+
+    def test_complex_step(self):
+        """
+        The complex step gives the first derivative to machine precision and the second to about 8 digits
+        """
+        f = lambda x, c: np.exp(c * x) / np.sqrt(x)
+        value, first = complex_step(f, 1.5, 2)
+        dual = derivatives(f, 1.5, 2)
+        self.assertAlmostEqual(value, dual[0], places=14)
+        self.assertAlmostEqual(first, dual[1], places=12)
+
+        value, first, second = complex_step(f, 1.5, 2, second=True)
+        self.assertTrue(np.isclose(second, dual[2], rtol=1e-7))
@@ -0,0 +1,135 @@
+from unittest import TestCase
+
+import numpy as np
+
+from BNumMet.BSplines import (
+    BSpline,
+    bspline_basis,
+    clamped_knots,
+    least_squares_bspline,
+    penalty_band,
+    smoothing_spline,
+)
+
+
+class test_BSpline(TestCase):
+    t = np.array([0, 0, 0, 0, 0.2, 0.5, 0.6, 1, 1, 1, 1])
+
+    def test_partition_of_unity(self):
+        """
+        The B-splines that are not zero at a point add up to 1 and their derivatives to 0
+        """
+        u = np.linspace(0, 1, 101)
+        span, N = bspline_basis(self.t, 3, u)
+        self.assertTrue(np.allclose(N.sum(axis=1), 1))
+        self.assertTrue(np.all(N >= 0))
+        self.assertTrue(
+            np.all((self.t[span] <= u) & ((u < self.t[span + 1]) | (u == 1)))
+        )
+        self.assertTrue(
+            np.allclose(bspline_basis(self.t, 3, u, nu=1)[1].sum(axis=1), 0)
+        )
+
+    def test_polynomial(self):
+        """
+        A cubic polynomial is a spline: with the coefficients of its least squares fit it is reproduced with its derivatives
+        """
+        x = np.linspace(0, 1, 40)
+        spline = least_squares_bspline(x, x**3 - 2 * x, self.t[4:-4])
+        u = np.linspace(0, 1, 77)
+        self.assertTrue(np.allclose(spline(u), u**3 - 2 * u))
+        self.assertTrue(np.allclose(spline(u, nu=1), 3 * u**2 - 2))
+        self.assertTrue(np.allclose(spline(u, nu=2), 6 * u))
+
+        out = np.empty(77)
+        list(spline.chunks(u, chunk_size=10, out=out))
+        self.assertTrue(np.allclose(out, spline(u)))
+
+    def test_penalty(self):
+        """
+        The penalty of the coefficients of x^2 is the integral of (2)^2 over [0, 1], and 0 for straight lines
+        """
+        x = np.linspace(0, 1, 40)
+        omega = penalty_band(self.t)
+        dense = np.diag(omega[0])
+        for j in range(1, 4):
+            dense += np.diag(omega[j, :-j], -j) + np.diag(omega[j, :-j], j)
+
+        c = least_squares_bspline(x, x**2, self.t[4:-4]).c
+        self.assertAlmostEqual(c @ dense @ c, 4)
+        c = least_squares_bspline(x, 3 * x + 1, self.t[4:-4]).c
+        self.assertAlmostEqual(c @ dense @ c, 0)
+
+    def test_exceptions(self):
+        """
+        Wrong knots, sizes or data raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            clamped_knots([0.5, 0.2], 0, 1)
+        with self.assertRaises(ValueError):
+            clamped_knots([1.5], 0, 1)
+        with self.assertRaises(ValueError):
+            BSpline(self.t, np.ones(3))
+        with self.assertRaises(ValueError):
+            least_squares_bspline([0, 1], [0, 1, 2], [0.5])
+        with self.assertRaises(ValueError):  # No data around the knots 0.4 and 0.5
+            least_squares_bspline(
+                np.r_[np.linspace(0, 0.3, 9), 1], np.ones(10), [0.4, 0.5]
+            )
+
+
+class test_smoothing_spline(TestCase):
+    def test_limits(self):
+        """
+        A large lam gives the least squares straight line, a small lam interpolates the data
+        """
+        x = np.linspace(0, 1, 30)
+        y = np.sin(5 * x) + np.random.normal(0, 0.1, 30)
+
+        line = smoothing_spline(x, y, lam=1e4)
+        self.assertTrue(
+            np.allclose(line(x), np.polyval(np.polyfit(x, y, 1), x), atol=1e-3)
+        )
+        self.assertAlmostEqual(line.dof, 2, places=2)
+
+        interpolating = smoothing_spline(x, y, lam=1e-10)
+        self.assertTrue(np.allclose(interpolating(x), y, atol=1e-4))
+        self.assertAlmostEqual(interpolating.dof, 30, places=2)
+
+    def test_gcv(self):
+        """
+        The GCV choice of lam removes most of the noise, and is the best lam of a fine grid
+        """
+        np.random.seed(0)
+        x = np.sort(np.random.rand(200))
+        y = np.sin(6 * x) + np.random.normal(0, 0.1, 200)
+        spline = smoothing_spline(x, y)
+
+        self.assertLess(np.sqrt(np.mean((spline(x) - np.sin(6 * x)) ** 2)), 0.05)
+        scores = [smoothing_spline(x, y, lam).gcv for lam in np.logspace(-8, 0, 33)]
+        self.assertLessEqual(spline.gcv, min(scores) * (1 + 1e-6))
+
+    def test_weights_and_repeated(self):
+        """
+        Repeated x are allowed and a point with weight 0 is ignored
+        """
+        x = np.repeat(np.linspace(0, 1, 20), 2)
+        y = np.cos(x) + np.tile([-0.05, 0.05], 20)
+        w = np.ones(40)
+        w[10] = 0
+        spline = smoothing_spline(x, y, lam=1e-3, w=w)
+        y[10] = 100
+        self.assertTrue(np.allclose(smoothing_spline(x, y, lam=1e-3, w=w).c, spline.c))
+
+    def test_exceptions(self):
+        """
+        Wrong sizes, lam or data raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            smoothing_spline([0, 1, 2], [0, 1])
+        with self.assertRaises(ValueError):
+            smoothing_spline([0, 1, 2], [0, 1, 2], lam=0)
+        with self.assertRaises(ValueError):
+            smoothing_spline([1, 1, 1], [0, 1, 2])
+        with self.assertRaises(ValueError):
+            smoothing_spline([0, 1, 2], [0, 1, 2], w=[1, -1, 1])
@@ -1,9 +1,50 @@
 from unittest import TestCase
 import pytest
 from bqplot import pyplot as plt
-from BNumMet.Interpolation import polinomial, piecewise_linear, pchip, splines
+from BNumMet.Interpolation import (
+    polinomial,
+    piecewise_linear,
+    pchip,
+    splines,
+    akima,
+    makima,
+    steffen,
+    interpolate_chunks,
+    PiecewiseLinear,
+    Pchip,
+    Spline,
+    Akima,
+    Makima,
+    Steffen,
+    GridInterpolator,
+    chebyshev_interpolant,
+    chebyshev_coefficients,
+    chebyshev_points,
+    akima_coefficients,
+    pchip_coefficients,
+    spline_coefficients,
+    evaluate_piecewise,
+    extrapolations,
+    floater_hormann,
+    floater_hormann_weights,
+    FloaterHormann,
+    piecewise_table,
+    uniform_spacing,
+    interval_index,
+    ParametricCurve,
+    curve_parameter,
+    hermite,
+    CubicHermite,
+    sample_function,
+    local_polynomial,
+    adaptive_interpolant,
+)
+from concurrent.futures import ThreadPoolExecutor
 from BNumMet.Visualizers.InterpolationVisualizer import InterpolVisualizer
 import numpy as np
+import tempfile
+from unittest.mock import patch
+import os
 
 
 class test_PolyInterpolation(TestCase):
@@ -185,6 +226,957 @@ class test_splines(TestCase):
         self.assertTrue(np.isclose(v[i1], -5))
 
 
+class test_akima_steffen(TestCase):
+    x = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10.0])
+    y = np.array([10, 10, 10, 10, 10, 10, 10.5, 15, 50, 60, 85])
+    u = np.linspace(0, 10, 1001)
+
+    def test_interpolation(self):
+        """
+        Every method goes through the points and reproduces straight lines
+        """
+        for method in [akima, makima, steffen]:
+            self.assertTrue(np.allclose(method(self.x, self.y, self.x), self.y))
+            self.assertTrue(
+                np.allclose(method(self.x, 2 * self.x + 1, self.u), 2 * self.u + 1)
+            )
+            # Unsorted points
+            self.assertTrue(
+                np.allclose(
+                    method(self.x[::-1], self.y[::-1], self.u),
+                    method(self.x, self.y, self.u),
+                )
+            )
+
+    def test_flat_and_monotone(self):
+        """
+        Makima and Steffen do not overshoot where the data is flat, Steffen keeps monotone data monotone
+        """
+        flat = self.u <= 5
+        self.assertTrue(np.allclose(makima(self.x, self.y, self.u)[flat], 10))
+        v = steffen(self.x, self.y, self.u)
+        self.assertTrue(np.allclose(v[flat], 10))
+        self.assertTrue(np.all(np.diff(v) >= 0))
+
+    def test_akima_weights(self):
+        """
+        Akima slope at a point: weighted mean of the slopes of both sides, the weights are the changes of slope at the other side
+        """
+        x = np.arange(7.0)
+        y = np.array([0, 1, 3, 4, 4, 6, 7.0])
+        _, _, d, _, _ = akima_coefficients(x, y)
+        # At x = 3 the slopes are 2, 1 | 0, 2 -> w1 = |2 - 0| = 2, w2 = |1 - 2| = 1
+        self.assertAlmostEqual(d[3], (2 * 1 + 1 * 0) / 3)
+
+    def test_pchip_end_slope(self):
+        """
+        The end slopes use the two subintervals next to each end: the three point formula is exact for quadratic data, and at
+        x = 5 below it is ((2 h1 + h2) delta1 - h1 delta2) / (h1 + h2) = (3 * 3 - 2) / 2 = 3.5 with h1 = h2 = 1, delta1 = 3 and
+        delta2 = 2 (the old formula used the second and third subintervals, which gave 0)
+        """
+        x = np.arange(6.0)
+        _, _, d, c, b = pchip_coefficients(x, x**2)
+        self.assertAlmostEqual(d[0], 0)
+        self.assertAlmostEqual(d[-1] + 2 * c[-1] + 3 * b[-1], 10)  # Slope at x = 5
+
+        x = np.array([0, 1, 3, 4, 5.0])
+        _, _, d, c, b = pchip_coefficients(x, np.array([0, 1, 2, 4, 7.0]))
+        self.assertAlmostEqual(d[-1] + 2 * c[-1] + 3 * b[-1], 3.5)
+
+
+class test_spline_end_conditions(TestCase):
+    x = np.array([0, 0.5, 1.5, 2, 3.5, 4, 5.5, 2 * np.pi])
+    u = np.linspace(0, 2 * np.pi, 200)
+
+    def test_natural_and_clamped(self):
+        """
+        Natural splines have no second derivative at the ends and clamped splines the given slopes
+        """
+        y = np.sin(self.x)
+        x, y, d, c, b = spline_coefficients(self.x, y, end_condition="natural")
+        self.assertAlmostEqual(c[0], 0)
+        self.assertAlmostEqual(2 * c[-1] + 6 * b[-1] * (x[-1] - x[-2]), 0)
+
+        x, y, d, c, b = spline_coefficients(
+            self.x, y, end_condition="clamped", end_slopes=(1, 1)
+        )
+        self.assertAlmostEqual(d[0], 1)
+        h = x[-1] - x[-2]
+        self.assertAlmostEqual(d[-1] + 2 * c[-1] * h + 3 * b[-1] * h**2, 1)
+        # The exact slopes give a better approximation of the function
+        self.assertLess(
+            np.max(
+                np.abs(splines(x, y, self.u, False, "clamped", (1, 1)) - np.sin(self.u))
+            ),
+            np.max(np.abs(splines(x, y, self.u, False, "natural") - np.sin(self.u))),
+        )
+
+    def test_periodic(self):
+        """
+        Periodic splines have the same slope and second derivative at both ends
+        """
+        y = np.sin(self.x)
+        y[-1] = y[0]
+        x, y, d, c, b = spline_coefficients(self.x, y, end_condition="periodic")
+        h = x[-1] - x[-2]
+        self.assertAlmostEqual(d[0], d[-1] + 2 * c[-1] * h + 3 * b[-1] * h**2)
+        self.assertAlmostEqual(2 * c[0], 2 * c[-1] + 6 * b[-1] * h)
+
+        # 3 points, the smallest periodic spline
+        v = splines([0, 1, 2], [0, 1, 0], [0, 1, 2], end_condition="periodic")
+        self.assertTrue(np.allclose(v, [0, 1, 0]))
+
+    def test_cubic_reproduced(self):
+        """
+        Not-a-knot and clamped splines (with the exact slopes) reproduce cubic polynomials
+        """
+        y = self.x**3 - self.x
+        self.assertTrue(np.allclose(splines(self.x, y, self.u), self.u**3 - self.u))
+        v = splines(self.x, y, self.u, False, "clamped", (-1, 3 * self.x[-1] ** 2 - 1))
+        self.assertTrue(np.allclose(v, self.u**3 - self.u))
+
+    def test_refit(self):
+        """
+        Refitting new y coordinates reuses the factorization and gives the same spline as fitting from scratch
+        """
+        for end_condition in ["not-a-knot", "natural", "clamped", "periodic"]:
+            fitted = Spline(self.x, np.cos(self.x), end_condition=end_condition)
+            factor = fitted.factor
+            y = np.cos(2 * self.x)
+            fitted.refit(y)
+            self.assertIs(fitted.factor, factor)
+            self.assertTrue(
+                np.allclose(
+                    fitted(self.u),
+                    splines(self.x, y, self.u, end_condition=end_condition),
+                )
+            )
+
+    def test_exceptions(self):
+        """
+        Unknown end conditions, non periodic data and too few points raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            splines(self.x, np.sin(self.x), self.u, end_condition="free")
+        with self.assertRaises(ValueError):
+            splines([0, 1, 2], [0, 1, 2], self.u, end_condition="periodic")
+        with self.assertRaises(ValueError):
+            Spline([0, 1], [0, 1], end_condition="periodic")
+        with self.assertRaises(ValueError):
+            Spline(self.x, np.cos(self.x)).refit([1, 2])
+
+
+class test_extrapolation(TestCase):
+    x = np.array([0, 1, 2.5, 3, 4.5, 6])
+    y = np.array([1, 3, 2, 0, 1, 1])
+    u = np.array([-2, -0.5, 0, 1.7, 6, 6.5, 9])
+    methods = [piecewise_linear, pchip, splines, akima, makima, steffen]
+
+    def test_policies(self):
+        """
+        The points inside [x[0], x[-1]] never depend on the policy, the ones outside follow it
+        """
+        inside = (self.u >= 0) & (self.u <= 6)
+        for method in self.methods:
+            v = method(self.x, self.y, self.u)
+            for extrapolate in ["linear", "constant", "nan"]:
+                w = method(self.x, self.y, self.u, extrapolate=extrapolate)
+                self.assertTrue(np.allclose(w[inside], v[inside]))
+            self.assertTrue(
+                np.allclose(
+                    method(self.x, self.y, self.u, extrapolate="constant")[~inside],
+                    [1, 1, 1, 1],
+                )
+            )
+            self.assertTrue(
+                np.all(
+                    np.isnan(method(self.x, self.y, self.u, extrapolate="nan")[~inside])
+                )
+            )
+
+    def test_linear(self):
+        """
+        The linear extrapolation follows the tangents at the ends
+        """
+        x, y, d, c, b = pchip_coefficients(self.x, self.y)
+        h = x[-1] - x[-2]
+        right = d[-2] + 2 * c[-1] * h + 3 * b[-1] * h**2
+        v = evaluate_piecewise(x, y, self.u, d, c, b, extrapolate="linear")
+        self.assertTrue(np.allclose(v[:2], 1 + d[0] * self.u[:2]))
+        self.assertTrue(np.allclose(v[-2:], 1 + right * (self.u[-2:] - 6)))
+        # The lines of the piecewise linear interpolant are continued
+        v = piecewise_linear(self.x, self.y, [-1, 7], extrapolate="linear")
+        self.assertTrue(np.allclose(v, [-1, 1]))
+
+    def test_periodic_and_raise(self):
+        """
+        The periodic policy wraps the points, and raise only accepts points inside [x[0], x[-1]]
+        """
+        y = np.sin(self.x * np.pi / 3)
+        y[-1] = y[0]
+        v = splines(self.x, y, self.u, end_condition="periodic", extrapolate="periodic")
+        w = splines(self.x, y, np.mod(self.u, 6), end_condition="periodic")
+        self.assertTrue(np.allclose(v, w))
+
+        v = pchip(self.x, self.y, [0, 3, 6], extrapolate="raise")
+        self.assertTrue(np.allclose(v, [1, 0, 1]))
+        with self.assertRaises(ValueError):
+            pchip(self.x, self.y, [0, 6.5], extrapolate="raise")
+        with self.assertRaises(ValueError):
+            pchip(self.x, self.y, self.u, extrapolate="cubic")
+
+    def test_fitted_and_chunks(self):
+        """
+        The fitted interpolants keep their policy after the points change, and the chunks use it too
+        """
+        fitted = Pchip(self.x, self.y, extrapolate="constant")
+        self.assertTrue(np.allclose(fitted([-1, 7]), [1, 1]))
+        fitted.insert(7, 5)
+        self.assertTrue(np.allclose(fitted([-1, 8]), [1, 5]))
+        fitted.remove(0)
+        self.assertTrue(np.allclose(fitted([-1, 8]), [3, 5]))
+        fitted.extrapolate = "nan"
+        self.assertTrue(np.all(np.isnan(fitted([-1, 8]))))
+
+        fitted = Spline(self.x, self.y, extrapolate="linear")
+        self.assertTrue(
+            np.allclose(
+                np.concatenate(list(fitted.chunks(self.u, chunk_size=3))),
+                splines(self.x, self.y, self.u, extrapolate="linear"),
+            )
+        )
+        fitted.refit(2 * self.y)
+        self.assertTrue(
+            np.allclose(
+                fitted(self.u),
+                splines(self.x, 2 * self.y, self.u, extrapolate="linear"),
+            )
+        )
+
+        v = np.concatenate(
+            list(
+                interpolate_chunks(akima, self.x, self.y, self.u, 2, extrapolate="nan")
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                v, akima(self.x, self.y, self.u, extrapolate="nan"), equal_nan=True
+            )
+        )
+        with self.assertRaises(ValueError):
+            interpolate_chunks(polinomial, self.x, self.y, self.u, extrapolate="nan")
+
+
+class test_FloaterHormann(TestCase):
+    def test_weights(self):
+        """
+        The weights are the ones of the definition, and with d = n - 1 the interpolant is the interpolating polynomial
+        """
+        x = np.array([0, 0.3, 0.4, 1, 1.7, 2])
+        for d in range(len(x)):
+            expected = np.zeros(len(x))
+            for k in range(len(x)):
+                for i in range(max(k - d, 0), min(k, len(x) - 1 - d) + 1):
+                    expected[k] += (-1) ** k / np.prod(
+                        [abs(x[k] - x[j]) for j in range(i, i + d + 1) if j != k]
+                    )
+            w = floater_hormann_weights(x, d)
+            self.assertTrue(np.allclose(w / w[0], expected / expected[0]))
+
+        # Equispaced points with d = 1: 1, -2, 2, ..., -2, 1 (up to a factor)
+        w = floater_hormann_weights(np.arange(6), 1)
+        self.assertTrue(np.allclose(w / w[0], [1, -2, 2, -2, 2, -1]))
+
+        u = np.linspace(0, 2, 50)
+        y = np.exp(x)
+        self.assertTrue(np.allclose(floater_hormann(x, y, u, 5), polinomial(x, y, u)))
+        with self.assertRaises(ValueError):
+            floater_hormann_weights(x, 6)
+
+    def test_runge(self):
+        """
+        On many equispaced points of Runge's function the interpolant converges, and it interpolates the data
+        """
+        x = np.linspace(-1, 1, 2001)
+        f = lambda t: 1 / (1 + 25 * t**2)
+        u = np.linspace(-1, 1, 777)
+        interpolant = FloaterHormann(x[::-1], f(x[::-1]), d=3)
+        self.assertTrue(np.allclose(interpolant(u), f(u), atol=1e-10))
+        self.assertTrue(np.allclose(interpolant(x[::7]), f(x[::7])))
+        self.assertTrue(
+            np.allclose(
+                np.concatenate(list(interpolant.chunks(u, chunk_size=100))),
+                floater_hormann(x, f(x), u),
+            )
+        )
+        with self.assertRaises(ValueError):
+            FloaterHormann([0, 1, 1], [0, 1, 2])
+
+
+class test_dtype(TestCase):
+    x = np.linspace(0, 10, 40)
+    y = (1000 * np.sin(np.linspace(0, 10, 40))).astype(np.int16)
+    u = np.arange(-50, 1050, dtype=np.int32) / np.float32(100)
+
+    def test_float32_pipeline(self):
+        """
+        With dtype=np.float32 the coefficients and the values are float32 and close to the float64 ones
+        """
+        for method in [piecewise_linear, pchip, splines, akima, makima, steffen]:
+            v = method(self.x, self.y, self.u, dtype=np.float32)
+            self.assertEqual(v.dtype, np.float32)
+            self.assertTrue(np.allclose(v, method(self.x, self.y, self.u), atol=1e-2))
+            # Integer points are not taken to float64
+            v = method(self.x, self.y, np.arange(11, dtype=np.int16), dtype=np.float32)
+            self.assertEqual(v.dtype, np.float32)
+
+        x, y, d, c, b = spline_coefficients(
+            self.x, self.y, end_condition="natural", dtype=np.float32
+        )
+        for array in (x, y, d, c, b):
+            self.assertEqual(array.dtype, np.float32)
+
+        chunks = interpolate_chunks(
+            akima, self.x, self.y, self.u, 100, dtype=np.float32
+        )
+        self.assertEqual(np.concatenate(list(chunks)).dtype, np.float32)
+        with self.assertRaises(ValueError):
+            pchip(self.x, self.y, self.u, dtype=np.int32)
+
+    def test_fitted_float32(self):
+        """
+        The fitted interpolants keep the type after the points change
+        """
+        for cls in [PiecewiseLinear, Pchip, Spline, Akima, Steffen]:
+            fitted = cls(self.x, self.y, dtype=np.float32)
+            fitted.insert(3.3, 100)
+            fitted.move(5, 4.1, -20)
+            fitted.remove(2)
+            self.assertEqual(fitted.d.dtype, np.float32)
+            self.assertEqual(fitted(self.u).dtype, np.float32)
+
+        fitted = Spline(self.x, self.y, dtype=np.float32)
+        fitted.refit(2 * self.y)
+        self.assertEqual(fitted(self.u).dtype, np.float32)
+        self.assertTrue(
+            np.allclose(fitted(self.u), splines(self.x, 2 * self.y, self.u), atol=1e-2)
+        )
+
+
+class test_uniform_grid(TestCase):
+    def test_detection(self):
+        """
+        Uniformly spaced points are detected despite rounding errors
+        """
+        self.assertAlmostEqual(uniform_spacing(np.linspace(-3, 7, 1001)), 0.01)
+        self.assertAlmostEqual(uniform_spacing(np.arange(10) * 0.1), 0.1)
+        self.assertIsNone(uniform_spacing(np.array([0, 1, 3])))
+        self.assertIsNone(uniform_spacing(np.linspace(0, 1, 50) ** 2))
+
+        x = np.linspace(0, 1, 11)
+        x, y, d, c, b = pchip_coefficients(x, np.sin(x))
+        self.assertIsNotNone(piecewise_table(x, y, d, c, b)[-1])
+        self.assertIsNone(piecewise_table(x, y, d, c, b, uniform=False)[-1])
+
+    def test_same_values(self):
+        """
+        The O(1) location of the subintervals gives the same values as the binary search, also at the points and outside
+        """
+        x = np.linspace(-3, 7, 101)
+        u = np.concatenate([np.linspace(-5, 9, 1001), x, x + 1e-9, x - 1e-9])
+        for dtype in [np.float64, np.float32]:
+            x_, y, d, c, b = spline_coefficients(x, np.cos(x), dtype=dtype)
+            for extrapolate in ["polynomial", "linear", "constant", "nan", "periodic"]:
+                fast = evaluate_piecewise(
+                    x_, y, u, d, c, b, extrapolate=extrapolate, uniform=True
+                )
+                slow = evaluate_piecewise(
+                    x_, y, u, d, c, b, extrapolate=extrapolate, uniform=False
+                )
+                self.assertTrue(np.allclose(fast, slow, atol=1e-5, equal_nan=True))
+            # The ends are inside
+            v = evaluate_piecewise(x_, y, x_, d, c, b, extrapolate="nan", uniform=True)
+            self.assertTrue(np.allclose(v, np.cos(x)))
+
+        # Both searches agree exactly, also at the points of x and next to them
+        u = np.concatenate([u, np.nextafter(x, np.inf), np.nextafter(x, -np.inf)])
+        self.assertTrue(
+            np.array_equal(
+                interval_index(x, u, uniform_spacing(x)), interval_index(x, u)
+            )
+        )
+
+    def test_ends(self):
+        """
+        At the ends and a few ulps past them, every policy gives the same values (or error) on uniform and non uniform grids
+        """
+        for dtype in [np.float64, np.float32]:
+            x = np.linspace(0, 1, 11).astype(dtype)
+            u = np.concatenate(
+                [
+                    [0, 1],
+                    np.nextafter(x[[0, -1]], -np.inf),
+                    np.nextafter(x[[0, -1]], np.inf),
+                ]
+            ).astype(dtype)
+            u = np.concatenate([u, u + dtype(1e-15), u - dtype(1e-15)])
+            x_, y, d, c, b = pchip_coefficients(x, np.exp(x), dtype=dtype)
+            for extrapolate in extrapolations:
+                for point in u:
+                    results = []
+                    for uniform in [True, False]:
+                        try:
+                            results.append(
+                                evaluate_piecewise(
+                                    x_,
+                                    y,
+                                    [point],
+                                    d,
+                                    c,
+                                    b,
+                                    extrapolate=extrapolate,
+                                    uniform=uniform,
+                                )
+                            )
+                        except ValueError:
+                            results.append("raised")
+                    if isinstance(results[0], str) or isinstance(results[1], str):
+                        self.assertEqual(results[0], results[1])
+                    else:
+                        self.assertTrue(np.array_equal(*results, equal_nan=True))
+                        self.assertEqual(results[0].dtype, dtype)
+
+        # A point just past the end raises on both grids
+        y = np.sin(np.linspace(0, 1, 11))
+        for x in [np.linspace(0, 1, 11), np.linspace(0, 1, 11) ** 1.1]:
+            with self.assertRaises(ValueError):
+                pchip(x, y, [1 + 1e-15], extrapolate="raise")
+
+    def test_interpolant_spacing(self):
+        """
+        The interpolants detect the uniform grid once and keep it through insert, remove and move, without scanning x again
+        """
+        x = np.linspace(0, 1, 11)
+        u = np.linspace(-0.5, 1.5, 201)
+        fitted = Pchip(x, np.sin(x))
+        self.assertAlmostEqual(fitted.spacing, 0.1)
+        with patch("BNumMet.Interpolation.uniform_spacing") as spacing:
+            fitted.insert(1.1, np.sin(1.1))  # Still uniform
+            self.assertAlmostEqual(fitted.spacing, 0.1)
+            fitted(u)
+            self.assertIsNotNone(fitted.table[-1])
+
+            fitted.move(3, 0.32, np.sin(0.32))
+            self.assertIsNone(fitted.spacing)
+            fitted(u)
+            self.assertIsNone(fitted.table[-1])
+            spacing.assert_not_called()
+
+        for change in [
+            lambda f: f.insert(1.05, 0),
+            lambda f: f.insert(1.2, 0),
+            lambda f: f.remove(4),
+            lambda f: f.remove(-1),
+            lambda f: f.move(-1, 1.1, 0),
+            lambda f: f.move(0, 0.55, 0),
+            lambda f: f.move(5, 0.5, 0),
+        ]:
+            fitted = Pchip(x, np.sin(x))
+            change(fitted)
+            self.assertEqual(fitted.spacing is None, uniform_spacing(fitted.x) is None)
+            self.assertTrue(np.allclose(fitted(u), pchip(fitted.x, fitted.y, u)))
+
+    def test_grid(self):
+        """
+        The grid interpolator uses the O(1) location on the uniform axes only
+        """
+        x, y = np.linspace(0, 1, 21), np.array([0, 0.1, 0.3, 0.6, 1])
+        values = np.sin(x)[:, None] * np.cos(y)[None, :]
+        interpolator = GridInterpolator((x, y), values, method="pchip")
+        self.assertIsNotNone(interpolator.spacings[0])
+        self.assertIsNone(interpolator.spacings[1])
+        xi = np.random.rand(100, 2)
+        self.assertTrue(
+            np.allclose(
+                interpolator(xi), np.sin(xi[:, 0]) * np.cos(xi[:, 1]), atol=1e-2
+            )
+        )
+
+
+class test_ParametricCurve(TestCase):
+    angles = np.linspace(0, 2 * np.pi, 41)
+    circle = np.c_[np.cos(angles), np.sin(angles)]
+
+    def test_parameter(self):
+        """
+        The parameterizations accumulate the distances between the points to the powers 0, 1/2 and 1
+        """
+        points = np.array([[0, 0], [3, 4], [3, 13]])
+        self.assertTrue(np.allclose(curve_parameter(points, "uniform"), [0, 1, 2]))
+        self.assertTrue(
+            np.allclose(
+                curve_parameter(points, "centripetal"), [0, 5**0.5, 5**0.5 + 3]
+            )
+        )
+        self.assertTrue(np.allclose(curve_parameter(points), [0, 5, 14]))
+        with self.assertRaises(ValueError):
+            curve_parameter(points, "arc")
+        with self.assertRaises(ValueError):
+            curve_parameter([[0, 0], [0, 0], [1, 1]])
+
+    def test_curves(self):
+        """
+        Every method interpolates the points and all the coordinates are evaluated at once, like the 1-D interpolants
+        """
+        for method in ["linear", "pchip", "spline", "akima", "makima", "steffen"]:
+            for parameterization in ["uniform", "centripetal", "chord"]:
+                curve = ParametricCurve(self.circle, method, parameterization)
+                self.assertTrue(np.allclose(curve(curve.t), self.circle))
+                u = np.linspace(0, curve.t[-1], 500)
+                v = curve(u)
+                self.assertEqual(v.shape, (500, 2))
+                self.assertTrue(np.allclose(np.linalg.norm(v, axis=1), 1, atol=5e-3))
+
+        curve = ParametricCurve(self.circle, "pchip", "uniform")
+        u = np.linspace(0, 40, 300)
+        self.assertTrue(
+            np.allclose(curve(u)[:, 1], pchip(np.arange(41), self.circle[:, 1], u))
+        )
+        with self.assertRaises(ValueError):
+            ParametricCurve(self.circle, "cubic")
+        with self.assertRaises(ValueError):
+            ParametricCurve(self.circle[:3], "spline")
+
+    def test_arc_length(self):
+        """
+        The arc length table gives the length of the curve and the points at equal distances along it
+        """
+        curve = ParametricCurve(self.circle, "spline", end_condition="periodic")
+        self.assertAlmostEqual(curve.length, 2 * np.pi, places=4)
+        s = np.linspace(0, curve.length, 9)
+        points = curve.at_length(s)
+        angles = np.unwrap(np.arctan2(points[:, 1], points[:, 0]))
+        self.assertTrue(np.allclose(angles, np.linspace(0, 2 * np.pi, 9), atol=1e-4))
+        self.assertTrue(np.allclose(curve.arc_length(curve.parameter_at(s)), s))
+
+        # Helix: the length is the one of the unrolled line
+        t = np.linspace(0, 4 * np.pi, 101)
+        helix = np.c_[np.cos(t), np.sin(t), t / 4]
+        curve = ParametricCurve(helix, "spline")
+        self.assertAlmostEqual(curve.length, 4 * np.pi * np.sqrt(1 + 1 / 16), places=4)
+        self.assertTrue(np.allclose(curve.at_length([0, curve.length]), helix[[0, -1]]))
+
+
+class test_hermite(TestCase):
+    x = np.array([0.4, 0, 1, 0.7, 0.2])
+    u = np.linspace(-0.2, 1.2, 300)
+
+    def test_hermite(self):
+        """
+        The interpolant matches the values and the derivatives, and reproduces cubic polynomials
+        """
+        y, dydx = self.x**3 - self.x, 3 * self.x**2 - 1
+        self.assertTrue(
+            np.allclose(hermite(self.x, y, dydx, self.u), self.u**3 - self.u)
+        )
+
+        y, dydx = np.sin(3 * self.x), 3 * np.cos(3 * self.x)
+        self.assertTrue(np.allclose(hermite(self.x, y, dydx, self.x), y))
+        e = 1e-6
+        slopes = (
+            hermite(self.x, y, dydx, self.x + e) - hermite(self.x, y, dydx, self.x - e)
+        ) / (2 * e)
+        self.assertTrue(np.allclose(slopes, dydx, atol=1e-5))
+        with self.assertRaises(ValueError):
+            hermite(self.x, y, dydx[:-1], self.u)
+
+    def test_CubicHermite(self):
+        """
+        The fitted interpolant keeps the derivatives of its points when they are inserted, removed or moved
+        """
+        f = lambda t: np.exp(t) * np.sin(4 * t)
+        df = lambda t: np.exp(t) * (np.sin(4 * t) + 4 * np.cos(4 * t))
+        fitted = CubicHermite(self.x, f(self.x), df(self.x))
+        self.assertTrue(
+            np.allclose(fitted(self.u), hermite(self.x, f(self.x), df(self.x), self.u))
+        )
+
+        fitted.insert(0.55, f(0.55), df(0.55))
+        fitted.remove(1)
+        fitted.move(0, 0.85, f(0.85), df(0.85))  # The point jumps over its neighbours
+        fitted.move(1, 0.45, f(0.45))  # The derivative is kept
+        x = np.array([0.4, 0.45, 0.7, 0.85, 1])
+        dydx = df(x)
+        dydx[1] = df(0.55)
+        self.assertTrue(np.allclose(fitted.x, x))
+        self.assertTrue(np.allclose(fitted.d, dydx))
+        self.assertTrue(np.allclose(fitted(self.u), hermite(x, f(x), dydx, self.u)))
+        with self.assertRaises(ValueError):
+            CubicHermite([0, 1], [0, 1], [0])
+
+
+class test_adaptive_interpolant(TestCase):
+    u = np.linspace(-1, 1, 20001)
+
+    def test_sample_function(self):
+        """
+        The batches are evaluated in order, also by an executor, and constant results are broadcast
+        """
+        x = np.linspace(0, 1, 10)
+        self.assertTrue(
+            np.allclose(sample_function(np.exp, x, batch_size=3), np.exp(x))
+        )
+        with ThreadPoolExecutor(2) as executor:
+            y = sample_function(np.exp, x, executor, batch_size=4)
+        self.assertTrue(np.allclose(y, np.exp(x)))
+        self.assertTrue(np.allclose(sample_function(lambda t: 2, x, batch_size=4), 2))
+
+    def test_local_polynomial(self):
+        """
+        The local polynomials of degree 5 reproduce quintic polynomials
+        """
+        x = np.sort(np.random.default_rng(0).uniform(0, 1, 12))
+        f = lambda t: t**5 - 2 * t**2 + 1
+        u = (x[:-1] + x[1:]) / 2
+        self.assertTrue(np.allclose(local_polynomial(x, f(x), u), f(u)))
+
+    def test_tolerance(self):
+        """
+        The returned error is within tol and close to the real error, and the points cluster where f is steep
+        """
+        f = lambda t: np.tanh(50 * t)
+        for method in ["pchip", "spline"]:
+            fitted, error = adaptive_interpolant(f, -1, 1, method, tol=1e-6)
+            self.assertLessEqual(error, 1e-6)
+            # Checked at 7 Chebyshev points per subinterval, the error between them is only slightly larger
+            self.assertLessEqual(np.max(np.abs(fitted(self.u) - f(self.u))), 1.1e-6)
+            spacing = np.diff(fitted.x)
+            self.assertLess(spacing[np.argmin(np.abs(fitted.x[:-1]))], spacing[0] / 10)
+
+        with ThreadPoolExecutor(2) as executor:
+            parallel, error = adaptive_interpolant(
+                f, -1, 1, "spline", tol=1e-6, executor=executor, batch_size=16
+            )
+        self.assertTrue(np.array_equal(parallel.x, fitted.x))
+
+    def test_max_points(self):
+        """
+        The refinement stops at max_points when the tolerance cannot be met
+        """
+        fitted, error = adaptive_interpolant(np.sign, -1, 1.3, tol=1e-3, max_points=200)
+        self.assertLessEqual(len(fitted.x), 200)
+        self.assertGreater(error, 1e-3)
+        with self.assertRaises(ValueError):
+            adaptive_interpolant(np.sin, 0, 1, "akima")
+        with self.assertRaises(ValueError):
+            adaptive_interpolant(np.sin, 1, 0)
+        with self.assertRaises(ValueError):
+            adaptive_interpolant(np.sin, 0, 1, n=3)
+        with self.assertRaises(ValueError):
+            adaptive_interpolant(np.sin, 0, 1, checks=4)
+
+    def test_checks(self):
+        """
+        The error is measured at the check points of every subinterval: more points find a larger error than the midpoints alone
+        """
+        f = lambda t: np.sin(30 * t) * np.exp(t)
+        midpoints, _ = adaptive_interpolant(f, -1, 1, tol=1e-6, checks=1)
+        fitted, error = adaptive_interpolant(f, -1, 1, tol=1e-6)
+        self.assertGreater(len(fitted.x), len(midpoints.x))
+        self.assertLessEqual(error, 1e-6)
+        real = lambda interpolant: np.max(np.abs(interpolant(self.u) - f(self.u)))
+        self.assertLess(real(fitted), real(midpoints))
+
+
+class test_interpolate_chunks(TestCase):
+    x = np.array([1, 2, 3, 4, 5.5, 7])
+    y = np.array([1, 4, 9, 16, 3, 2])
+    u = np.linspace(0, 8, 1001)
+
+    def test_same_as_full_evaluation(self):
+        """
+        Evaluating by chunks gives the same values as evaluating all u at once, for every method
+        """
+        for method in [polinomial, piecewise_linear, pchip, splines]:
+            v = method(self.x, self.y, self.u)
+            chunks = list(interpolate_chunks(method, self.x, self.y, self.u, 64))
+
+            self.assertEqual(len(chunks), 16)
+            self.assertTrue(all(len(chunk) <= 64 for chunk in chunks))
+            self.assertTrue(np.allclose(np.concatenate(chunks), v))
+
+    def test_iterator_and_out(self):
+        """
+        Points can come from any iterator and the results can be written in a given buffer
+        """
+        out = np.zeros(len(self.u))
+        chunks = interpolate_chunks(
+            pchip, self.x, self.y, (ui for ui in self.u), chunk_size=100, out=out
+        )
+        for chunk in chunks:
+            self.assertTrue(np.shares_memory(chunk, out))
+
+        self.assertTrue(np.allclose(out, pchip(self.x, self.y, self.u)))
+
+    def test_memmap(self):
+        """
+        Points and results can be memory mapped files
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            u = np.memmap(os.path.join(folder, "u.dat"), "float64", "w+", shape=(1001,))
+            out = np.memmap(
+                os.path.join(folder, "v.dat"), "float64", "w+", shape=(1001,)
+            )
+            u[:] = self.u
+            for _ in interpolate_chunks(splines, self.x, self.y, u, 128, out=out):
+                pass
+
+            self.assertTrue(np.allclose(out, splines(self.x, self.y, self.u)))
+            del u, out
+
+    def test_exceptions(self):
+        """
+        Non positive chunk sizes and too small buffers raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            list(interpolate_chunks(pchip, self.x, self.y, self.u, chunk_size=0))
+        with self.assertRaises(ValueError):
+            list(interpolate_chunks(pchip, self.x, self.y, self.u, out=np.zeros(10)))
+        with self.assertRaises(ValueError):
+            list(
+                interpolate_chunks(
+                    pchip, self.x, self.y, iter(self.u), 100, out=np.zeros(10)
+                )
+            )
+
+
+class test_PiecewiseInterpolant(TestCase):
+    x = np.array([1, 2, 3, 4, 5.5, 7, 8, 10])
+    y = np.array([1, 4, 9, 16, 3, 2, 5, 5])
+    u = np.linspace(0, 11, 500)
+    methods = [
+        (PiecewiseLinear, piecewise_linear),
+        (Pchip, pchip),
+        (Spline, splines),
+        (Akima, akima),
+        (Makima, makima),
+        (Steffen, steffen),
+    ]
+
+    def test_same_as_functions(self):
+        """
+        The fitted interpolants give the same values as the functions, also by chunks
+        """
+        for interpolant, method in self.methods:
+            fitted = interpolant(self.x[::-1], self.y[::-1])
+            v = method(self.x, self.y, self.u)
+
+            self.assertTrue(np.allclose(fitted(self.u), v))
+            self.assertTrue(
+                np.allclose(np.concatenate(list(fitted.chunks(self.u, 7))), v)
+            )
+
+    def test_insert_remove_move(self):
+        """
+        Inserting, removing and moving points gives the same values as fitting again from scratch
+        """
+        for interpolant, method in self.methods:
+            fitted = interpolant(self.x, self.y)
+
+            self.assertEqual(fitted.insert(6, -2), 5)
+            x, y = np.insert(self.x, 5, 6), np.insert(self.y, 5, -2)
+            self.assertTrue(np.allclose(fitted(self.u), method(x, y, self.u)))
+
+            fitted.remove(2)
+            x, y = np.delete(x, 2), np.delete(y, 2)
+            self.assertTrue(np.allclose(fitted(self.u), method(x, y, self.u)))
+
+            self.assertEqual(fitted.move(3, 5, 0), 3)  # Stays between its neighbours
+            x[3], y[3] = 5, 0
+            self.assertTrue(np.allclose(fitted(self.u), method(x, y, self.u)))
+
+            self.assertEqual(fitted.move(0, 9, 1), 6)  # Jumps over its neighbours
+            x[0], y[0] = 9, 1
+            self.assertTrue(np.allclose(fitted(self.u), method(x, y, self.u)))
+
+    def test_exceptions(self):
+        """
+        Repeated x coordinates, different lengths and too few points raise ValueError
+        """
+        fitted = Pchip(self.x, self.y)
+        with self.assertRaises(ValueError):
+            fitted.insert(2, 0)
+        with self.assertRaises(ValueError):
+            fitted.move(0, 3, 0)
+        with self.assertRaises(ValueError):
+            Pchip([1, 2, 2, 3], [1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            Pchip([1, 2, 3, 4], [1, 2, 3])
+        with self.assertRaises(ValueError):
+            Spline([1, 2, 3, 4], [1, 2, 3, 4]).remove(0)
+
+
+class test_GridInterpolator(TestCase):
+    x0 = np.array([0, 1, 2.5, 3, 4.5, 6])
+    x1 = np.array([-1, 0, 1, 2, 4])
+    values = np.sin(x0[:, None]) * np.cos(x1[None, :]) + x0[:, None]
+    points = np.array([[0.3, 2.2], [2.7, -0.5], [5.9, 3.9], [1.0, 1.0], [4, 0.1]])
+    methods = {
+        "linear": piecewise_linear,
+        "pchip": pchip,
+        "spline": splines,
+        "akima": akima,
+        "makima": makima,
+        "steffen": steffen,
+    }
+
+    def nested(self, method, point):
+        """
+        Interpolation along the last axis and then along the first one, with the 1-D method
+        """
+        line = [method(self.x1, row, [point[1]])[0] for row in self.values]
+        return method(self.x0, np.array(line), [point[0]])[0]
+
+    def test_same_as_nested_1d(self):
+        """
+        Every method gives the same values as nesting the 1-D method along every axis
+        """
+        for name, method in self.methods.items():
+            grid = GridInterpolator([self.x0, self.x1], self.values, name)
+            expected = [self.nested(method, point) for point in self.points]
+
+            self.assertTrue(np.allclose(grid(self.points, chunk_size=2), expected))
+            self.assertTrue(np.allclose(grid([[1, 2]]), self.values[1, 3]))
+
+    def test_3d_memmap(self):
+        """
+        A memory mapped 3-D grid, with the spline derivatives also memory mapped, reproduces a trilinear function
+        """
+        x = [np.arange(5.0), np.arange(6.0), np.arange(4.0)]
+        points = np.random.rand(50, 3) * 3
+        f = lambda p: 1 + p[..., 0] - 2 * p[..., 1] + 3 * p[..., 0] * p[..., 2]
+        with tempfile.TemporaryDirectory() as folder:
+            values = np.lib.format.open_memmap(
+                os.path.join(folder, "values.npy"), "w+", float, (5, 6, 4)
+            )
+            values[:] = f(np.stack(np.meshgrid(*x, indexing="ij"), axis=-1))
+            for method in self.methods:
+                grid = GridInterpolator(x, values, method, derivatives_dir=folder)
+                self.assertTrue(np.allclose(grid(points), f(points)))
+            del grid, values
+
+    def test_out(self):
+        """
+        The result is stored in out also when out is not contiguous, and out with a wrong shape raises ValueError
+        """
+        points = np.random.rand(4, 3, 2) * 4
+        for name in self.methods:
+            grid = GridInterpolator([self.x0, self.x1], self.values, name)
+            expected = grid(points)
+            for out in [np.empty((4, 3)), np.empty((3, 4)).T, np.empty((8, 3))[::2]]:
+                self.assertIs(grid(points, out=out), out)
+                self.assertTrue(np.allclose(out, expected))
+            with self.assertRaises(ValueError):
+                grid(points, out=np.empty(12))
+
+    def test_local_chunks(self):
+        """
+        The chunks of the local methods are divided by the number of grid values around every point (4 x 4 and 6 x 5 here)
+        """
+        points = np.random.rand(100, 2) * 4
+        for name, length in [("linear", 100), ("pchip", 19), ("akima", 10)]:
+            grid = GridInterpolator([self.x0, self.x1], self.values, name)
+            expected = grid(points)
+            lengths = []
+            evaluate = grid.evaluate
+            grid.evaluate = lambda xi, out: lengths.append(len(xi)) or evaluate(xi, out)
+            self.assertTrue(np.allclose(grid(points, chunk_size=300), expected))
+            self.assertEqual(max(lengths), length)
+
+    def test_exceptions(self):
+        """
+        Unknown methods, wrong shapes, unsorted or too short axes and wrong points raise ValueError
+        """
+        grid = [self.x0, self.x1]
+        with self.assertRaises(ValueError):
+            GridInterpolator(grid, self.values, "cubic")
+        with self.assertRaises(ValueError):
+            GridInterpolator(grid, self.values.T)
+        with self.assertRaises(ValueError):
+            GridInterpolator([self.x0[::-1], self.x1], self.values)
+        with self.assertRaises(ValueError):
+            GridInterpolator([[0, 1, 2]], [1, 2, 3], "pchip")
+        with self.assertRaises(ValueError):
+            GridInterpolator(grid, self.values)([1, 2, 3])
+
+
+class test_ChebyshevInterpolant(TestCase):
+    def test_coefficients(self):
+        """
+        The FFT coefficients are the same as the least squares fit of the same degree (which interpolates)
+        """
+        x = chebyshev_points(12, -1, 1)
+        values = np.exp(x) * np.sin(3 * x)
+        self.assertTrue(
+            np.allclose(
+                chebyshev_coefficients(values),
+                np.polynomial.chebyshev.chebfit(x, values, 12),
+            )
+        )
+
+    def test_adaptive(self):
+        """
+        Smooth functions are approximated to machine precision with just the degree needed
+        """
+        u = np.linspace(-1, 2, 1001)
+        interpolant = chebyshev_interpolant(np.exp, -1, 2)
+        self.assertLess(interpolant.degree, 30)
+        self.assertTrue(np.allclose(interpolant(u), np.exp(u), rtol=1e-13, atol=0))
+
+        # A polynomial is recovered with its own degree
+        interpolant = chebyshev_interpolant(lambda x: x**3 - x, -2, 2)
+        self.assertEqual(interpolant.degree, 3)
+        self.assertTrue(np.allclose(interpolant.coefficients, [0, 4, 0, 2]))
+
+        # Constant functions
+        interpolant = chebyshev_interpolant(lambda x: 3.0, 0, 1)
+        self.assertEqual(interpolant.degree, 0)
+        self.assertTrue(np.allclose(interpolant([0.2, 0.7]), 3))
+
+    def test_fixed_degree_and_chunks(self):
+        """
+        With a fixed degree the interpolant goes through the Chebyshev points, chunks gives the same values
+        """
+        interpolant = chebyshev_interpolant(np.cos, 0, 1, n=5)
+        x = chebyshev_points(5, 0, 1)
+        self.assertTrue(np.allclose(interpolant(x), np.cos(x)))
+
+        u = np.linspace(0, 1, 250)
+        out = np.empty(250)
+        list(interpolant.chunks(iter(u), chunk_size=100, out=out))
+        self.assertTrue(np.allclose(out, interpolant(u)))
+
+    def test_roots(self):
+        """
+        The roots of the colleague matrix are the roots of the function in the interval
+        """
+        interpolant = chebyshev_interpolant(lambda x: np.sin(20 * x), 0, 3)
+        self.assertTrue(np.allclose(interpolant.roots(), np.arange(20) * np.pi / 20))
+        self.assertTrue(
+            np.allclose(chebyshev_interpolant(lambda x: 2 * x - 1, 0, 1).roots(), 0.5)
+        )
+        self.assertEqual(len(chebyshev_interpolant(np.exp, 0, 1).roots()), 0)
+
+    def test_exceptions(self):
+        """
+        Wrong intervals or degrees raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            chebyshev_interpolant(np.exp, 1, 0)
+        with self.assertRaises(ValueError):
+            chebyshev_interpolant(np.exp, 0, 1, n=-1)
+
+
 class test_InterpolationVisualizer(TestCase):
     # Run before each test
 
@@ -356,6 +1348,62 @@ class test_InterpolationVisualizer(TestCase):
             and (self.interpolVisualizer.scattered_dots.y == oldY).all()
         )
 
+    def test_incrementalUpdates(self):
+        """
+        Adding and moving points updates the fitted interpolants, giving the same lines as fitting from scratch
+        """
+        self.runtest_setup()
+        visualizer = self.interpolVisualizer
+        fitted = dict(visualizer.fitted)
+
+        visualizer.scattered_dots.x = np.append(visualizer.scattered_dots.x, 7)
+        visualizer.scattered_dots.y = np.append(visualizer.scattered_dots.y, 10)
+        new_x = np.array(visualizer.scattered_dots.x)
+        new_x[2] = 3.5
+        new_y = np.array(visualizer.scattered_dots.y)
+        new_y[2] = 20
+        visualizer.scattered_dots.x = new_x  # Dragging a point changes x and then y
+        visualizer.scattered_dots.y = new_y
+
+        for key, interpolant in visualizer.fitted.items():
+            self.assertIs(interpolant, fitted[key])  # Updated, not fitted again
+            self.assertEqual(len(interpolant.x), 7)
+
+        for line in visualizer.interpolation_lines:
+            method = visualizer.methods[line.labels[0]][0]
+            self.assertTrue(
+                np.allclose(line.y, method(visualizer.x, visualizer.y, visualizer.u))
+            )
+
+    def test_fewPointsAndUnchecked(self):
+        """
+        The methods that need more points are hidden until there are enough and unchecked methods are not fitted
+        """
+        visualizer = InterpolVisualizer([1.0, 2.0, 3.0], [1.0, 4.0, 2.0], [1, 2, 3])
+        visualizer.run()
+        labels = [line.labels[0] for line in visualizer.interpolation_lines]
+        self.assertEqual(labels, ["InterPoly", "Piecewise Linear"])
+        self.assertEqual(list(visualizer.fitted), ["Piecewise Linear"])
+
+        visualizer.scattered_dots.x = np.append(visualizer.scattered_dots.x, 4)
+        visualizer.scattered_dots.y = np.append(visualizer.scattered_dots.y, 3)
+        labels = [line.labels[0] for line in visualizer.interpolation_lines]
+        self.assertEqual(labels, list(visualizer.methods))
+
+        visualizer.methods["Pchip"][2].value = False
+        self.assertNotIn("Pchip", visualizer.fitted)
+        new_y = np.array(visualizer.scattered_dots.y)
+        new_y[1] = 5
+        visualizer.scattered_dots.y = new_y
+        self.assertNotIn("Pchip", visualizer.fitted)
+
+        visualizer.methods["Pchip"][2].value = True  # Fitted again with the moved point
+        line = visualizer.interpolation_lines[2]
+        self.assertEqual(line.labels[0], "Pchip")
+        self.assertTrue(
+            np.allclose(line.y, pchip(visualizer.x, visualizer.y, visualizer.u))
+        )
+
     def test_autoZoom(self):
         self.runtest_setup()
 
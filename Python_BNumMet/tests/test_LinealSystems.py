@@ -3,19 +3,35 @@ import sys
 import unittest
 from random import randint
 from unittest import TestCase
+from unittest.mock import patch
 
 import numpy as np
 import pytest
 
 from BNumMet.LinearSystems import (
     backward_substitution,
+    banded_cholesky,
+    banded_cholesky_solve,
+    balance,
+    banded_inverse,
+    batched_lu_solve,
+    cyclic_tridiagonal_lu,
+    cyclic_tridiagonal_lu_solve,
+    eigenvalues,
     forward_substitution,
+    givens,
+    hessenberg,
     interactive_lu,
     lu,
+    lu_factor,
+    lu_factor_solve,
     lu_solve,
     permute,
     qr_factorization,
     qr_solve,
+    tridiagonal_lu,
+    tridiagonal_lu_solve,
+    tridiagonal_solve,
 )
 from BNumMet.Visualizers.LUVisualizer import LUVisualizer
 
@@ -314,6 +330,14 @@ class Test_LinearSystems(TestCase):
         Q, R = qr_factorization(A)
         self.assertTrue(np.allclose(A, Q @ R))
 
+        # Test 4: Zero leading entries and a zero column
+        A = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 9]])
+        Q, R = qr_factorization(A)
+        self.assertTrue(np.allclose(A, Q @ R))
+        A = np.array([[0, 1], [0, 2]])
+        Q, R = qr_factorization(A)
+        self.assertTrue(np.allclose(A, Q @ R))
+
     def test_qrSolve(self):
         # Test case 1: Solve a 2x2 system
         A = np.array([[1, 1], [1, -1]])
@@ -360,6 +384,257 @@ class Test_LinearSystems(TestCase):
         qr_solve(A, b)
 
 
+class Test_TridiagonalSolve(TestCase):
+    def test_tridiagonalSolve_random(self):
+        """
+        Test the tridiagonal solver on a random diagonally dominant system against the LU solver
+        """
+        n = 20
+        a, c = np.random.rand(n - 1), np.random.rand(n - 1)
+        b = 4 + np.random.rand(n)
+        r = np.random.rand(n)
+        A = np.diag(a, -1) + np.diag(b) + np.diag(c, 1)
+
+        self.assertTrue(np.allclose(tridiagonal_solve(a, b, c, r), lu_solve(A, r)))
+        self.assertTrue(np.allclose(A @ tridiagonal_solve(a, b, c, r), r))
+
+        R = np.random.rand(n, 3)  # Several right-hand sides at once
+        self.assertTrue(np.allclose(A @ tridiagonal_solve(a, b, c, R), R))
+
+    def test_tridiagonalSolve_exceptions(self):
+        """
+        Test that the tridiagonal solver raises ValueError with wrong sizes or zero pivots
+        """
+        with self.assertRaises(ValueError):
+            tridiagonal_solve([1, 1], [1, 1], [1], [1, 1])
+        with self.assertRaises(ValueError):
+            tridiagonal_solve([1], [0, 1], [1], [1, 1])
+        with self.assertRaises(ValueError):
+            tridiagonal_solve([1], [1, 1], [1], [1, 1])
+
+    def test_tridiagonalLU_reuse(self):
+        """
+        Test that the factorization solves systems with different right-hand sides, also cyclic ones (Sherman-Morrison)
+        """
+        n = 12
+        a, c = np.random.rand(n - 1), np.random.rand(n - 1)
+        b = 4 + np.random.rand(n)
+        A = np.diag(a, -1) + np.diag(b) + np.diag(c, 1)
+
+        factor = tridiagonal_lu(a, b, c)
+        for _ in range(3):
+            r = np.random.rand(n)
+            self.assertTrue(np.allclose(A @ tridiagonal_lu_solve(factor, r), r))
+
+        A[0, -1], A[-1, 0] = 0.7, 0.3  # Corners
+        factor = cyclic_tridiagonal_lu(a, b, c, 0.7, 0.3)
+        r = np.random.rand(n)
+        self.assertTrue(np.allclose(A @ cyclic_tridiagonal_lu_solve(factor, r), r))
+        R = np.random.rand(n, 3)
+        self.assertTrue(np.allclose(A @ cyclic_tridiagonal_lu_solve(factor, R), R))
+
+        with self.assertRaises(ValueError):
+            tridiagonal_lu_solve(factor[0], np.ones(n + 1))
+
+        # Single precision systems are solved in single precision
+        a32, b32, c32 = (v.astype(np.float32) for v in (a, b, c))
+        factor = cyclic_tridiagonal_lu(a32, b32, c32, 0.7, 0.3)
+        x = cyclic_tridiagonal_lu_solve(factor, r.astype(np.float32))
+        self.assertEqual(x.dtype, np.float32)
+        self.assertTrue(np.allclose(A @ x, r, atol=1e-5))
+        with self.assertRaises(ValueError):
+            cyclic_tridiagonal_lu([1], [1, 1], [1], 1, 1)
+
+
+class Test_LUFactor(TestCase):
+    def test_luFactor_random(self):
+        """
+        Test that the blocked factorization matches lu and solves systems with A and its transpose, for sizes around the block size
+        """
+        for n in [1, 5, 20, 21]:
+            A = np.random.rand(n, n)
+            LU, pivots = lu_factor(A, block_size=4)
+            P, L, U = lu(A)
+            self.assertTrue(np.allclose(np.tril(LU, -1) + np.eye(n), L))
+            self.assertTrue(np.allclose(np.triu(LU), U))
+            self.assertTrue(np.allclose(A[pivots], P @ A))
+
+            factor = lu_factor(A)
+            r, R = np.random.rand(n), np.random.rand(n, 3)
+            self.assertTrue(np.allclose(A @ lu_factor_solve(factor, r), r))
+            self.assertTrue(np.allclose(A.T @ lu_factor_solve(factor, r, True), r))
+            self.assertTrue(np.allclose(A @ lu_factor_solve(factor, R), R))
+
+    def test_luFactor_exceptions(self):
+        """
+        Test that the factorization raises ValueError with a non square or singular matrix, and the solver with a wrong size
+        """
+        with self.assertRaises(ValueError):
+            lu_factor(np.random.rand(3, 2))
+        with self.assertRaises(ValueError):
+            lu_factor([[1, 2], [2, 4]])
+        with self.assertRaises(ValueError):
+            lu_factor_solve(lu_factor(np.eye(2)), np.ones(3))
+
+
+class Test_Eigenvalues(TestCase):
+    def test_balance_hessenberg(self):
+        """
+        Test that balancing and the Hessenberg reduction keep the eigenvalues, balancing equalizes the norms and H has zeros below the subdiagonal
+        """
+        # A well scaled matrix made badly scaled with a diagonal similarity
+        D = np.diag(2.0 ** np.arange(0, 40, 5))
+        A = D @ (np.random.rand(8, 8) + 0.5) @ np.linalg.inv(D)
+        for B in [balance(A), hessenberg(balance(A))]:
+            self.assertTrue(
+                np.allclose(
+                    np.sort_complex(np.linalg.eigvals(B)),
+                    np.sort_complex(np.linalg.eigvals(A)),
+                )
+            )
+        self.assertLess(np.linalg.norm(balance(A)), 1e-6 * np.linalg.norm(A))
+        self.assertTrue(np.all(np.tril(hessenberg(A), -2) == 0))
+
+    def test_eigenvalues_random(self):
+        """
+        Test that the shifted QR iteration matches numpy, with real and complex eigenvalues
+        """
+        for n in [1, 2, 3, 10, 30]:
+            A = np.random.rand(n, n) - 0.5
+            self.assertTrue(
+                np.allclose(
+                    np.sort_complex(eigenvalues(A)),
+                    np.sort_complex(np.linalg.eigvals(A)),
+                )
+            )
+        # A rotation of the axes: the roots of unity
+        self.assertTrue(
+            np.allclose(
+                np.sort_complex(eigenvalues(np.roll(np.eye(5), 1, 0))),
+                np.sort_complex(np.exp(2j * np.pi * np.arange(5) / 5)),
+            )
+        )
+        self.assertTrue(np.allclose(eigenvalues([[2, 1], [0, 2]]), [2, 2]))
+
+    def test_eigenvalues_givens(self):
+        """
+        Test that the QR steps are done on the Hessenberg form with Givens rotations, without dense QR factorizations,
+        on matrices with real and complex eigenvalues
+        """
+        A = np.random.rand(60, 60) - 0.5
+        S = A + A.T  # Only real eigenvalues, single steps
+        with patch("BNumMet.LinearSystems.qr_factorization") as qr:
+            for M in [A, S]:
+                self.assertTrue(
+                    np.allclose(
+                        np.sort_complex(eigenvalues(M)),
+                        np.sort_complex(np.linalg.eigvals(M)),
+                    )
+                )
+            qr.assert_not_called()
+
+        G, r = givens(3, -4)
+        self.assertAlmostEqual(r, 5)
+        self.assertTrue(np.allclose(G @ [3, -4], [5, 0]))
+        self.assertTrue(np.allclose(G @ G.T, np.eye(2)))
+
+    def test_eigenvalues_exceptions(self):
+        """
+        Test that a non square matrix raises ValueError
+        """
+        with self.assertRaises(ValueError):
+            eigenvalues(np.random.rand(3, 2))
+
+
+class Test_BatchedLUSolve(TestCase):
+    def test_batchedLUSolve_random(self):
+        """
+        Test the batched solver on random systems (including ones that need pivoting) against the LU solver
+        """
+        A = np.random.rand(50, 6, 6)
+        A[:, 0, 0] = 0  # Forces a row exchange
+        b = np.random.rand(50, 6)
+        x = batched_lu_solve(A, b)
+        for i in range(50):
+            self.assertTrue(np.allclose(x[i], lu_solve(A[i], b[i])))
+
+    def test_batchedLUSolve_exceptions(self):
+        """
+        Test that the batched solver raises ValueError with wrong shapes or a singular system
+        """
+        with self.assertRaises(ValueError):
+            batched_lu_solve(np.random.rand(3, 2, 3), np.random.rand(3, 2))
+        with self.assertRaises(ValueError):
+            batched_lu_solve(np.random.rand(3, 2, 2), np.random.rand(2, 2))
+        A = np.random.rand(3, 2, 2)
+        A[1] = [[1, 2], [2, 4]]
+        with self.assertRaises(ValueError):
+            batched_lu_solve(A, np.random.rand(3, 2))
+
+
+class Test_BandedCholesky(TestCase):
+    def random_banded(self, n, p):
+        """
+        Random symmetric positive definite matrix with bandwidth p, and its lower band
+        """
+        A = np.random.rand(n, n)
+        A = A + A.T + 2 * (p + 1) * np.eye(n)  # Diagonally dominant
+        A[np.abs(np.subtract.outer(np.arange(n), np.arange(n))) > p] = 0
+        ab = np.zeros((p + 1, n))
+        for j in range(p + 1):
+            ab[j, : n - j] = np.diag(A, -j)
+        return A, ab
+
+    def test_bandedCholesky_random(self):
+        """
+        Test the factor, the solution and the band of the inverse against the dense results
+        """
+        for n, p in [(15, 3), (10, 1), (3, 3)]:
+            A, ab = self.random_banded(n, p)
+            factor = banded_cholesky(ab)
+            L = np.linalg.cholesky(A)
+            inverse = np.linalg.inv(A)
+            band = banded_inverse(factor)
+            for j in range(p + 1):
+                self.assertTrue(np.allclose(factor[j, : n - j], np.diag(L, -j)))
+                self.assertTrue(np.allclose(band[j, : n - j], np.diag(inverse, -j)))
+
+            r = np.random.rand(n)
+            self.assertTrue(np.allclose(A @ banded_cholesky_solve(factor, r), r))
+            R = np.random.rand(n, 2)  # Several right-hand sides at once
+            self.assertTrue(np.allclose(A @ banded_cholesky_solve(factor, R), R))
+
+    def test_bandedCholesky_stack(self):
+        """
+        Test that a stack of bands gives the same results as every band on its own, and NaN for the singular ones with check=False
+        """
+        bands = np.stack([self.random_banded(12, 3)[1] for _ in range(4)])
+        bands[2, 0, 5] = -1  # Not positive definite
+        with self.assertRaises(ValueError):
+            banded_cholesky(bands)
+
+        factors = banded_cholesky(bands, check=False)
+        self.assertEqual(factors.shape, (4, 4, 12))
+        self.assertTrue(np.all(np.isnan(factors[2, 0, 5:])))
+        r = np.random.rand(4, 12)
+        x = banded_cholesky_solve(factors, r)
+        inverse = banded_inverse(factors)
+        for i in [0, 1, 3]:
+            factor = banded_cholesky(bands[i])
+            self.assertTrue(np.allclose(factors[i], factor))
+            self.assertTrue(np.allclose(x[i], banded_cholesky_solve(factor, r[i])))
+            self.assertTrue(np.allclose(inverse[i], banded_inverse(factor)))
+
+    def test_bandedCholesky_exceptions(self):
+        """
+        Test that ValueError is raised if the matrix is not positive definite or the sizes differ
+        """
+        with self.assertRaises(ValueError):
+            banded_cholesky([[1, 1], [2, 0]])
+        with self.assertRaises(ValueError):
+            banded_cholesky_solve(banded_cholesky([[1, 1], [0, 0]]), [1, 2, 3])
+
+
 class Test_LUVisualizer(TestCase):
     def runtest_setup(self, A=None):
         """
@@ -1,7 +1,11 @@
 from BNumMet.NonLinear import *
 from BNumMet.Visualizers.NonLinearVisualizer import NonLinearVisualizer
+import asyncio
 import numpy as np
+from scipy import sparse
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
+from unittest.mock import patch
 
 
 class test_Roots(TestCase):
@@ -10,20 +14,25 @@ class test_Roots(TestCase):
         Test the bisection method
         """
         f = lambda x: x**2 - 1
-        x = bisect(f, [0, 2])
-        x1, iters = bisect(f, [0, 2], iters=True)
-        self.assertTrue(np.isclose(x, 1))
-        self.assertTrue(np.isclose(x1, 1))
+        result = bisect(f, [0, 2])
+        self.assertTrue(np.isclose(result.root, 1))
+        self.assertEqual((result.iterations, result.reason), (1, "zero found"))
+
+        result = bisect(f, [0, 3])
+        self.assertTrue(np.isclose(result.root, 1))
+        self.assertTrue(result.converged)
+        self.assertIn(result.reason, reasons[:2])
+        self.assertLess(result.iterations, 100)
 
     def test_secant(self):
         """
         Test the secant method
         """
         f = lambda x: x**2 - 1
-        x = secant(f, [0, 2])
-        x1, iters = secant(f, [0, 2], iters=True)
-        self.assertTrue(np.isclose(x, 1))
-        self.assertTrue(np.isclose(x1, 1))
+        result = secant(f, [0, 2])
+        self.assertTrue(np.isclose(result.root, 1))
+        self.assertTrue(result.converged)
+        self.assertTrue(np.isclose(result.froot, 0))
 
     def test_newton(self):
         """
@@ -31,36 +40,86 @@ class test_Roots(TestCase):
         """
         f = lambda x: x**2 - 1
         fprime = lambda x: 2 * x
-        x = newton(f, fprime, 3)
-        x1, iters = newton(f, fprime, 3, iters=True)
-        self.assertTrue(np.isclose(x, 1))
-        self.assertTrue(np.isclose(x1, 1))
+        result = newton(f, fprime, 3)
+        self.assertTrue(np.isclose(result.root, 1))
+        self.assertTrue(result.converged)
+        self.assertGreater(result.njev, 0)
 
     def test_zBrentDekker(self):
         """
         Test the zBrentDekker method
         """
         f = lambda x: x**2 - 1
-        x0 = zBrentDekker(f, [0, 2])
-        x, iters = zBrentDekker(f, [0, 2], iters=True)
-        x1, iters1, steps = zBrentDekker(f, [0, 2], iters=True, steps=True)
-        x2, steps = zBrentDekker(f, [0, 2], iters=False, steps=True)
-        print(x, iters)
-        self.assertTrue(np.isclose(x0, 1))
-        self.assertTrue(np.isclose(x, 1))
-        self.assertTrue(np.isclose(x1, 1))
-        self.assertTrue(iters == iters1)
-        self.assertTrue(np.isclose(x2, 1))
+        result = zBrentDekker(f, [0, 2])
+        traced = zBrentDekker(f, [0, 2], trace=True)
+        self.assertTrue(np.isclose(result.root, 1))
+        self.assertTrue(result.converged)
+        self.assertIsNone(result.trace)
+        self.assertEqual(result.root, traced.root)
+        self.assertEqual(result.iterations, traced.iterations)
+        self.assertEqual(traced.trace.dtype, np.int8)
+        self.assertEqual(len(traced.trace), traced.iterations)
 
     def test_IQI(self):
         """
         Test the IQI method
         """
         f = lambda x: x**2 - 1
-        x = IQI(f, [0, 2 / 3, 2])
-        x1, iters = IQI(f, [0, 2 / 3, 2], iters=True)
-        self.assertTrue(np.isclose(x, 1))
-        self.assertTrue(np.isclose(x1, 1))
+        result = IQI(f, [0, 2 / 3, 2])
+        self.assertTrue(np.isclose(result.root, 1))
+        self.assertTrue(np.isclose(result.froot, 0))
+
+    def test_RootResult(self):
+        """
+        The results have fixed attributes and report when the maximum number of iterations is reached
+        """
+        result = bisect(lambda x: x**2 - 1, [0, 3], 5)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.reason, "maximum iterations reached")
+        with self.assertRaises(AttributeError):
+            result.other = 0
+        self.assertIn("maximum iterations reached", repr(result))
+
+        result = newton(lambda x: x**2 + 1, lambda x: 2 * x, 1, 10)
+        self.assertFalse(result.converged)
+
+    def test_secant_failures(self):
+        """
+        The secant method reports why it failed, with the same reasons as the vectorized one
+        """
+        result = secant(np.arctan, [-1.0, 20.0])
+        self.assertFalse(result.converged)
+        self.assertEqual(result.reason, "secant undefined")
+        self.assertLess(result.iterations, 100)
+
+        with np.errstate(invalid="ignore"):
+            result = secant(np.log, [0.1, 10.0])
+        self.assertFalse(result.converged)
+        self.assertEqual(result.reason, "diverged")
+
+    def test_deprecated_flags(self):
+        """
+        The old iters and steps flags still return the old tuples with a DeprecationWarning, and the arguments of the
+        function stay in their positions
+        """
+        f = lambda x, c: x**2 - c
+        with self.assertWarns(DeprecationWarning):
+            x, iterations = bisect(f, [0, 3], 100, True, 4)
+        self.assertTrue(np.isclose(x, 2))
+        self.assertEqual(iterations, bisect(f, [0, 3], 100, False, 4).iterations)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(len(secant(f, [0, 3], 100, True, 4)), 2)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(len(newton(f, lambda x, c: 2 * x, 3, 100, True, 4)), 2)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(len(IQI(f, [1, 1.5, 3], 100, True, 4)), 2)
+
+        result = zBrentDekker(f, [0, 3], 1e-20, 100, False, False, 4, trace=True)
+        self.assertTrue(np.isclose(result.root, 2))
+        with self.assertWarns(DeprecationWarning):
+            x, iterations, steps = zBrentDekker(f, [0, 3], 1e-20, 100, True, True, 4)
+        self.assertEqual((x, iterations), (result.root, result.iterations))
+        self.assertEqual(steps, [procedures[k] for k in result.trace])
 
     def test_SameSign(self):
         """
@@ -79,7 +138,7 @@ class test_Roots(TestCase):
         """
 
         f = lambda x: x**2 - 1
-        x = bisect(f, [0, 1.5], 1)
+        x = bisect(f, [0, 1.5], 1).root
         self.assertTrue(np.isclose(x, 3 / 4))
 
     def test_OneStep_Secant(self):
@@ -87,7 +146,7 @@ class test_Roots(TestCase):
         Test if the secant method returns the correct value after one step, this test is of critical importance, since the future zBrentDekker method is based on the secant method
         """
         f = lambda x: x**2 - 1
-        x = secant(f, [0, 1.5], 1)
+        x = secant(f, [0, 1.5], 1).root
         self.assertTrue(np.isclose(x, 2 / 3))
 
     def test_OneStep_Newton(self):
@@ -96,7 +155,7 @@ class test_Roots(TestCase):
         """
         f = lambda x: x**2 - 1
         fprime = lambda x: 2 * x
-        x = newton(f, fprime, 3, 1)
+        x = newton(f, fprime, 3, 1).root
         self.assertTrue(np.isclose(x, 5 / 3))
 
     def test_OneStep_IQI(self):
@@ -104,7 +163,7 @@ class test_Roots(TestCase):
         Test if the IQI method returns the correct value after one step, this test is of critical importance, since the future zBrentDekker method is based on the IQI method
         """
         f = lambda x: 6 * x**2 - 2 * x**3
-        x = IQI(f, [4, 4.5, 5], 1)
+        x = IQI(f, [4, 4.5, 5], 1).root
         print(x)
         self.assertTrue(np.isclose(x, 3.3104729014286414))
 
@@ -128,10 +187,562 @@ class test_Roots(TestCase):
             (f2, [-1001200, 0], 10 ** (-20), 79),
         ]
         for test in tests:
-            x, iters = zBrentDekker(test[0], test[1], tol=test[2], iters=True)
+            result = zBrentDekker(test[0], test[1], tol=test[2])
+
+            self.assertTrue(np.isclose(test[0](result.root), 0))
+            self.assertLessEqual(result.iterations, test[3])
+
+
+class test_Evaluations(TestCase):
+    def counted(self):
+        """
+        Function x^3 - 2x - 5 that counts its calls in self.calls
+        """
+        self.calls = 0
+
+        def f(x):
+            self.calls += 1
+            return x**3 - 2 * x - 5
+
+        return f
+
+    def test_nfev(self):
+        """
+        The number of evaluations reported is the number of calls, and the values are carried between iterations
+        """
+        f = self.counted()
+        for method, start in [
+            (bisect, [2, 3]),
+            (secant, [2, 3]),
+            (IQI, [2, 2.5, 3]),
+            (zBrentDekker, [2, 3]),
+        ]:
+            self.calls = 0
+            result = method(f, start)
+            self.assertTrue(np.isclose(result.root, 2.0945514815423265))
+            self.assertEqual(result.nfev, self.calls)
+            # One evaluation per iteration besides the first two (IQI evaluates its last point for the result)
+            self.assertEqual(result.nfev, result.iterations + 2 + (method is IQI))
+
+        self.calls = 0
+        result = newton(f, lambda x: 3 * x**2 - 2, 3)
+        self.assertEqual(result.nfev, self.calls)
+        self.assertEqual(result.nfev, result.iterations + 1)
+        self.assertLessEqual(result.njev, result.iterations)
+
+    def test_Memoized(self):
+        """
+        The cache keeps the last maxsize values, and the calls with arrays are not cached
+        """
+        f = Memoized(self.counted(), maxsize=2)
+        self.assertEqual([f(1), f(1), f(2), f(3), f(1)], [-6, -6, -1, 16, -6])
+        self.assertEqual((f.nfev, f.hits, self.calls), (4, 1, 4))
+        self.assertEqual(list(f.cache), [(3,), (1,)])
+
+        g = Memoized(lambda x, c: x - c)
+        self.assertTrue(np.allclose(g(1, np.arange(3)), [1, 0, -1]))
+        self.assertEqual((g.nfev, len(g.cache)), (1, 0))
+
+        result = bisect(self.counted(), [2, 3], cache=8)
+        self.assertEqual(result.nfev, self.calls)
+
+
+class test_VectorizedRoots(TestCase):
+    rng = np.random.default_rng(0)
+    k = rng.uniform(0.5, 3, 200)
+    s = rng.uniform(-2, 2, 200)
+    f = staticmethod(lambda x, k, s: x * x * x + k * x - s)
+    interval = (np.full(200, -5.0), 5.0)
+
+    def test_vectorized_bisect(self):
+        """
+        Every interval gets the zero of the scalar bisect in as many iterations, with its own arguments
+        """
+        result = vectorized_bisect(self.f, self.interval, 0, 100, self.k, self.s)
+        scalar = [
+            bisect(self.f, [-5, 5], 100, False, *ks) for ks in zip(self.k, self.s)
+        ]
+        self.assertTrue(np.array_equal(result.root, [r.root for r in scalar]))
+        self.assertTrue(np.array_equal(result.froot, [r.froot for r in scalar]))
+        self.assertTrue(
+            np.array_equal(result.iterations, [r.iterations for r in scalar])
+        )
+        self.assertEqual(
+            [reasons[k] for k in result.reason], [r.reason for r in scalar]
+        )
+
+        result = vectorized_bisect(self.f, self.interval, 1e-3, 100, self.k, self.s)
+        self.assertTrue(np.allclose(result.froot, 0, atol=1e-2))
+        self.assertTrue(np.all(result.iterations == 14))
+        self.assertTrue(np.all(result.converged))
+
+        result = vectorized_bisect(self.f, self.interval, 0, 10, self.k, self.s)
+        self.assertFalse(np.any(result.converged))
+
+    def test_vectorized_secant(self):
+        """
+        The secant method converges in every interval
+        """
+        result = vectorized_secant(
+            self.f, (np.zeros(200), 2.0), 0, 100, self.k, np.abs(self.s)
+        )
+        self.assertTrue(np.allclose(result.froot, 0))
+        self.assertTrue(np.all(result.converged))
+        self.assertTrue(np.all(result.iterations < 100))
+        result = vectorized_secant(lambda x: x**2 - 1, ([0, 0.5], 2))
+        self.assertTrue(np.allclose(result.root, 1))
+
+    def test_vectorized_secant_diverging(self):
+        """
+        Lanes where the secant method runs away are not converged: arctan goes to a flat secant and log leaves its domain
+        """
+        result = vectorized_secant(np.arctan, ([-1.0, -1.0], [20.0, 1.0]))
+        self.assertEqual(list(result.converged), [False, True])
+        self.assertEqual(list(result.reason), [reasons.index("secant undefined"), 0])
+
+        with np.errstate(invalid="ignore"):
+            result = vectorized_secant(np.log, ([0.1, 0.5], [10.0, 2.0]))
+        self.assertEqual(list(result.converged), [False, True])
+        self.assertEqual(list(result.reason), [reasons.index("diverged"), 0])
 
-            self.assertTrue(np.isclose(test[0](x), 0))
-            self.assertLessEqual(iters, test[3])
+    def test_vectorized_zBrentDekker(self):
+        """
+        Every interval takes the same steps as the scalar zBrentDekker and gets the same zero
+        """
+        result = vectorized_zBrentDekker(
+            self.f, self.interval, 1e-20, 100, self.k, self.s, trace=True
+        )
+        for i, ks in enumerate(zip(self.k, self.s)):
+            scalar = zBrentDekker(
+                self.f, [-5, 5], 1e-20, 100, False, False, *ks, trace=True
+            )
+            self.assertEqual(scalar.root, result.root[i])
+            self.assertEqual(scalar.froot, result.froot[i])
+            self.assertEqual(scalar.iterations, result.iterations[i])
+            self.assertEqual(scalar.reason, reasons[result.reason[i]])
+            counts = np.bincount(scalar.trace, minlength=3)
+            self.assertTrue(np.array_equal(counts, result.trace[i]))
+
+        result = vectorized_zBrentDekker(lambda x: x**2 - 1, ([0, -2, 1], [2, 0, 3]))
+        self.assertTrue(np.allclose(result.root, [1, -1, 1]))
+        self.assertIsNone(result.trace)
+
+    def test_vectorized_SameSign(self):
+        """
+        A ValueError is raised if any interval has no sign change
+        """
+        f = lambda x: x**2 - 1
+        for method in [vectorized_bisect, vectorized_secant, vectorized_zBrentDekker]:
+            with self.assertRaises(ValueError):
+                method(f, ([0, -2], 2))
+
+
+class test_SafeguardedNewton(TestCase):
+    def test_methods(self):
+        """
+        Every method and kind of derivative finds the zero of zBrentDekker, Halley in fewer iterations than Newton
+        """
+        problems = [
+            (lambda x: x**3 - 2 * x - 5, (2, 3)),
+            (lambda x: np.exp(x) - 10, (0, 5)),
+            (lambda x: np.cos(x) - x, (0, 1)),
+            (lambda x: np.arctan(100 * (x - 0.77)), (-5, 5)),
+        ]
+        for f, interval in problems:
+            expected = zBrentDekker(f, interval).root
+            iterations = {}
+            for method in ["newton", "halley", "steffensen"]:
+                for derivative in ["dual", "complex"]:
+                    result = safeguarded_newton(
+                        f, interval, method=method, derivative=derivative
+                    )
+                    self.assertTrue(result.converged)
+                    self.assertAlmostEqual(result.root, expected, places=12)
+                    iterations[method] = result.iterations
+            self.assertLessEqual(iterations["halley"], iterations["newton"])
+
+        # With the complex step, Halley takes two calls per iteration
+        result = safeguarded_newton(
+            lambda x, c: x**2 - c,
+            (0, 2),
+            1e-20,
+            100,
+            2,
+            method="halley",
+            derivative="complex",
+        )
+        self.assertAlmostEqual(result.root, np.sqrt(2))
+        self.assertEqual(result.njev, 2 * result.iterations + 2)
+        self.assertEqual(result.nfev, result.njev + 2)
+
+    def test_safeguards(self):
+        """
+        A zero derivative or a step out of the bracket falls back to bisection instead of stopping
+        """
+        # The derivative is zero at the middle of the interval
+        result = safeguarded_newton(lambda x: x**3 - 0.001, (-1, 1))
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.root, 0.1)
+        with self.assertRaises(ValueError):
+            newton(lambda x: x**3 - 0.001, lambda x: 3 * x**2, 0)
+
+        # Newton from the middle would jump out of the interval
+        result = safeguarded_newton(np.arctan, (-2, 10))
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.root, 0)
+
+        result = safeguarded_newton(lambda x: x - 1, (1, 2))
+        self.assertEqual((result.root, result.iterations), (1, 0))
+        with self.assertRaises(ValueError):
+            safeguarded_newton(np.cos, (0, 1))
+        with self.assertRaises(ValueError):
+            safeguarded_newton(np.cos, (0, 3), method="secant")
+        with self.assertRaises(ValueError):
+            safeguarded_newton(np.cos, (0, 3), derivative="finite")
+
+
+class test_ParallelRoots(TestCase):
+    def test_parallel_zBrentDekker(self):
+        """
+        The speculative version finds the zero of zBrentDekker in fewer iterations, and the executor does not change the result
+        """
+        problems = [
+            (lambda x: x**3 - 2 * x - 5, (2, 3)),
+            (np.cos, (0, 3)),
+            (lambda x: np.arctan(100 * (x - 0.77)), (-5, 5)),
+            (lambda x: x**9, (-1, 3)),
+        ]
+        for f, interval in problems:
+            serial = zBrentDekker(f, interval, 1e-12)
+            for k in [2, 8]:
+                result = parallel_zBrentDekker(f, interval, 1e-12, k=k, trace=True)
+                self.assertTrue(result.converged)
+                self.assertAlmostEqual(result.root, serial.root, places=10)
+                self.assertLessEqual(result.iterations, serial.iterations)
+                self.assertEqual(len(result.trace), result.iterations)
+
+        # Bisection-bound problems gain about log2(k) iterations
+        f = lambda x: np.sign(x - 0.3)
+        serial = zBrentDekker(f, (0, 1), 1e-8)
+        result = parallel_zBrentDekker(f, (0, 1), 1e-8, k=16)
+        self.assertLessEqual(result.iterations * 3, serial.iterations)
+
+        with ThreadPoolExecutor(4) as executor:
+            parallel = parallel_zBrentDekker(
+                lambda x, c: np.sin(c * x), (0.5, 1.5), 1e-20, 100, 3, executor=executor
+            )
+        expected = parallel_zBrentDekker(
+            lambda x, c: np.sin(c * x), (0.5, 1.5), 1e-20, 100, 3
+        )
+        self.assertEqual(parallel.root, expected.root)
+        self.assertEqual(parallel.nfev, expected.nfev)
+
+        with self.assertRaises(ValueError):
+            parallel_zBrentDekker(np.cos, (0, 1))
+        with self.assertRaises(ValueError):
+            parallel_zBrentDekker(np.cos, (0, 3), k=1)
+
+
+class test_AsyncRoots(TestCase):
+    def setUp(self):
+        # A coroutine function that waits like a request to a server, recording the evaluations in flight
+        self.in_flight, self.peak = 0, 0
+
+        async def f(x, c=3):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.001)
+            self.in_flight -= 1
+            return np.sin(c * x)
+
+        self.f = f
+
+    def test_async_solvers(self):
+        """
+        The async solvers take the same steps as the synchronous ones
+        """
+        for interval in [(0.5, 1.5), (1.5, 2.5), (np.pi / 3, 2)]:
+            result = asyncio.run(async_zBrentDekker(self.f, interval, trace=True))
+            expected = zBrentDekker(lambda x: np.sin(3 * x), interval, trace=True)
+            self.assertEqual(result.root, expected.root)
+            self.assertEqual(result.nfev, expected.nfev)
+            self.assertTrue(np.array_equal(result.trace, expected.trace))
+
+            result = asyncio.run(async_bisect(self.f, interval, 100, 3))
+            expected = bisect(lambda x: np.sin(3 * x), interval)
+            self.assertEqual(result.root, expected.root)
+            self.assertEqual(result.nfev, expected.nfev)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(async_zBrentDekker(self.f, (0.1, 0.2)))
+        with self.assertRaises(ValueError):
+            asyncio.run(async_bisect(self.f, (0.1, 0.2)))
+
+    def test_async_find_roots(self):
+        """
+        Many problems are interleaved with at most max_concurrency evaluations in flight
+        """
+        intervals = [(k * np.pi / 3 - 0.4, k * np.pi / 3 + 0.5) for k in range(1, 41)]
+        results = asyncio.run(
+            async_find_roots(self.f, intervals, 1e-20, 100, 3, max_concurrency=8)
+        )
+        self.assertEqual(self.peak, 8)
+        self.assertTrue(
+            np.allclose(
+                [result.root for result in results], np.arange(1, 41) * np.pi / 3
+            )
+        )
+
+        results = asyncio.run(
+            async_find_roots(
+                self.f,
+                [(0.1, 0.2), (0.5, 1.5)],
+                method="bisect",
+                return_exceptions=True,
+            )
+        )
+        self.assertIsInstance(results[0], ValueError)
+        self.assertAlmostEqual(results[1].root, np.pi / 3)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(async_find_roots(self.f, [(0.1, 0.2)]))
+        with self.assertRaises(ValueError):
+            asyncio.run(async_find_roots(self.f, intervals, method="secant"))
+        with self.assertRaises(ValueError):
+            asyncio.run(async_find_roots(self.f, intervals, max_concurrency=0))
+
+
+class test_AllRoots(TestCase):
+    def test_golden_section(self):
+        """
+        The golden section search finds the minimum of every interval
+        """
+        x, gx = golden_section(lambda x: (x - 0.3) ** 2, [0, -1, 0.5], [1, 0, 2])
+        self.assertTrue(np.allclose(x, [0.3, 0, 0.5], atol=1e-7))
+        self.assertTrue(np.allclose(gx, (x - 0.3) ** 2))
+
+    def test_find_all_roots(self):
+        """
+        All the zeros are found once: simple ones, samples that are zeros and double ones
+        """
+        roots = find_all_roots(
+            lambda x, c: np.sin(c * x), (0.5, 10), 1000, 1e-20, 100, 3
+        )
+        self.assertTrue(np.allclose(roots, np.arange(1, 10) * np.pi / 3))
+
+        roots = find_all_roots(np.sin, (0, 10), 11)
+        self.assertTrue(np.allclose(roots, np.arange(4) * np.pi))
+
+        roots = find_all_roots(lambda x: (x - 1) ** 2 * (x + 2), (-3, 3), 100)
+        self.assertTrue(np.allclose(roots, [-2, 1]))
+        roots = find_all_roots(lambda x: x**2 + 1, (-3, 3))
+        self.assertEqual(len(roots), 0)
+
+        with ThreadPoolExecutor(2) as executor:
+            parallel = find_all_roots(
+                lambda x, c: np.sin(c * x),
+                (0.5, 10),
+                1000,
+                1e-20,
+                100,
+                3,
+                executor=executor,
+                batch_size=64,
+            )
+        self.assertTrue(np.allclose(parallel, np.arange(1, 10) * np.pi / 3))
+
+        with self.assertRaises(ValueError):
+            find_all_roots(np.sin, (1, 0))
+        with self.assertRaises(ValueError):
+            find_all_roots(np.sin, (0, 1), 2)
+
+    def test_tiny_values(self):
+        """
+        Zeros of functions with tiny values are found, the products of two samples underflow to zero
+        """
+        roots = find_all_roots(lambda x: 1e-200 * (x - 0.3), (0, 1))
+        self.assertTrue(np.allclose(roots, [0.3]))
+
+        roots = find_all_roots(lambda x: 1e-200 * (x - 0.3) ** 2 * (x - 0.7), (0, 1))
+        self.assertTrue(np.allclose(roots, [0.3, 0.7]))
+
+
+class test_PolyRoots(TestCase):
+    def test_poly_roots(self):
+        """
+        Both methods find all the zeros, real and complex, of random polynomials like numpy.roots
+        """
+        for degree in [1, 2, 5, 20, 60]:
+            coeffs = np.random.rand(degree + 1) - 0.5
+            expected = np.roots(coeffs)
+            for method in ["companion", "aberth"]:
+                roots = poly_roots(coeffs, method)
+                self.assertEqual(len(roots), degree)
+                # Every zero is close to one of numpy
+                distance = np.abs(roots[:, None] - expected[None, :]).min(axis=1)
+                self.assertTrue(np.all(distance < 1e-8), f"{method} {degree}")
+
+        self.assertTrue(np.allclose(poly_roots([1, -6, 11, -6]), [1, 2, 3]))
+        self.assertTrue(np.allclose(poly_roots([1, 0, 1]), [-1j, 1j]))
+        self.assertTrue(np.allclose(poly_roots([1, 0, 1], "aberth"), [-1j, 1j]))
+
+    def test_poly_roots_special(self):
+        """
+        Zero coefficients, constants, complex coefficients and high degrees
+        """
+        # Leading zeros are dropped and trailing zeros are zeros at 0
+        self.assertTrue(np.allclose(poly_roots([0, 0, 1, 0, -1, 0, 0]), [-1, 0, 0, 1]))
+        self.assertEqual(len(poly_roots([5])), 0)
+        self.assertTrue(
+            np.allclose(
+                poly_roots([1j, 2, -1j]), np.sort_complex(np.roots([1j, 2, -1j]))
+            )
+        )
+
+        # Roots of unity of high degree with aberth
+        roots = poly_roots(np.concatenate([[1], np.zeros(199), [-1]]))
+        self.assertEqual(len(roots), 200)
+        self.assertTrue(np.allclose(np.abs(roots), 1))
+        self.assertTrue(np.allclose(roots**200, 1))
+
+        with self.assertRaises(ValueError):
+            poly_roots([0, 0])
+        with self.assertRaises(ValueError):
+            poly_roots([1, 2], "newton")
+        with self.assertRaises(ValueError):
+            poly_roots([1j, 2], "companion")
+
+
+class test_Systems(TestCase):
+    @staticmethod
+    def F(x):
+        """
+        Broyden's tridiagonal function, (3 - 2x_i) x_i - x_(i-1) - 2 x_(i+1) + 1
+        """
+        f = (3 - 2 * x) * x + 1
+        f[1:] -= x[:-1]
+        f[:-1] -= 2 * x[1:]
+        return f
+
+    @staticmethod
+    def J(x):
+        n = len(x)
+        return np.diag(3 - 4 * x) - np.eye(n, k=-1) - 2 * np.eye(n, k=1)
+
+    def test_last_iteration(self):
+        """
+        Converging on the last allowed iteration is reported as converged
+        """
+        x0 = -np.ones(20)
+        for solver in [newton_system, broyden]:
+            needed = solver(self.F, x0, self.J).iterations
+            result = solver(self.F, x0, self.J, 1e-10, needed)
+            self.assertTrue(result.converged)
+            self.assertEqual(result.reason, "tolerance reached")
+            self.assertEqual(result.iterations, needed)
+            result = solver(self.F, x0, self.J, 1e-10, needed - 1)
+            self.assertFalse(result.converged)
+            self.assertEqual(result.reason, "maximum iterations reached")
+
+    def test_sparse_without_scipy(self):
+        """
+        Without scipy, the sparse option raises an ImportError naming the option and the extra, the dense path still works
+        """
+        pattern = np.eye(5, k=-1) + np.eye(5) + np.eye(5, k=1)
+        with patch.dict(
+            "sys.modules",
+            {"scipy": None, "scipy.sparse": None, "scipy.sparse.linalg": None},
+        ):
+            with self.assertRaises(ImportError) as context:
+                newton_system(self.F, -np.ones(5), sparsity=pattern)
+            self.assertIn("sparsity", str(context.exception))
+            self.assertIn("BNumMet[sparse]", str(context.exception))
+            self.assertTrue(newton_system(self.F, -np.ones(5)).converged)
+
+    def test_finite_difference_jacobian(self):
+        """
+        The finite differences approximate the Jacobian
+        """
+        x = np.random.default_rng(0).normal(size=8)
+        self.assertTrue(
+            np.allclose(finite_difference_jacobian(self.F, x), self.J(x), atol=1e-6)
+        )
+
+    def test_column_coloring(self):
+        """
+        The columns of the same color do not share rows, and a tridiagonal pattern needs 3 colors
+        """
+        pattern = np.random.default_rng(1).random((60, 50)) < 0.05
+        colors = column_coloring(pattern)
+        for color in range(colors.max() + 1):
+            self.assertLessEqual(pattern[:, colors == color].sum(axis=1).max(), 1)
+        self.assertEqual(column_coloring(self.J(np.zeros(30)) != 0).max(), 2)
+
+    def test_sparse_jacobian(self):
+        """
+        The colored finite differences match the dense ones with one evaluation per color, and the solvers use them with sparse LU
+        """
+        x = np.random.default_rng(0).normal(size=40)
+        pattern = sparse.diags([1, 1, 1], [-1, 0, 1], shape=(40, 40), dtype=float)
+        calls = Memoized(self.F, 0)
+        J = finite_difference_jacobian(calls, x, None, sparsity=pattern)
+        self.assertTrue(sparse.issparse(J))
+        self.assertEqual(calls.nfev, 4)
+        self.assertTrue(
+            np.allclose(J.toarray(), finite_difference_jacobian(self.F, x), atol=1e-12)
+        )
+
+        pattern = sparse.diags([1, 1, 1], [-1, 0, 1], shape=(500, 500), dtype=float)
+        for solver in [newton_system, broyden]:
+            result = solver(self.F, -np.ones(500), sparsity=pattern)
+            self.assertTrue(result.converged)
+            self.assertLessEqual(np.max(np.abs(self.F(result.root))), 1e-10)
+            self.assertEqual(result.nfev, 3 * result.njev + result.iterations + 1)
+
+    def test_newton_system(self):
+        """
+        Newton's method solves the system with the analytic and the approximated Jacobian, and reusing the factorizations
+        """
+        x0 = -np.ones(50)
+        result = newton_system(self.F, x0, self.J)
+        self.assertTrue(result.converged)
+        self.assertLessEqual(np.max(np.abs(self.F(result.root))), 1e-10)
+        self.assertEqual(
+            (result.njev, result.nfev), (result.iterations, result.iterations + 1)
+        )
+
+        approximated = newton_system(self.F, x0)
+        self.assertTrue(np.allclose(approximated.root, result.root))
+        self.assertEqual(
+            approximated.nfev, 50 * approximated.njev + approximated.iterations + 1
+        )
+
+        chord = newton_system(self.F, x0, self.J, reuse=5)
+        self.assertTrue(chord.converged)
+        self.assertLess(chord.njev, result.njev)
+        self.assertTrue(np.allclose(chord.root, result.root))
+
+    def test_broyden(self):
+        """
+        Broyden's method solves the system computing the Jacobian only once
+        """
+        result = broyden(self.F, -np.ones(50), self.J)
+        self.assertTrue(result.converged)
+        self.assertEqual(result.njev, 1)
+        self.assertTrue(
+            np.allclose(result.root, newton_system(self.F, -np.ones(50)).root)
+        )
+
+        # A system with args and without solution
+        F = lambda x, c: x**2 + c
+        result = broyden(F, [1.0, 2.0], None, 1e-10, 100, 1)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.reason, "no progress")
+        result = newton_system(F, [1.0, 2.0], None, 1e-10, 100, 1)
+        self.assertFalse(result.converged)
+        self.assertTrue(
+            np.allclose(newton_system(F, [3.0, 0.5], None, 1e-12, 100, -4).root, 2)
+        )
 
 
 class Test_NonLinearVisualizer(TestCase):
@@ -159,9 +770,8 @@ class Test_NonLinearVisualizer(TestCase):
         f = lambda x: x**2 - 1
         interval = (0, 2)
         tol = 1e-20
-        x, itersbrentt, stack = zBrentDekker(
-            f, interval, iters=True, steps=True, tol=tol
-        )
+        result = zBrentDekker(f, interval, tol=tol, trace=True)
+        itersbrentt, stack = result.iterations, [procedures[k] for k in result.trace]
         nonLinearVisualizer = NonLinearVisualizer(f, interval, tol=tol)
         nonLinearVisualizer.run()
 
@@ -194,7 +804,8 @@ class Test_NonLinearVisualizer(TestCase):
         f = lambda x: x**2 - 1
         interval = (0, 2)
         tol = 1e-20
-        x, iters, stack = zBrentDekker(f, interval, iters=True, steps=True, tol=tol)
+        result = zBrentDekker(f, interval, tol=tol, trace=True)
+        iters, stack = result.iterations, [procedures[k] for k in result.trace]
         nonLinearVisualizer = NonLinearVisualizer(f, interval, tol=tol)
         nonLinearVisualizer.run()
 
@@ -223,7 +834,8 @@ class Test_NonLinearVisualizer(TestCase):
         f = lambda x: x**2 - 1
         interval = (0, 2)
         tol = 1e-20
-        x, iters, stack = zBrentDekker(f, interval, iters=True, steps=True, tol=tol)
+        result = zBrentDekker(f, interval, tol=tol, trace=True)
+        iters, stack = result.iterations, [procedures[k] for k in result.trace]
         nonLinearVisualizer = NonLinearVisualizer(f, interval, tol=tol)
         nonLinearVisualizer.run()
 
@@ -257,7 +869,8 @@ class Test_NonLinearVisualizer(TestCase):
         f = lambda x: x**2 - 1
         interval = (0, 2)
         tol = 1e-20
-        x, iters, stack = zBrentDekker(f, interval, iters=True, steps=True, tol=tol)
+        result = zBrentDekker(f, interval, tol=tol, trace=True)
+        iters, stack = result.iterations, [procedures[k] for k in result.trace]
         nonLinearVisualizer = NonLinearVisualizer(f, interval, tol=tol)
         nonLinearVisualizer.run()
 
@@ -306,11 +919,12 @@ class Test_NonLinearVisualizer(TestCase):
         f = lambda x: x**2 - 1
         interval = (1, 4)
         tol = 1e-20
-        x, iters, stack = zBrentDekker(f, interval, iters=True, steps=True, tol=tol)
+        result = zBrentDekker(f, interval, tol=tol, trace=True)
+        iters, stack = result.iterations, [procedures[k] for k in result.trace]
         nonLinearVisualizer = NonLinearVisualizer(f, interval, tol=tol)
         nonLinearVisualizer.run()
 
-        self.assertEqual(x, 1)
+        self.assertEqual(result.root, 1)
         self.assertEqual(iters, 0)
         self.assertEqual(stack, [])
 
@@ -323,7 +937,8 @@ class Test_NonLinearVisualizer(TestCase):
         f = lambda x: x**2 - 1
         interval = (0, 2)
         tol = 1e-20
-        x, iters, stack = zBrentDekker(f, interval, iters=True, steps=True, tol=tol)
+        result = zBrentDekker(f, interval, tol=tol, trace=True)
+        iters, stack = result.iterations, [procedures[k] for k in result.trace]
         nonLinearVisualizer = NonLinearVisualizer(f, interval, tol=tol)
         nonLinearVisualizer.run()
 
@@ -0,0 +1,169 @@
+from unittest import TestCase
+
+import numpy as np
+
+from BNumMet.ScatteredInterpolation import (
+    IDWInterpolator,
+    KDTree,
+    LocalRBFInterpolator,
+    rbf_kernels,
+)
+
+
+class test_KDTree(TestCase):
+    def test_query(self):
+        """
+        Test the k nearest neighbours of the tree against a brute force search, in 1, 2 and 3 dimensions
+        """
+        for dimension in [1, 2, 3]:
+            points = np.random.rand(500, dimension)
+            x = np.random.rand(200, dimension) * 1.2 - 0.1  # Some points outside
+            tree = KDTree(points, leaf_size=8)
+            all_distances = np.sqrt(
+                np.sum((x[:, None, :] - points[None, :, :]) ** 2, axis=2)
+            )
+            for k in [1, 5, 30]:
+                distances, indices = tree.query(x, k)
+                self.assertEqual(distances.shape, (200, k))
+                self.assertTrue(
+                    np.allclose(distances, np.sort(all_distances, axis=1)[:, :k])
+                )
+                self.assertTrue(
+                    np.allclose(
+                        distances, np.take_along_axis(all_distances, indices, 1)
+                    )
+                )
+
+    def test_query_clusters(self):
+        """
+        Test query points far from the data and in the gaps between clusters against a brute force search
+        """
+        centres = np.random.rand(5, 2) * 100
+        points = np.concatenate([c + 0.01 * np.random.randn(300, 2) for c in centres])
+        x = np.concatenate([np.random.rand(150, 2) * 100, np.random.randn(50, 2) * 1e4])
+        all_distances = np.sqrt(
+            np.sum((x[:, None, :] - points[None, :, :]) ** 2, axis=2)
+        )
+        for k in [1, 7]:
+            distances, indices = KDTree(points, leaf_size=4).query(x, k, batch_size=64)
+            self.assertTrue(
+                np.allclose(distances, np.sort(all_distances, axis=1)[:, :k])
+            )
+            self.assertTrue(
+                np.allclose(distances, np.take_along_axis(all_distances, indices, 1))
+            )
+
+    def test_query_samples(self):
+        """
+        Test that the nearest point of a sample is the sample itself and that small trees work
+        """
+        points = np.random.rand(100, 2)
+        distances, indices = KDTree(points).query(points)
+        self.assertTrue(np.all(distances == 0))
+        self.assertTrue(np.all(indices[:, 0] == np.arange(100)))
+
+        distances, indices = KDTree(points[:3]).query(points[:2], 3)
+        self.assertEqual(indices.shape, (2, 3))
+
+    def test_exceptions(self):
+        """
+        Test that the tree raises ValueError with no points, a wrong k or wrong dimensions
+        """
+        with self.assertRaises(ValueError):
+            KDTree(np.zeros((0, 2)))
+        tree = KDTree(np.random.rand(10, 2))
+        with self.assertRaises(ValueError):
+            tree.query(np.random.rand(5, 2), 11)
+        with self.assertRaises(ValueError):
+            tree.query(np.random.rand(5, 3))
+
+
+class test_IDWInterpolator(TestCase):
+    def test_samples(self):
+        """
+        Test that the interpolant takes the sample values at the samples and stays between their bounds
+        """
+        points = np.random.rand(300, 2)
+        values = np.sin(4 * points[:, 0]) * points[:, 1]
+        idw = IDWInterpolator(points, values)
+        self.assertTrue(np.allclose(idw(points), values))
+
+        v = idw(np.random.rand(100, 2))
+        self.assertTrue(np.all(v >= values.min()) and np.all(v <= values.max()))
+
+    def test_constant(self):
+        """
+        Test that a constant is reproduced exactly
+        """
+        idw = IDWInterpolator(np.random.rand(50, 3), np.full(50, 2.5), k=4, power=3)
+        self.assertTrue(np.allclose(idw(np.random.rand(20, 3)), 2.5))
+
+    def test_exceptions(self):
+        """
+        Test that the interpolant raises ValueError if the number of points and values differ
+        """
+        with self.assertRaises(ValueError):
+            IDWInterpolator(np.random.rand(10, 2), np.random.rand(9))
+
+
+class test_LocalRBFInterpolator(TestCase):
+    def test_linear(self):
+        """
+        Test that every kernel reproduces a linear function (thanks to the polynomial term) and the samples
+        """
+        points = np.random.rand(200, 2)
+        values = 1 + 2 * points[:, 0] - 3 * points[:, 1]
+        u = np.random.rand(50, 2)
+        for kernel in [
+            "linear",
+            "cubic",
+            "thin_plate",
+            "gaussian",
+            "multiquadric",
+            "inverse_multiquadric",
+        ]:
+            rbf = LocalRBFInterpolator(points, values, k=10, kernel=kernel, epsilon=2)
+            self.assertTrue(np.allclose(rbf(u), 1 + 2 * u[:, 0] - 3 * u[:, 1]))
+            self.assertTrue(np.allclose(rbf(points[:20]), values[:20]))
+
+    def test_smooth(self):
+        """
+        Test the accuracy on a smooth function in 1-D with several batches
+        """
+        x = np.linspace(0, 1, 101)
+        rbf = LocalRBFInterpolator(x, np.sin(3 * x), k=8, kernel="cubic")
+        u = np.random.rand(300)
+        self.assertTrue(np.allclose(rbf(u, batch_size=64), np.sin(3 * u), atol=1e-5))
+
+    def test_jumps(self):
+        """
+        Test that the interpolant jumps where the k nearest samples change, by about the local error, and is continuous elsewhere
+        """
+        x = np.sort(np.random.default_rng(0).random(40))
+        k = 6
+        rbf = LocalRBFInterpolator(x, np.sin(5 * x), k=k, kernel="cubic")
+        delta = 1e-9
+        switches = (x[:-k] + x[k:]) / 2  # The k nearest samples change at these points
+        jumps = np.abs(rbf(switches + delta) - rbf(switches - delta))
+        self.assertGreater(np.max(jumps), 1e-6)
+        self.assertLess(np.max(jumps), 1e-2)
+
+        # Between two switches the neighbours are the same and the interpolant is smooth
+        inside = (switches[:-1] + switches[1:]) / 2
+        steps = np.abs(rbf(inside + delta) - rbf(inside - delta))
+        self.assertLess(np.max(steps), 1e-6)
+
+    def test_exceptions(self):
+        """
+        Test that the interpolant raises ValueError with wrong arguments
+        """
+        with self.assertRaises(ValueError):
+            LocalRBFInterpolator(np.random.rand(10, 2), np.random.rand(9))
+        with self.assertRaises(ValueError):
+            LocalRBFInterpolator(
+                np.random.rand(10, 2), np.random.rand(10), kernel="none"
+            )
+        with self.assertRaises(ValueError):
+            LocalRBFInterpolator(np.random.rand(10, 2), np.random.rand(10), k=2)
+        with self.assertRaises(ValueError):
+            rbf_kernels(np.ones(3), "none", 1)